@@ -0,0 +1,504 @@
+"""Concurrent-session load test of the dashboard against a headless server.
+
+Starts ``streamlit run dashboard.py`` headless on a local port and drives N
+simulated sessions against it at once over Streamlit's own WebSocket
+protocol, the way N browser tabs would. There is no browser, and nothing
+runs outside this machine. The sessions share the one server process, so
+its ``st.cache_*`` caches, its figure cache and its edition registry are
+shared exactly as in a deployment. Every session:
+
+* opens the page (connects and runs the script),
+* with ``--lazy``, opens with ``?lazy=1`` and expands the second row,
+* clicks "Change View📌" (toggling ``highlight_view``) and then selects
+  every focus group in turn in the ``selected_focus`` box, ``--rounds``
+  times over.
+
+Widgets inside a fragment are sent with the fragment's id, as the browser
+sends them, so the button and the focus box rerun only their chart. The
+sessions start together, as when many people open the dashboard at once.
+For each concurrency level the report gives:
+
+* p50/p95/p99 and max rerun latency, from sending the rerun to the
+  script's finish message, overall and per action
+* peak RSS of the server and its worker processes during the level, and
+  its growth
+* figure-cache hits and misses, read from a ``?debug=1`` session (the
+  panel an operator looks at), and the mean time per profiler section,
+  scraped from the server's Prometheus endpoint (``GIRAI_METRICS_PORT``)
+
+Levels share one server in order, so the first level pays the cold start
+and the later ones run warm; ``--cold`` starts a fresh server for every
+level. The server inherits the environment, so settings such as
+``GIRAI_FIGURE_WORKERS`` apply as in a deployment.
+
+    python -m benchmarks.load_test --sessions 1 4 16 --rounds 2 --output load_results.json
+    python -m benchmarks.load_test --sessions 8 --lazy --cold
+    python -m benchmarks.load_test --compare old.json new.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+
+import numpy as np
+import streamlit as st
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DASHBOARD = os.path.join(ROOT, 'dashboard.py')
+
+VIEW_BUTTON = "Change View📌"
+FOCUS_KEY = "selected_focus"
+LOWER_ROW_KEY = "lower_charts"
+CUSTOM_FOCUS = "Custom Selection"
+
+PERCENTILES = (50, 95, 99)
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+_SECTION_METRIC = re.compile(r'^girai_section_seconds_(sum|count)\{section="([^"]+)"\} (\S+)$')
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _children(pid):
+    try:
+        tasks = os.listdir(f'/proc/{pid}/task')
+    except OSError:
+        return []
+    found = []
+    for tid in tasks:
+        try:
+            with open(f'/proc/{pid}/task/{tid}/children') as f:
+                found += [int(child) for child in f.read().split()]
+        except OSError:
+            pass
+    return found
+
+
+def _process_rss(pid):
+    with open(f'/proc/{pid}/statm') as f:
+        return int(f.read().split()[1]) * _PAGE_SIZE
+
+
+class Server:
+    """``streamlit run dashboard.py`` in a headless subprocess, with its metrics endpoint."""
+
+    def __init__(self, timeout=120):
+        self.port, self.metrics_port = _free_port(), _free_port()
+        self.url = f'ws://127.0.0.1:{self.port}/_stcore/stream'
+        self.log = tempfile.TemporaryFile(mode='w+')
+        env = dict(os.environ, GIRAI_METRICS_PORT=str(self.metrics_port))
+        self.process = subprocess.Popen(
+            [sys.executable, '-m', 'streamlit', 'run', DASHBOARD, '--server.headless', 'true',
+             '--server.address', '127.0.0.1', '--server.port', str(self.port),
+             '--server.fileWatcherType', 'none', '--browser.gatherUsageStats', 'false'],
+            cwd=ROOT, env=env, stdout=self.log, stderr=subprocess.STDOUT,
+        )
+        self._wait_healthy(timeout)
+
+    def _wait_healthy(self, timeout):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                break
+            try:
+                with urllib.request.urlopen(f'http://127.0.0.1:{self.port}/_stcore/health', timeout=1):
+                    return
+            except (OSError, urllib.error.URLError):
+                time.sleep(0.2)
+        self.log.seek(0)
+        output = self.log.read()[-2000:]
+        self.stop()
+        raise RuntimeError(f"dashboard server did not start:\n{output}")
+
+    def rss(self):
+        """Resident memory of the server and every process below it (worker pools)."""
+        total, pending = 0, [self.process.pid]
+        while pending:
+            pid = pending.pop()
+            try:
+                total += _process_rss(pid)
+            except OSError:
+                continue
+            pending += _children(pid)
+        return total
+
+    def sections(self):
+        """{section: (count, total seconds)} from the profiler's Prometheus endpoint.
+
+        Empty until the first run has started the endpoint.
+        """
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{self.metrics_port}/metrics', timeout=5) as response:
+                text = response.read().decode()
+        except OSError:
+            return {}
+        found = defaultdict(lambda: [0, 0.0])
+        for line in text.splitlines():
+            match = _SECTION_METRIC.match(line)
+            if match:
+                kind, name, value = match.groups()
+                if kind == 'count':
+                    found[name][0] = int(value)
+                else:
+                    found[name][1] = float(value)
+        return {name: tuple(v) for name, v in found.items()}
+
+    def stop(self):
+        self.process.terminate()
+        try:
+            self.process.wait(10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        self.log.close()
+
+
+class RssSampler:
+    """Peak resident memory of ``server``, sampled from a thread."""
+
+    def __init__(self, server, interval=0.02):
+        self.server = server
+        self.interval = interval
+        self.peak = server.rss()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='rss-sampler', daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, self.server.rss())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.server.rss())
+
+
+def _widget_key(widget_id):
+    """The ``key=`` a widget was created with, from its id ('$$ID-<hash>-<key>')."""
+    key = widget_id.rsplit('-', 1)[-1]
+    return None if key == 'None' else key
+
+
+class Session:
+    """One browser tab: a WebSocket to the server and the widgets it has seen.
+
+    Widgets are found by label or by key once a run has sent them. Values
+    set through ``rerun`` are sent again on every later rerun, as the
+    browser does; button clicks only with the rerun they trigger.
+    """
+
+    def __init__(self, url, query_string='', timeout=120):
+        self.url = url
+        self.query_string = query_string
+        self.timeout = timeout
+        self.ws = None
+        self.page_script_hash = ''
+        # label or key -> {'id', 'fragment_id', 'options'}
+        self.widgets = {}
+        # widget id -> WidgetState sent with every rerun
+        self.values = {}
+        # the figure-cache stats of a ?debug=1 run
+        self.json = []
+
+    async def connect(self):
+        self.ws = await websockets.connect(self.url, subprotocols=['streamlit'], max_size=None)
+
+    async def close(self):
+        if self.ws is not None:
+            await self.ws.close()
+
+    def _remember(self, widget_id, label, fragment_id, options=()):
+        widget = {'id': widget_id, 'fragment_id': fragment_id, 'options': list(options)}
+        self.widgets[label] = widget
+        key = _widget_key(widget_id)
+        if key:
+            self.widgets[key] = widget
+
+    def _read(self, msg):
+        """Track one ForwardMsg; returns the error it reports, if any."""
+        kind = msg.WhichOneof('type')
+        if kind == 'new_session':
+            self.page_script_hash = msg.new_session.page_script_hash
+        elif kind == 'delta':
+            delta = msg.delta
+            if delta.WhichOneof('type') == 'new_element':
+                element = delta.new_element
+                element_type = element.WhichOneof('type')
+                if element_type == 'button':
+                    self._remember(element.button.id, element.button.label, delta.fragment_id)
+                elif element_type == 'selectbox':
+                    box = element.selectbox
+                    self._remember(box.id, box.label, delta.fragment_id, box.options)
+                elif element_type == 'json':
+                    self.json.append(element.json.body)
+                elif element_type == 'exception':
+                    return f"{element.exception.type}: {element.exception.message}"
+            elif delta.WhichOneof('type') == 'add_block' and delta.add_block.HasField('expandable'):
+                expander = delta.add_block.expandable
+                if expander.id:
+                    self._remember(expander.id, expander.label, delta.fragment_id)
+        return None
+
+    async def _until_finished(self):
+        errors = []
+        while True:
+            msg = ForwardMsg()
+            msg.ParseFromString(await self.ws.recv())
+            error = self._read(msg)
+            if error:
+                errors.append(error)
+            if msg.WhichOneof('type') == 'script_finished':
+                if msg.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    errors.append("script failed to compile")
+                return errors
+
+    async def rerun(self, set_values=(), trigger=None, fragment_id=''):
+        """Rerun the script (or one fragment) with new widget values; returns seconds taken.
+
+        ``set_values`` holds WidgetStates that replace the stored ones;
+        ``trigger`` is the id of a clicked button.
+        """
+        for state in set_values:
+            self.values[state.id] = state
+        msg = BackMsg()
+        client = msg.rerun_script
+        client.query_string = self.query_string
+        client.page_script_hash = self.page_script_hash
+        client.fragment_id = fragment_id
+        client.widget_states.widgets.extend(self.values.values())
+        if trigger is not None:
+            client.widget_states.widgets.add(id=trigger, trigger_value=True)
+        self.json = []
+        start = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+        errors = await asyncio.wait_for(self._until_finished(), self.timeout)
+        seconds = time.perf_counter() - start
+        if errors:
+            raise RuntimeError('; '.join(errors))
+        return seconds
+
+
+async def visitor(url, start, rounds, lazy, think, timeout):
+    """One simulated visitor; returns [(action, seconds)] and the error, if any."""
+    latencies = []
+    page = Session(url, 'lazy=1' if lazy else '', timeout)
+    await start.wait()
+    try:
+        opened = time.perf_counter()
+        await page.connect()
+        await page.rerun()
+        latencies.append(('open', time.perf_counter() - opened))
+        if lazy:
+            lower_row = page.widgets[LOWER_ROW_KEY]
+            expand = WidgetState(id=lower_row['id'], bool_value=True)
+            latencies.append(('open_lower_row', await page.rerun([expand])))
+        for _ in range(rounds):
+            await asyncio.sleep(think)
+            button = page.widgets[VIEW_BUTTON]
+            latencies.append(('toggle_view', await page.rerun(
+                trigger=button['id'], fragment_id=button['fragment_id'])))
+            focus = page.widgets[FOCUS_KEY]
+            options = [o for o in focus['options'] if o != CUSTOM_FOCUS]
+            # every entry once, starting after the current one so each is a change
+            for option in options[1:] + options[:1]:
+                await asyncio.sleep(think)
+                choice = WidgetState(id=focus['id'], string_value=option)
+                latencies.append(('select_focus', await page.rerun([choice], fragment_id=focus['fragment_id'])))
+    except Exception as exc:  # reported per level, the other sessions carry on
+        return latencies, f"{type(exc).__name__}: {exc}"
+    finally:
+        await page.close()
+    return latencies, None
+
+
+async def _sessions(url, sessions, rounds, lazy, think, timeout):
+    start = asyncio.Event()
+    tasks = [asyncio.ensure_future(visitor(url, start, rounds, lazy, think, timeout)) for _ in range(sessions)]
+    start.set()
+    return await asyncio.gather(*tasks)
+
+
+async def _debug_stats(url, timeout):
+    page = Session(url, 'debug=1', timeout)
+    await page.connect()
+    try:
+        await page.rerun()
+    finally:
+        await page.close()
+    return json.loads(page.json[-1])
+
+
+def figure_cache_stats(server, timeout):
+    """The figure cache's counters, as a ``?debug=1`` session shows them."""
+    return asyncio.run(_debug_stats(server.url, timeout))
+
+
+def _cache_delta(before, after, probe):
+    """Hits and misses of a level: ``after - before`` minus what one debug run adds.
+
+    ``before`` is None on a fresh server, where every counter starts at zero
+    and no debug run came before the level.
+    """
+    counts = {}
+    for counter in ('hits', 'misses'):
+        own = probe[counter] - after[counter]
+        counts[counter] = after[counter] - own - (before[counter] if before else 0)
+    total = counts['hits'] + counts['misses']
+    return {**counts, 'hit_rate': counts['hits'] / total if total else 0.0}
+
+
+def _section_delta(before, after):
+    sections = {}
+    for name, (count, total) in after.items():
+        count0, total0 = before.get(name, (0, 0.0))
+        if count > count0:
+            sections[name] = {'count': count - count0, 'mean_s': (total - total0) / (count - count0)}
+    return sections
+
+
+def _percentiles(seconds):
+    values = np.percentile(seconds, PERCENTILES) if seconds else [float('nan')] * len(PERCENTILES)
+    return {f'p{p}_s': float(v) for p, v in zip(PERCENTILES, values)}
+
+
+def run_level(server, sessions, rounds, lazy, think, timeout, fresh):
+    """One concurrency level against ``server``; ``fresh`` if nothing has run on it yet."""
+    cache_before = None if fresh else figure_cache_stats(server, timeout)
+    sections_before = server.sections()
+    rss_before = server.rss()
+    start = time.perf_counter()
+    with RssSampler(server) as rss:
+        outcomes = asyncio.run(_sessions(server.url, sessions, rounds, lazy, think, timeout))
+    wall = time.perf_counter() - start
+    rss_after = server.rss()
+    sections = _section_delta(sections_before, server.sections())
+    cache_after = figure_cache_stats(server, timeout)
+    cache = _cache_delta(cache_before, cache_after, figure_cache_stats(server, timeout))
+
+    latencies = [entry for entry_list, _ in outcomes for entry in entry_list]
+    by_action = defaultdict(list)
+    for action, seconds in latencies:
+        by_action[action].append(seconds)
+    everything = [seconds for _, seconds in latencies]
+    return {
+        'sessions': sessions,
+        'reruns': len(latencies),
+        'errors': [error for _, error in outcomes if error],
+        'wall_s': wall,
+        'reruns_per_s': len(latencies) / wall if wall else 0.0,
+        **_percentiles(everything),
+        'max_s': max(everything, default=float('nan')),
+        'actions': {action: {'reruns': len(s), **_percentiles(s)} for action, s in by_action.items()},
+        'peak_rss_mb': rss.peak / 2 ** 20,
+        'rss_growth_mb': (rss_after - rss_before) / 2 ** 20,
+        'figure_cache': cache,
+        'sections': sections,
+    }
+
+
+def run(levels, rounds=1, lazy=False, think=0.0, timeout=120, cold=False):
+    results = []
+    server = None
+    try:
+        for sessions in levels:
+            fresh = server is None or cold
+            if fresh:
+                if server is not None:
+                    server.stop()
+                server = Server(timeout)
+            print(f"{sessions} concurrent sessions ...", file=sys.stderr)
+            results.append(run_level(server, sessions, rounds, lazy, think, timeout, fresh))
+    finally:
+        if server is not None:
+            server.stop()
+    return {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'streamlit': st.__version__,
+            'rounds': rounds, 'lazy': lazy, 'think_s': think, 'cold': cold,
+            'figure_workers': os.environ.get('GIRAI_FIGURE_WORKERS', ''),
+        },
+        'results': results,
+    }
+
+
+def print_table(report):
+    print(f"{'sessions':>8}{'reruns':>8}{'errors':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+          f"{'rerun/s':>9}{'peak MB':>9}{'+MB':>7}{'fig hit':>9}")
+    for r in report['results']:
+        print(f"{r['sessions']:>8}{r['reruns']:>8}{len(r['errors']):>8}{r['p50_s'] * 1e3:>9.0f}"
+              f"{r['p95_s'] * 1e3:>9.0f}{r['p99_s'] * 1e3:>9.0f}{r['max_s'] * 1e3:>9.0f}{r['reruns_per_s']:>9.1f}"
+              f"{r['peak_rss_mb']:>9.0f}{r['rss_growth_mb']:>7.0f}{r['figure_cache']['hit_rate']:>9.1%}")
+        for action, a in r['actions'].items():
+            print(f"{'':>8}  {action:<22}{a['reruns']:>6}{a['p50_s'] * 1e3:>9.0f}{a['p95_s'] * 1e3:>9.0f}"
+                  f"{a['p99_s'] * 1e3:>9.0f}")
+        for error in r['errors']:
+            print(f"{'':>8}  error: {error}")
+
+
+def compare_reports(old_path, new_path):
+    with open(old_path) as f:
+        old = {r['sessions']: r for r in json.load(f)['results']}
+    with open(new_path) as f:
+        new = json.load(f)['results']
+    print(f"{'sessions':>8}{'metric':>14}{'old':>11}{'new':>11}{'ratio':>8}")
+    for r in new:
+        before = old.get(r['sessions'])
+        if before is None:
+            continue
+        for metric in ('p50_s', 'p95_s', 'p99_s', 'peak_rss_mb'):
+            ratio = r[metric] / before[metric] if before[metric] else float('nan')
+            print(f"{r['sessions']:>8}{metric:>14}{before[metric]:>11.3f}{r[metric]:>11.3f}{ratio:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the dashboard with concurrent headless sessions.")
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 4, 16],
+                        help="concurrency levels, run in order")
+    parser.add_argument('--rounds', type=int, default=1, help="interaction rounds per session")
+    parser.add_argument('--lazy', action='store_true', help="open sessions with ?lazy=1 and expand the second row")
+    parser.add_argument('--think', type=float, default=0.0, help="seconds between a session's interactions")
+    parser.add_argument('--timeout', type=float, default=120, help="seconds before a rerun counts as failed")
+    parser.add_argument('--cold', action='store_true', help="start a fresh server for each level")
+    parser.add_argument('--output', default='load_results.json')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'),
+                        help="compare two result files instead of running")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare_reports(*args.compare)
+        return
+    report = run(args.sessions, args.rounds, args.lazy, args.think, args.timeout, args.cold)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print_table(report)
+    print(f"wrote {args.output}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Memory and speed of the compact frames against the previous representation.
+
+``loader.SCHEMA`` stores repeated labels as categoricals and the per-area
+scores as float32. Before that schema, every label was an object column of
+Python strings and every score was float64. For the bundled workbook and
+for synthetic datasets, this report prints the deep memory of both
+representations, per sheet or per column. It also times the aggregates that
+filter, merge and group on those columns.
+
+    python -m benchmarks.memory_report --entities 10000 100000 --columns
+"""
+import argparse
+import os
+import shutil
+import tempfile
+
+from benchmarks import timing
+from girai import aggregates, countries, loader, synthetic
+
+
+def previous_representation(df, sheet):
+    """``df`` with the ``loader.SCHEMA`` casts undone."""
+    schema = loader.SCHEMA[sheet]
+    return df.astype({
+        col: object if dtype == 'category' else 'float64' for col, dtype in schema.items()
+    })
+
+
+def report(label, dataset, show_columns):
+    frames = {'Rankings and Scores': dataset.rankings_df, 'Data': dataset.data_df}
+    before = {sheet: previous_representation(df, sheet) for sheet, df in frames.items()}
+
+    print(f"\n{label}")
+    print(f"  {'':<28}{'rows':>10}{'before MB':>12}{'after MB':>12}{'ratio':>8}")
+    for sheet, df in frames.items():
+        old = before[sheet].memory_usage(deep=True, index=False)
+        new = df.memory_usage(deep=True, index=False)
+        print(f"  {sheet:<28}{len(df):>10}{old.sum() / 1e6:>12.2f}{new.sum() / 1e6:>12.2f}"
+              f"{old.sum() / new.sum():>8.1f}x")
+        if show_columns:
+            for col in df.columns:
+                print(f"    {col:<26}{str(df[col].dtype):>10}{old[col] / 1e6:>12.2f}{new[col] / 1e6:>12.2f}"
+                      f"{old[col] / new[col]:>8.1f}x")
+
+    print(f"  {'':<28}{'':>10}{'before ms':>12}{'after ms':>12}")
+    for name, fn in [('aggregate.development', aggregates.development_stats),
+                     ('aggregate.regional', aggregates.regional_stats)]:
+        old = timing.best(lambda: fn(before['Rankings and Scores']))
+        new = timing.best(lambda: fn(dataset.rankings_df))
+        print(f"  {name:<28}{'':>10}{old * 1e3:>12.2f}{new * 1e3:>12.2f}")
+    old = timing.best(lambda: aggregates.thematic_by_development(before['Rankings and Scores'], before['Data']))
+    new = timing.best(lambda: aggregates.thematic_by_development(dataset.rankings_df, dataset.data_df))
+    print(f"  {'aggregate.thematic':<28}{'':>10}{old * 1e3:>12.2f}{new * 1e3:>12.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare memory of the compact and previous frame layouts.")
+    parser.add_argument('--entities', type=int, nargs='*', default=[10000], help="synthetic dataset sizes")
+    parser.add_argument('--columns', action='store_true', help="break memory down per column")
+    args = parser.parse_args()
+
+    report(loader.DATA_PATH, loader.load_data(), args.columns)
+    tmp = tempfile.mkdtemp()
+    try:
+        for entities in args.entities:
+            path = synthetic.write(*synthetic.generate(entities), os.path.join(tmp, f'synthetic_{entities}'), 'parquet')
+            metadata = countries.load_metadata(os.path.join(path, 'country_metadata.csv'))
+            report(f"synthetic, {entities} entities", loader.load_data(path, metadata), args.columns)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""Per-worker memory with private vs. shared dataset loading.
+
+Starts N worker processes that each load the same dataset, either
+privately through ``loader.load_data`` or through ``shared.load_data``
+(memory-mapped from a shared directory), and reports every worker's load
+time plus its private and shared resident memory from
+``/proc/self/smaps_rollup`` (Linux only).
+
+    python -m benchmarks.shared_memory --workers 1 4 8 --entities 100000
+"""
+import argparse
+import multiprocessing
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+from girai import countries, loader, shared, synthetic
+
+
+def memory_kb():
+    """(private, shared) resident kB of this process."""
+    fields = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1])
+    private = fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)
+    return private, fields.get('Shared_Clean', 0) + fields.get('Shared_Dirty', 0)
+
+
+def _worker(mode, path, metadata_path, shm_dir, cache_dir, start, results):
+    metadata = countries.load_metadata(metadata_path)
+    before, _ = memory_kb()
+    start.wait()
+    t0 = time.perf_counter()
+    if mode == 'shared':
+        dataset = shared.load_data(path, metadata, shm_dir=shm_dir, cache_dir=cache_dir)
+    else:
+        dataset = loader.load_data(path, metadata, cache_dir=cache_dir)
+    # touch every column, as rendering would
+    for df in (dataset.rankings_df, dataset.data_df):
+        for col in df.columns:
+            df[col].iloc[-1]
+    seconds = time.perf_counter() - t0
+    private, shared_kb = memory_kb()
+    results.put((seconds, private - before, shared_kb))
+
+
+def run(mode, workers, path, metadata_path, shm_dir, cache_dir):
+    ctx = multiprocessing.get_context('spawn')
+    start, results = ctx.Event(), ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(mode, path, metadata_path, shm_dir, cache_dir, start, results))
+             for _ in range(workers)]
+    for p in procs:
+        p.start()
+    time.sleep(1.0)
+    start.set()
+    rows = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-worker memory of private vs. shared loading.")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4])
+    parser.add_argument('--entities', type=int, default=50000, help="synthetic dataset size (0 = bundled workbook)")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    try:
+        if args.entities:
+            path = synthetic.write(*synthetic.generate(args.entities), os.path.join(tmp, 'synthetic'), 'parquet')
+            metadata_path = os.path.join(path, 'country_metadata.csv')
+        else:
+            path, metadata_path = loader.DATA_PATH, countries.METADATA_PATH
+        cache_dir = os.path.join(tmp, 'cache')
+        # warm the snapshot cache so both modes start from the same place
+        loader.load_data(path, countries.load_metadata(metadata_path), cache_dir=cache_dir)
+
+        print(f"{'mode':<9}{'workers':>8}{'load p50 (s)':>14}{'private MB/worker':>19}{'shared MB/worker':>18}")
+        for mode in ('private', 'shared'):
+            for n in args.workers:
+                shm_dir = os.path.join(tmp, f'shm-{n}')
+                rows = run(mode, n, path, metadata_path, shm_dir, cache_dir)
+                print(f"{mode:<9}{n:>8}{statistics.median(r[0] for r in rows):>14.3f}"
+                      f"{statistics.mean(r[1] for r in rows) / 1024:>19.1f}"
+                      f"{statistics.mean(r[2] for r in rows) / 1024:>18.1f}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""Compare reading the workbook through openpyxl, the streaming reader and the Arrow snapshots.
+
+Run from the repository root:
+
+    python -m benchmarks.snapshot_load [--repeat 5]
+"""
+import argparse
+import statistics
+import tempfile
+
+import pandas as pd
+
+from benchmarks import timing
+from girai import snapshot, xlsx_stream
+
+WORKBOOK = "data/GIRAI_2024_Edition_Data.xlsx"
+SHEETS = ["Rankings and Scores", "Data"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--workbook", default=WORKBOOK)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        xlsx = timing.runs(lambda: pd.read_excel(args.workbook, sheet_name=SHEETS), args.repeat)
+        stream = timing.runs(lambda: xlsx_stream.read_workbook(args.workbook, dict.fromkeys(SHEETS)), args.repeat)
+        cold = timing.runs(lambda: snapshot.read_sheets(args.workbook, SHEETS, cache_dir), 1)
+        warm = timing.runs(lambda: snapshot.read_sheets(args.workbook, SHEETS, cache_dir), args.repeat)
+
+    print(f"{'path':<22}{'median (ms)':>12}{'min (ms)':>12}")
+    results = [
+        ("xlsx (openpyxl)", xlsx),
+        ("xlsx (stream)", stream),
+        ("snapshot build", cold),
+        ("snapshot (mmap)", warm),
+    ]
+    for label, runs in results:
+        print(f"{label:<22}{statistics.median(runs) * 1e3:>12.1f}{min(runs) * 1e3:>12.1f}")
+    print(f"speedup: {statistics.median(xlsx) / statistics.median(warm):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
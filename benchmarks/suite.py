@@ -0,0 +1,215 @@
+"""Headless benchmark suite for the load, aggregate and render paths.
+
+Times, for the bundled workbook, for copies scaled up in rows and for
+synthetic datasets of a given entity count (``girai.synthetic``):
+
+* ``load.*``      - cold load (xlsx parse + snapshot build) and warm load
+                    (memory-mapped snapshot) through ``loader.load_data``
+* ``aggregate.*`` - each derived table in ``girai.aggregates``
+* ``figure.*``    - construction and JSON serialization of every figure
+
+No browser, Streamlit server or network is involved. Results are written
+as JSON so runs from different commits can be compared:
+
+    python -m benchmarks.suite --scales 1 10 --output bench_results.json
+    python -m benchmarks.suite --scales 1 --synthetic 10000 100000
+    python -m benchmarks.suite --compare old.json new.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+import plotly
+import plotly.io as pio
+
+from benchmarks import timing
+from girai import aggregates, countries, figures, loader, lookup, similarity, synthetic
+
+WORKBOOK = loader.DATA_PATH
+
+
+def scaled_copy(path, factor, dest_dir, metadata):
+    """Write ``path`` with every country replicated ``factor`` times.
+
+    Copies are named '<Country> #k' / '<ISO3>k' and get the same metadata
+    rows, so every aggregate and figure does ``factor`` times the work.
+    Returns (workbook path, scaled metadata).
+    """
+    sheets = pd.read_excel(path, sheet_name=list(loader.SHEET_COLUMNS))
+    out = os.path.join(dest_dir, f"scaled_x{factor}.xlsx")
+
+    def replicate(df, country_col):
+        is_country = df[country_col].map(lambda v: isinstance(v, str))
+        copies = [df]
+        for k in range(1, factor):
+            copy = df[is_country].copy()
+            copy[country_col] = copy[country_col] + f" #{k}"
+            copy['ISO3'] = copy['ISO3'] + str(k)
+            copies.append(copy)
+        return pd.concat(copies, ignore_index=True)
+
+    rankings = replicate(sheets['Rankings and Scores'][loader.SHEET_COLUMNS['Rankings and Scores']], 'Country')
+    data = replicate(sheets['Data'][loader.SHEET_COLUMNS['Data']], 'country')
+    with pd.ExcelWriter(out) as writer:
+        rankings.to_excel(writer, sheet_name='Rankings and Scores', index=False)
+        data.to_excel(writer, sheet_name='Data', index=False)
+
+    meta_copies = [metadata]
+    for k in range(1, factor):
+        copy = metadata.copy()
+        copy.index = copy.index + f" #{k}"
+        meta_copies.append(copy)
+    return out, pd.concat(meta_copies)
+
+
+def bench_dataset(label, path, metadata, repeat, cache_dir):
+    results = []
+
+    def add(stage, runs, rows):
+        results.append({
+            'dataset': label, 'stage': stage, 'rows': rows, 'repeat': len(runs),
+            'median_s': statistics.median(runs), 'min_s': min(runs),
+        })
+
+    cold = timing.runs(lambda: loader.load_data(path, metadata, cache_dir=cache_dir), 1)
+    dataset = loader.load_data(path, metadata, cache_dir=cache_dir)
+    rows = len(dataset.data_df)
+    add('load.cold', cold, rows)
+    add('load.warm', timing.runs(lambda: loader.load_data(path, metadata, cache_dir=cache_dir), repeat), rows)
+
+    rankings_df, data_df = dataset.rankings_df, dataset.data_df
+    add('aggregate.development', timing.runs(lambda: aggregates.development_stats(rankings_df), repeat), rows)
+    add('aggregate.regional', timing.runs(lambda: aggregates.regional_stats(rankings_df), repeat), rows)
+    add('aggregate.thematic',
+        timing.runs(lambda: aggregates.thematic_by_development(rankings_df, data_df), repeat), rows)
+    thematic = aggregates.thematic_by_development(rankings_df, data_df)[0]
+    add('aggregate.thematic_intervals',
+        timing.runs(lambda: aggregates.thematic_intervals(rankings_df, data_df, thematic), repeat), rows)
+
+    aggs = aggregates.compute_aggregates(rankings_df, data_df)
+    # a drill-down step: the regions of the first status, one country's scores
+    scores_cube = aggs['cube']
+    status = scores_cube.labels(1)[0]
+    region = scores_cube.labels(2, [status])[0]
+    country = scores_cube.labels(3, [status, region])[0]
+    add('cube.table', timing.runs(lambda: scores_cube.table(2, path=[status]), repeat), rows)
+    add('cube.indicators', timing.runs(lambda: scores_cube.indicators([status, region, country]), repeat), rows)
+    add('similarity.build', timing.runs(lambda: similarity.SimilarityIndex(data_df), repeat), rows)
+    similarity_index = similarity.SimilarityIndex(data_df)
+    add('similarity.query', timing.runs(lambda: similarity_index.similar(country, 5), repeat), rows)
+    index = lookup.CountryIndex(rankings_df)
+    short_names = metadata['short_name'].dropna().to_dict()
+    colors = countries.colors(metadata)
+    focus = next(iter(countries.load_focus_groups().values()))
+    builders = {
+        'map': lambda: figures.map_figure(rankings_df, False),
+        'map_highlight': lambda: figures.map_figure(rankings_df, True, short_names),
+        'development': lambda: figures.development_figure(aggs['dev_points'], aggs['dev_stats']),
+        'regional': lambda: figures.regional_figure(aggs['regional']),
+        'heatmap': lambda: figures.heatmap_figure(aggs['thematic'], aggs['thematic_count'], aggs['thematic_total'],
+                                                  aggs['thematic_ci_low'], aggs['thematic_ci_high']),
+        'spider': lambda: figures.spider_figure(index.metrics(focus, figures.SPIDER_CATEGORIES), colors),
+    }
+    for kind, build in builders.items():
+        add(f'figure.{kind}.build', timing.runs(build, repeat), rows)
+        fig = build()
+        add(f'figure.{kind}.to_json', timing.runs(lambda: pio.to_json(fig, validate=False), repeat), rows)
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def synthetic_copy(entities, dest_dir):
+    """Write a seeded synthetic Parquet dataset; returns (directory, metadata)."""
+    out = synthetic.write(*synthetic.generate(entities), os.path.join(dest_dir, f"synthetic_{entities}"), 'parquet')
+    return out, countries.load_metadata(os.path.join(out, 'country_metadata.csv'))
+
+
+def run(scales, repeat, workbook=WORKBOOK, synthetic_entities=()):
+    metadata = countries.load_metadata()
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        datasets = [(f'x{factor}' if factor != 1 else 'bundled', factor) for factor in scales]
+        datasets += [(f'syn{entities}', entities) for entities in synthetic_entities]
+        for label, n in datasets:
+            if label == 'bundled':
+                path, meta = workbook, metadata
+            elif label.startswith('syn'):
+                path, meta = synthetic_copy(n, tmp)
+            else:
+                path, meta = scaled_copy(workbook, n, tmp, metadata)
+            print(f"benchmarking {label} ...", file=sys.stderr)
+            results += bench_dataset(label, path, meta, repeat, os.path.join(tmp, f'cache-{label}'))
+    return {
+        'meta': {
+            'commit': _git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'pandas': pd.__version__,
+            'plotly': plotly.__version__,
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def print_table(report):
+    print(f"{'dataset':<10}{'stage':<34}{'rows':>10}{'median (ms)':>14}")
+    for r in report['results']:
+        print(f"{r['dataset']:<10}{r['stage']:<34}{r['rows']:>10}{r['median_s'] * 1e3:>14.2f}")
+
+
+def compare_reports(old_path, new_path):
+    with open(old_path) as f:
+        old = {(r['dataset'], r['stage']): r for r in json.load(f)['results']}
+    with open(new_path) as f:
+        new = json.load(f)['results']
+    print(f"{'dataset':<10}{'stage':<34}{'old (ms)':>11}{'new (ms)':>11}{'ratio':>8}")
+    for r in new:
+        before = old.get((r['dataset'], r['stage']))
+        if before is None:
+            continue
+        ratio = r['median_s'] / before['median_s'] if before['median_s'] else float('nan')
+        print(f"{r['dataset']:<10}{r['stage']:<34}{before['median_s'] * 1e3:>11.2f}"
+              f"{r['median_s'] * 1e3:>11.2f}{ratio:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark GIRAI load, aggregate and render paths.")
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10],
+                        help="row multipliers to benchmark (1 = bundled workbook)")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--workbook', default=WORKBOOK)
+    parser.add_argument('--synthetic', type=int, nargs='*', default=[], metavar='ENTITIES',
+                        help="also benchmark synthetic datasets with this many entities")
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'),
+                        help="compare two result files instead of running")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare_reports(*args.compare)
+        return
+    report = run(args.scales, args.repeat, args.workbook, args.synthetic)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print_table(report)
+    print(f"wrote {args.output}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
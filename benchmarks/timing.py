@@ -0,0 +1,17 @@
+"""Timing helpers shared by the benchmark scripts."""
+import time
+
+
+def runs(fn, repeat):
+    """Wall-clock seconds of ``repeat`` calls of ``fn``, one per call."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def best(fn, repeat=5):
+    """The fastest of ``repeat`` calls of ``fn``, in seconds."""
+    return min(runs(fn, repeat))
@@ -1,11 +1,13 @@
+import os
+
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-import numpy as np
 import seaborn as sns
 import matplotlib.pyplot as plt
 
+from girai import (aggregates, compare, countries, cube, dictionary, figures, geometry, loader, lookup,
+                   profiling, registry, render, similarity, snapshot)
+
 #page config
 st.set_page_config(layout="wide", page_title="Responsible AI Data Visualization Challenge Dashboard")
 #title
@@ -65,42 +67,185 @@ st.markdown(
 
 st.markdown('<hr style="border: 1px solid grey;"/>', unsafe_allow_html=True)
 
+# section timings for this rerun; aggregates are process-wide (see girai/profiling.py)
+@st.cache_resource
+def get_profiler():
+    profiler = profiling.Profiler()
+    if os.environ.get("GIRAI_METRICS_PORT"):
+        profiling.start_metrics_server(profiler, int(os.environ["GIRAI_METRICS_PORT"]))
+    return profiler
+
+run_timer = profiling.RunTimer(get_profiler())
+
+def fragment_timer():
+    # a fragment rerunning on its own is a run of its own; it must not record
+    # into the timer of the finished full run that defined it
+    return profiling.RunTimer(run_timer.profiler) if run_timer.finished else run_timer
+
 #data
 @st.cache_data
-def load_data():
-    rankings_df = pd.read_excel('data/GIRAI_2024_Edition_Data.xlsx', sheet_name='Rankings and Scores')
-    data_df = pd.read_excel('data/GIRAI_2024_Edition_Data.xlsx', sheet_name='Data')
-    
-    #preprocessing
-    numeric_columns = ['Index score', 'ta_score', 'fr_weighted_score',
-                      'ga_weighted_score', 'nsa_weighted_score']
-    
-    for col in numeric_columns:
-        if col in rankings_df.columns:
-            rankings_df[col] = pd.to_numeric(rankings_df[col], errors='coerce')
-        if col in data_df.columns:
-            data_df[col] = pd.to_numeric(data_df[col], errors='coerce')
-    
-    rankings_df.fillna(0, inplace=True)
-    data_df.fillna(0, inplace=True)
-    
-    # development status
-    development_status = {
-        'Developed': ['Netherlands', 'United States of America', 'Germany', 'United Kingdom', 'Japan',
-                     'France', 'Canada', 'Australia', 'Sweden', 'Switzerland'],
-        'Developing': ['China', 'India', 'Brazil', 'Mexico', 'Indonesia', 'Turkey',
-                      'Thailand', 'Malaysia', 'South Africa'],
-        'Underdeveloped': ['Afghanistan', 'Yemen', 'Sudan', 'Ethiopia', 'Mali', 'Niger',
-                           'Burkina Faso', 'Uganda', 'Tanzania', 'Madagascar']
+def load_country_metadata():
+    return countries.load_metadata(), countries.load_focus_groups()
+
+# every workbook under data/ is an edition, loaded on first use and kept in a
+# memory-bounded LRU shared by all sessions (see girai/registry.py)
+@st.cache_resource
+def get_edition_registry():
+    metadata, _ = load_country_metadata()
+    return registry.EditionRegistry(metadata=metadata)
+
+editions = get_edition_registry()
+if len(editions.names()) > 1:
+    selected_edition = st.selectbox("GIRAI Edition", options=editions.names(), index=0)
+else:
+    selected_edition = editions.default
+
+# derived tables are computed once per version of the sheets they read, so an
+# edit to 'Data' recomputes the thematic table but not the regional one
+@st.cache_data(max_entries=32)
+def load_aggregate_group(group, input_version, _rankings_df, _data_df):
+    return aggregates.compute_group(group, _rankings_df, _data_df)
+
+# Country/ISO3-indexed rankings for constant-time lookups
+@st.cache_resource(max_entries=8)
+def load_country_index(rankings_version, _rankings_df):
+    return lookup.CountryIndex(_rankings_df)
+
+# nearest countries by thematic-area profile, built once per version of the
+# 'Data' sheet when the spider chart first asks for them (see girai/similarity.py)
+@st.cache_resource(max_entries=8)
+def load_similarity_index(data_version, _data_df):
+    return similarity.SimilarityIndex(_data_df)
+
+with run_timer.section('data_load'):
+    # one stat per loaded workbook plus one for data/; edited sheets are
+    # re-ingested in place and added or removed workbooks picked up
+    editions.refresh([selected_edition])
+    if selected_edition not in editions.names():
+        # its workbook was removed; the selectbox falls back to the newest edition
+        st.rerun()
+    dataset = editions.get(selected_edition)
+    rankings_df, data_df = dataset.rankings_df, dataset.data_df
+    sheet_versions = loader.sheet_versions(dataset)
+    rankings_version = sheet_versions['Rankings and Scores']
+    input_versions = {
+        group: aggregates.input_version(group, sheet_versions) for group in aggregates.DEPENDENCIES
     }
-    
-    rankings_df['Development_Status'] = 'Other'
-    for status, countries in development_status.items():
-        rankings_df.loc[rankings_df['Country'].isin(countries), 'Development_Status'] = status
-    
-    return rankings_df, data_df
+    country_metadata, focus_groups = load_country_metadata()
+    country_index = load_country_index(rankings_version, rankings_df)
+
+# finished figures are shared across reruns and sessions (see girai/figures.py)
+@st.cache_resource
+def get_figure_cache():
+    return figures.FigureCache()
+
+figure_cache = get_figure_cache()
+
+# indicator definitions from the workbook's Dictionary sheet, for the chart
+# title tooltips and the search below; parsed once per version of the sheet
+# and then read from the snapshot cache (see girai/dictionary.py)
+@st.cache_resource(max_entries=8)
+def load_indicator_dictionary(path, signature):
+    return dictionary.load_dictionary(path)
+
+edition_path = editions.paths[selected_edition]
+try:
+    dictionary_signature = snapshot.file_signature(edition_path)
+except FileNotFoundError:
+    # removed since the refresh above; the rerun drops it from the editions
+    st.rerun()
+indicators = load_indicator_dictionary(edition_path, dictionary_signature)
+
+def definitions(*columns, sheet='Rankings and Scores'):
+    # tooltip text for the columns a chart plots; None when none are documented
+    lines = []
+    for column in columns:
+        entry = indicators.define(column, sheet)
+        if entry is not None:
+            lines.append(f"**{column}**: {dictionary.describe(entry)}")
+    return "\n\n".join(lines) or None
+
+def aggregate(group):
+    # computed on first use, so charts that are never rendered cost nothing
+    return load_aggregate_group(group, input_versions[group], rankings_df, data_df)
+
+# each chart below is a fragment: a widget inside one (the map view button,
+# the focus selectbox) reruns only that chart. With ?lazy=1 (or
+# GIRAI_LAZY_CHARTS=1) the second row sits in an expander and is neither
+# computed nor sent until it is opened.
+lazy_charts = bool(st.query_params.get("lazy")) or os.environ.get("GIRAI_LAZY_CHARTS") == "1"
+
+# figure_cache.get arguments per chart, shared by the sections and the prefetch below
+def map_request(highlight_view):
+    # the project's simplified outlines when they have been built (see girai/geometry.py)
+    map_geometry = None
+    if st.get_option("server.enableStaticServing"):
+        map_geometry = geometry.for_view('highlight' if highlight_view else 'global')
+    return (
+        'map', rankings_version, (highlight_view, map_geometry),
+        lambda: figures.map_figure(
+            rankings_df, highlight_view, country_metadata['short_name'].dropna().to_dict(), map_geometry
+        )
+    )
+
+def development_request():
+    return (
+        'development', input_versions['development'], None,
+        lambda: figures.development_figure(**aggregate('development'))
+    )
+
+def regional_request():
+    return (
+        'regional', input_versions['regional'], None,
+        lambda: figures.regional_figure(aggregate('regional')['regional'])
+    )
+
+def heatmap_request():
+    def build():
+        thematic = aggregate('thematic')
+        return figures.heatmap_figure(
+            thematic['thematic'], thematic['thematic_count'], thematic['thematic_total'],
+            thematic['thematic_ci_low'], thematic['thematic_ci_high']
+        )
+    return 'heatmap', input_versions['thematic'], None, build
+
+def spider_request(selected_countries):
+    return (
+        'spider', rankings_version, tuple(selected_countries),
+        lambda: figures.spider_figure(
+            country_index.metrics(selected_countries, figures.SPIDER_CATEGORIES),
+            countries.colors(country_metadata)
+        )
+    )
 
-rankings_df, data_df = load_data()
+# with GIRAI_FIGURE_WORKERS=N (N > 1) every chart this run will show is built
+# up front in a pool of worker processes, so the page waits for the slowest
+# figure rather than the sum of all of them; each section then picks up its
+# finished (or in-progress) figure from figure_cache (see girai/render.py);
+# clearing the cache stops the workers, as does the process exiting
+def release_figure_pool(pool):
+    if pool is not None:
+        pool.shutdown()
+
+@st.cache_resource(on_release=release_figure_pool)
+def get_figure_pool():
+    workers = int(os.environ.get("GIRAI_FIGURE_WORKERS", "0"))
+    return render.FigurePool(workers, shm_dir=editions.shm_dir) if workers > 1 else None
+
+figure_pool = get_figure_pool()
+if figure_pool is not None:
+    with run_timer.section('prefetch'):
+        prefetch = [map_request(st.session_state.get("highlight_view", False)), development_request()]
+        if not lazy_charts or st.session_state.get("lower_charts"):
+            prefetch += [regional_request(), heatmap_request()]
+            selected_focus = st.session_state.get("selected_focus", next(iter(focus_groups)))
+            if selected_focus in focus_groups:
+                prefetch.append(spider_request(focus_groups[selected_focus]))
+        figure_cache.prefetch(figure_pool.threads, [
+            (kind, data_version, state,
+             figure_pool.submit(editions.paths[selected_edition], dataset.version, kind, state, run_timer))
+            for kind, data_version, state, _ in prefetch
+        ])
 
 #layout with columns
 col1, col2 = st.columns([2, 1])
@@ -132,99 +277,25 @@ with col1:
             AI Landscape: Measuring Global Preparedness
         </div>
         """,
-        unsafe_allow_html=True
+        unsafe_allow_html=True,
+        help=definitions('Index score')
     )
 
-    if "highlight_view" not in st.session_state:
-        st.session_state.highlight_view = False  
+    @st.fragment
+    def map_section():
+        if "highlight_view" not in st.session_state:
+            st.session_state.highlight_view = False  
 
-    toggle_view = st.button("Change View📌")
-    if toggle_view:
-        st.session_state.highlight_view = not st.session_state.highlight_view
+        toggle_view = st.button("Change View📌")
+        if toggle_view:
+            st.session_state.highlight_view = not st.session_state.highlight_view
 
-    if st.session_state.highlight_view:
+        highlight_view = st.session_state.highlight_view
+        with fragment_timer().section('map'):
+            fig_map = figure_cache.get(*map_request(highlight_view))
 
-        highlight_countries = ['United States of America', 'India', 'Afghanistan']
-        rankings_df['Color'] = rankings_df['Country'].apply(
-            lambda x: 'Highlighted' if x in highlight_countries else 'Normal'
-        )
-
-        color_discrete_map = {
-            'Highlighted': 'gold',
-            'Normal': 'lightgrey'
-        }
-
-        fig_map = px.choropleth(
-            rankings_df,
-            locations='ISO3',
-            color='Color',
-            hover_name='Country',
-            hover_data={'Index score': True, 'Color': False},
-            color_discrete_map=color_discrete_map,
-            projection="natural earth"
-        )
-
-        fig_map.update_geos(
-            center=dict(lat=20, lon=80),
-            projection_scale=2.5
-        )
-
-        india_value = rankings_df.loc[rankings_df['Country'] == 'India', 'Index score'].values[0]
-        usa_value = rankings_df.loc[rankings_df['Country'] == 'United States of America', 'Index score'].values[0]
-        afghanistan_value = rankings_df.loc[rankings_df['Country'] == 'Afghanistan', 'Index score'].values[0]
-
-        fig_map.update_layout(
-            annotations=[
-                dict(
-                    x=0.5, 
-                    y=0.1,
-                    xanchor='center',
-                    yanchor='middle',
-                    text=(
-                        f"<b>Highlighted Countries:</b><br>"
-                        f"<b>India's Index Score:</b> {india_value:.2f}<br>"
-                        f"<b>USA's Index Score:</b> {usa_value:.2f}<br>"
-                        f"<b>Afghanistan's Index Score:</b> {afghanistan_value:.2f}"
-                    ),
-                    showarrow=False,
-                    font=dict(size=14, color="black"),
-                    bgcolor="rgba(255, 255, 255, 0.7)", 
-                    bordercolor="black",
-                    borderwidth=1
-                )
-            ]
-        )
-
-    else:
-
-        fig_map = px.choropleth(
-            rankings_df,
-            locations='ISO3',
-            color='Index score',
-            hover_name='Country',
-            color_continuous_scale='Viridis',
-            projection="natural earth"
-        )
-
-        fig_map.update_geos(
-            center=dict(lat=10, lon=20),
-            projection_scale=1.5
-        )
-
-    fig_map.update_layout(
-        margin=dict(l=0, r=0, t=0, b=0),
-        geo=dict(
-            showframe=False,
-            showcoastlines=True,
-            coastlinecolor="Gray",
-            landcolor="white",
-            oceancolor="lightblue",
-            showocean=True,
-        ),
-        showlegend=False,
-    )
-
-    st.plotly_chart(fig_map, use_container_width=True)
+            st.plotly_chart(fig_map, width="stretch")
+    map_section()
 
 # 2. AI Governance by Development Status
 with col2:
@@ -249,75 +320,27 @@ with col2:
             AI Governance Across Development Stages
         </div>
         """,
-        unsafe_allow_html=True
+        unsafe_allow_html=True,
+        help=definitions('Index score')
     )
 
-    # Filter data
-    filtered_data = rankings_df[rankings_df['Development_Status'].isin(['Developed', 'Developing', 'Underdeveloped'])]
-
-    # Calculate average values
-    avg_values = filtered_data.groupby('Development_Status')['Index score'].mean().reset_index()
+    @st.fragment
+    def development_section():
+        with fragment_timer().section('development'):
+            fig_dev = figure_cache.get(*development_request())
 
-    # Calculate other statistics for hover
-    stats = filtered_data.groupby('Development_Status')['Index score'].agg(['min', 'max', 'median', 'mean']).reset_index()
-
-    # Boxplot
-    fig_dev = px.box(
-        filtered_data,
-        x='Development_Status',
-        y='Index score',
-        color='Development_Status',
-    )
-
-    # Ensure only relevant stats are displayed
-    fig_dev.update_traces(
-        hoverinfo="skip",  
-        hovertemplate=None,  
-        selector=dict(type='box')  
-    )
-
-    # Add average markers with detailed hover info
-    for status, avg in zip(avg_values['Development_Status'], avg_values['Index score']):
-    # Get stats for the current development status
-        stat_row = stats[stats['Development_Status'] == status]
-        min_val, max_val, median_val, mean_val = stat_row[['min', 'max', 'median', 'mean']].values[0]
-    
-        fig_dev.add_trace(
-            go.Scatter(
-                x=[status],
-                y=[avg],
-                mode='markers+text',
-                marker=dict(color='black', size=10),
-                text=[f"Avg: {avg:.2f}"],
-                textposition='top right',
-                textfont=dict(color='white', size=14),
-                hovertemplate=(
-                    'Development Status: %{x}<br>'
-                    'Min: %{customdata[0]:.2f}<br>'
-                    'Max: %{customdata[1]:.2f}<br>'
-                    'Median: %{customdata[2]:.2f}<br>'
-                    'Mean: %{customdata[3]:.2f}<br>'
-                    'Avg: %{y:.2f}<br>'
-                    '<extra></extra>'
-                ),
-                customdata=[[min_val, max_val, median_val, mean_val]]  
-            )
-        )
-        
-    
-    fig_dev.update_layout(
-        showlegend=False,
-        margin=dict(l=0, r=0, t=30, b=0),
-        xaxis_title="Development Status",
-        yaxis_title="Index Score",
-    )
-
-    # Display the chart
-    st.plotly_chart(fig_dev, use_container_width=True)
+            # Display the chart
+            st.plotly_chart(fig_dev, width="stretch")
+    development_section()
 
 
 # Create second row with columns
-col3, col4, col5 = st.columns([1, 1, .75])
+if lazy_charts:
+    lower_row = st.expander("Regional, thematic and focus-country charts", key="lower_charts", on_change="rerun")
+    show_lower_row = lower_row.open
+else:
+    lower_row, show_lower_row = st.container(), True
+col3, col4, col5 = lower_row.columns([1, 1, .75])
 
 # 5. Average AI Governance Scores by Region
 with col5:
@@ -342,57 +365,20 @@ with col5:
             Region-wise Average Index Score
         </div>
         """,
-        unsafe_allow_html=True
+        unsafe_allow_html=True,
+        help=definitions('Index score', 'GIRAI_region')
     )
     st.markdown("<div style='height: 60px;'></div>", unsafe_allow_html=True)
 
-    # Filter data
-    filtered_rankings_df = rankings_df[rankings_df['GIRAI_region'] != 0]
-    regional_avg = filtered_rankings_df.groupby('GIRAI_region')['Index score'].mean()
-    regional_std = filtered_rankings_df.groupby('GIRAI_region')['Index score'].std()
-
-    # Define colors for regions
-    region_colors = {
-        'Europe': 'mediumseagreen', 
-        'North America': 'mediumseagreen',
-        'Asia and Oceania': 'deepskyblue',
-        'Middle East': 'deepskyblue',
-        'South and Central America': 'deepskyblue',
-        'Africa': 'indianred',
-        'Caribbean': 'indianred'
-    }
-
-    # Assign bar colors based on region
-    bar_colors = [region_colors.get(region, 'grey') for region in regional_avg.index]
-
-   
-    # Create bar chart
-    fig_regional = go.Figure()
-    fig_regional.add_trace(
-        go.Bar(
-            x=regional_avg.index,
-            y=regional_avg.values,
-            name='Regional Score',
-            marker=dict(color=bar_colors), 
-            text=np.round(regional_avg.values, 2),  # Text inside the bars
-            textposition='inside',  
-            textfont=dict(color='white', size=14),  
-            hovertemplate='%{x}: %{y:.2f}<extra></extra>'  # Custom hover template (No extra text)
-        )
-    )
+    @st.fragment
+    def regional_section():
+        with fragment_timer().section('regional'):
+            fig_regional = figure_cache.get(*regional_request())
 
-    # Update layout for bar chart
-    
-    fig_regional.update_layout(
-        xaxis_title="Region",
-        yaxis_title="Average Index Score",
-        xaxis_tickangle=45,
-        margin=dict(l=0, r=0, t=30, b=0)
-    )
-
-
-    # Display the chart
-    st.plotly_chart(fig_regional, use_container_width=True)
+            # Display the chart
+            st.plotly_chart(fig_regional, width="stretch")
+    if show_lower_row:
+        regional_section()
 
 # 3. Thematic Focus by Development Status
 with col3:
@@ -417,80 +403,22 @@ with col3:
             Thematic Area Scores by Development Status
         </div>
         """,
-        unsafe_allow_html=True
+        unsafe_allow_html=True,
+        help=definitions('thematic_area', 'ta_score', sheet='Data')
     )
 
     # Add vertical spacing above the heatmap to move it down
     st.markdown("<div style='height: 60px;'></div>", unsafe_allow_html=True)
 
-    # Define thematic areas
-    thematic_areas_to_include = [
-        "Access to Remedy and Redress",
-        "Children's Rights",
-        "Data Protection and Privacy",
-        "Gender Equality",
-        "International Cooperation",
-        "Labour Protection and Right to Work",
-        "National AI Policy",
-        "Public Participation and Awareness",
-        "Responsibility and Accountability",
-        "Transparency and Explainability"
-    ]
-
-    # Filter the data
-    filtered_data = data_df[data_df['thematic_area'].isin(thematic_areas_to_include)]
-
-    # Merge and process the data
-    development_analysis = filtered_data.merge(
-        rankings_df[['Country', 'Development_Status']],
-        left_on='country',
-        right_on='Country'
-    )
-
-    development_analysis = development_analysis[development_analysis['Development_Status'] != "Other"]
-    
-    ordered_status = ['Developed', 'Developing', 'Underdeveloped']
-    development_analysis['Development_Status'] = pd.Categorical(
-        development_analysis['Development_Status'],
-        categories=ordered_status,
-        ordered=True
-    )
-
-    # Pivot table for heatmap
-    thematic_by_development = pd.pivot_table(
-        development_analysis,
-        values='ta_score',
-        index='Development_Status',
-        columns='thematic_area',
-        aggfunc='mean'
-    )
-
-    # Create the heatmap
-    fig_heatmap = go.Figure(data=go.Heatmap(
-        z=thematic_by_development.values,
-        x=thematic_by_development.columns,
-        y=thematic_by_development.index,
-        text=np.round(thematic_by_development.values, 2),
-        texttemplate='%{text}',  # This keeps the text labels in the heatmap
-        textfont={"size": 10},
-        colorscale='RdBu',
-        showscale=True,
-        hoverongaps=False,
-        hovertemplate="Thematic Area: %{x}<br>Development Status: %{y}<br>Score: %{z:.2f}<extra></extra>"  # Removes duplicate z-value
-    ))
-
-    # Update heatmap layout
-    fig_heatmap.update_layout(
-        margin=dict(l=10, r=10, t=30, b=30), 
-        xaxis=dict(
-            title='Thematic Areas',
-            tickangle=45
-        ),
-        height=500,
-    )
+    @st.fragment
+    def heatmap_section():
+        with fragment_timer().section('heatmap'):
+            fig_heatmap = figure_cache.get(*heatmap_request())
 
-    # Display the heatmap
-    st.plotly_chart(fig_heatmap, use_container_width=True)
+            # Display the heatmap
+            st.plotly_chart(fig_heatmap, width="stretch")
+    if show_lower_row:
+        heatmap_section()
 
 
 
@@ -518,88 +446,120 @@ with col4:
             Key Metrics Comparison for Focus Countries
         </div>
         """,
-        unsafe_allow_html=True
+        unsafe_allow_html=True,
+        help=definitions(*figures.SPIDER_CATEGORIES)
     )
 
-    # Dropdown for selecting regional focus
-    focus_options = {
-        "Default Focus (USA, India, Afghanistan)": ['United States of America', 'India', 'Afghanistan'],
-        "European Focus (Netherlands, Poland, Albania)": ['Netherlands', 'Poland', 'Albania'],
-        "Asian Focus (Singapore, China, Myanmar)": ['Singapore', 'China', 'Myanmar'],
-        "Americas Focus (USA, Brazil, Haiti)": ['United States of America', 'Brazil', 'Haiti']
-    }
+    @st.fragment
+    def spider_section():
+        # Dropdown for selecting regional focus
+        focus_options = focus_groups
+        similar_focus = "Similar Countries"
+        custom_focus = "Custom Selection"
     
-    selected_focus = st.selectbox(
-        "Select Regional Focus",
-        options=list(focus_options.keys()),
-        index=0  # Default selection
-    )
+        selected_focus = st.selectbox(
+            "Select Regional Focus",
+            options=list(focus_options.keys()) + [similar_focus, custom_focus],
+            index=0,  # Default selection
+            key="selected_focus"
+        )
     
-    selected_countries = focus_options[selected_focus]
-
-    # Categories for the spider chart
-    categories = ['Index score', 'PILLAR SCORES', 'DIMENSION SCORES']
-    category_aliases = ['Index Score', 'Pillar Score', 'Dimension Score']
-
-    # Colors for countries (can expand if needed)
-    country_colors = {
-        'United States of America': 'red',
-        'India': 'blue',
-        'Afghanistan': 'yellow',
-        'Netherlands': 'orange',
-        'Poland': 'purple',
-        'Albania': 'pink',
-        'Singapore': 'cyan',
-        'China': 'green',
-        'Myanmar': 'magenta',
-        'Brazil': 'gold',
-        'Haiti': 'brown'
-    }
-
-    # Create the spider chart
-    fig_spider = go.Figure()
-
-    for country in selected_countries:
-        if country in rankings_df['Country'].values:
-            values = rankings_df[rankings_df['Country'] == country][categories].values[0]
-
-            fig_spider.add_trace(go.Scatterpolar(
-                r=values,
-                theta=category_aliases,
-                name=country,
-                fill='toself',
-                line=dict(color=country_colors.get(country, 'grey')),
-                mode='lines+markers+text',
-                text=[f"{val:.1f}" for val in values],  
-                textposition="top center", 
-                textfont=dict(color='white', size=12)  
-            ))
+        if selected_focus == similar_focus:
+            # a country and its nearest countries by thematic-area scores
+            similarity_index = load_similarity_index(sheet_versions['Data'], data_df)
+            anchors = [c for c in similarity_index.countries if c in country_index]
+            default_anchor = next(iter(focus_options.values()))[0]
+            similar_cols = st.columns([3, 1])
+            anchor = similar_cols[0].selectbox(
+                "Country",
+                options=anchors,
+                index=anchors.index(default_anchor) if default_anchor in anchors else 0,
+                key="similar_country"
+            )
+            neighbour_count = similar_cols[1].number_input(
+                "Similar countries", min_value=1, max_value=similarity.K_MAX, value=3, key="similar_count"
+            )
+            matches = similarity_index.similar(anchor, neighbour_count)
+            selected_countries = [anchor] + [match.country for match in matches]
+            st.caption(
+                "Closest by thematic-area scores (RMS difference in standard deviations): "
+                + ", ".join(f"{match.country} ({match.distance:.2f})" for match in matches)
+            )
+        elif selected_focus == custom_focus:
+            selected_countries = st.multiselect(
+                "Countries to compare",
+                options=country_index.countries,
+                default=next(iter(focus_options.values()))
+            )
+        else:
+            selected_countries = focus_options[selected_focus]
+
+        with fragment_timer().section('spider'):
+            fig_spider = figure_cache.get(*spider_request(selected_countries))
+
+            # Render the chart
+            st.plotly_chart(fig_spider, width="stretch")
+    if show_lower_row:
+        spider_section()
+
+
+
+# drill-down from development status to region to country to the individual
+# scores, read from the pre-aggregated cube (see girai/cube.py)
+drill = st.expander("Drill down: status, region, country", key="drill_down", on_change="rerun")
+if drill.open:
+    with drill:
+        scores_cube = aggregate('thematic')['cube']
+        drill_cols = st.columns(4)
+        selected_score = drill_cols[0].selectbox("Score", options=scores_cube.measures, index=0)
+        path = []
+        levels = [("Development status", "All statuses"), ("Region", "All regions"), ("Country", "All countries")]
+        for depth, (col, (label, everything)) in enumerate(zip(drill_cols[1:], levels), 1):
+            options = scores_cube.labels(depth, path)
+            choice = col.selectbox(label, options=[everything] + options, index=0)
+            if choice == everything:
+                break
+            path.append(choice)
+        if len(path) == len(cube.LEVELS):
+            drill_table = scores_cube.indicators(path)
+        else:
+            drill_table = scores_cube.table(len(path) + 1, selected_score, path=path)
+        st.dataframe(drill_table.round(2), width="stretch")
+
+# Year-over-year changes, only when several dated editions are available
+if len(editions.dated()) > 1:
+    yoy = st.expander("Year-over-year changes", key="yoy_changes", on_change="rerun")
+    if yoy.open and selected_edition not in editions.dated():
+        yoy.info(f"{selected_edition} has no edition year, so it is not compared with the dated editions.")
+    elif yoy.open:
+        with yoy:
+            comparison = compare.comparison_table(editions)
+            metric_options = compare.HEADLINE_METRICS + ['ta_score']
+            selected_metric = st.selectbox("Metric", options=metric_options, index=0)
+            selected_area = ''
+            if selected_metric == 'ta_score':
+                selected_area = st.selectbox("Thematic Area", options=aggregates.THEMATIC_AREAS, index=0)
+            st.dataframe(
+                compare.changes(comparison, selected_edition, selected_metric, selected_area),
+                hide_index=True,
+                width="stretch"
+            )
 
-    
-    # Layout adjustments for spider chart
-    fig_spider.update_layout(
-        polar=dict(
-            radialaxis=dict(visible=True, range=[0, 100], gridcolor='grey', showline=False),
-            angularaxis=dict(
-                rotation=247,  
-                direction="clockwise", 
+# search over indicator and thematic-area definitions
+indicator_search = st.expander("Indicator dictionary", key="indicator_dictionary", on_change="rerun")
+if indicator_search.open:
+    with indicator_search:
+        query = st.text_input("Search indicators and thematic areas", key="indicator_query")
+        entries = indicators.search(query, limit=None) if query else indicators.entries
+        st.caption(f"{len(entries)} of {len(indicators)} entries")
+        st.dataframe(
+            pd.DataFrame(
+                [(e.name, e.sheet or '', dictionary.describe(e), e.values) for e in entries],
+                columns=['Name', 'Sheet', 'Definition', 'Values']
             ),
-            bgcolor='black'
-        ),
-        showlegend=True,
-        legend=dict(
-            yanchor="top",  
-            y=-0.1,          
-            xanchor="left",   
-            x=0.8             
-        ),
-        margin=dict(l=0, r=0, t=30, b=50)  
-    )
-
-    # Render the chart
-    st.plotly_chart(fig_spider, use_container_width=True)
-
-
+            hide_index=True,
+            width="stretch"
+        )
 
 col1, col2 = st.columns([3, 1]) 
 
@@ -622,9 +582,15 @@ with col2:
     [Dr.Gobi Ramasamy](https://www.linkedin.com/in/gobiramasamy/)
     """)
 
-
-
-
-
-
-
+# cache and timing diagnostics, only shown with ?debug=1 in the URL
+if st.query_params.get("debug"):
+    with st.expander("Debug: render timings"):
+        st.markdown("**This rerun**")
+        st.dataframe(pd.DataFrame(run_timer.sections), hide_index=True, width="stretch")
+        st.markdown("**All sessions**")
+        st.dataframe(pd.DataFrame(run_timer.profiler.stats()).T, width="stretch")
+    with st.expander("Figure cache"):
+        st.json(figure_cache.stats())
+
+# from here on a fragment rerunning on its own times itself (see fragment_timer)
+run_timer.finished = True
@@ -0,0 +1 @@
+"""Helpers behind the GIRAI dashboard (data loading, caching, aggregates)."""
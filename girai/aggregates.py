@@ -0,0 +1,172 @@
+"""Derived tables behind the dashboard charts.
+
+Everything here is a pure function of the loaded frames, so the dashboard
+computes it once per dataset version (see ``fingerprint``) and every rerun
+just reads the small, ready-made frames. ``DEPENDENCIES`` records which
+sheets each group of tables reads, so a refresh that changed only some
+sheets recomputes only the groups that read them.
+"""
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from girai.bootstrap import group_intervals
+from girai.cube import build_cube
+
+STATUS_ORDER = ['Developed', 'Developing', 'Underdeveloped']
+
+THEMATIC_AREAS = [
+    "Access to Remedy and Redress",
+    "Children's Rights",
+    "Data Protection and Privacy",
+    "Gender Equality",
+    "International Cooperation",
+    "Labour Protection and Right to Work",
+    "National AI Policy",
+    "Public Participation and Awareness",
+    "Responsibility and Accountability",
+    "Transparency and Explainability"
+]
+
+
+# sheets each group of tables is derived from ('Rankings and Scores' also
+# carries the development status every thematic row is grouped by)
+DEPENDENCIES = {
+    'development': ('Rankings and Scores',),
+    'regional': ('Rankings and Scores',),
+    'thematic': ('Rankings and Scores', 'Data'),
+}
+
+def fingerprint(*frames):
+    """Short content hash identifying a version of the loaded data."""
+    h = hashlib.sha256()
+    for df in frames:
+        h.update("\x1f".join(map(str, df.columns)).encode())
+        h.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return h.hexdigest()[:16]
+
+
+def input_version(group, sheet_versions):
+    """Version of the inputs of one group of tables, from {sheet: version}."""
+    h = hashlib.sha256(group.encode())
+    for sheet in DEPENDENCIES[group]:
+        h.update(f"\x1f{sheet}\x1e{sheet_versions[sheet]}".encode())
+    return h.hexdigest()[:16]
+
+
+def affected_groups(changed_sheets):
+    """Groups of tables that read any of ``changed_sheets``."""
+    return [group for group, sheets in DEPENDENCIES.items() if set(sheets) & set(changed_sheets)]
+
+
+def development_stats(rankings_df):
+    """Index score points and summary stats for the three development groups.
+
+    ``count`` is the number of countries with an Index score and ``total``
+    the number in the group; the min/max/median/mean skip missing scores.
+    ``ci_low``/``ci_high`` bound the mean (see ``girai.bootstrap``).
+    """
+    filtered = rankings_df[rankings_df['Development_Status'].isin(STATUS_ORDER)]
+    points = filtered.loc[filtered['Index score'].notna(), ['Country', 'Development_Status', 'Index score']]
+    points = points.reset_index(drop=True)
+    stats = (
+        filtered.groupby('Development_Status', observed=True)['Index score']
+        .agg(['min', 'max', 'median', 'mean', 'count', 'size'])
+        .rename(columns={'size': 'total'})
+        .join(group_intervals(filtered['Index score'], filtered['Development_Status']))
+        .reset_index()
+    )
+    return points, stats
+
+
+def regional_stats(rankings_df):
+    """Mean and standard deviation of the Index score per GIRAI region.
+
+    Rows without a region are left out by the groupby itself; ``count`` and
+    ``total`` are the countries with a score and all countries per region,
+    and ``ci_low``/``ci_high`` bound the mean (see ``girai.bootstrap``).
+    """
+    return (
+        rankings_df.groupby('GIRAI_region', observed=True)['Index score']
+        .agg(['mean', 'std', 'count', 'size'])
+        .rename(columns={'size': 'total'})
+        .join(group_intervals(rankings_df['Index score'], rankings_df['GIRAI_region']))
+    )
+
+
+def thematic_by_development(rankings_df, data_df, cube=None):
+    """Mean thematic-area score per development status (rows) and thematic area (columns).
+
+    Returns ``(mean, count, total)`` frames of the same shape: ``count`` is
+    the number of scored country/area rows behind each mean and ``total``
+    the number of rows, scored or not. They are the status level of
+    ``cube`` (a ``girai.cube.Cube``, built here when not given). Every
+    status keeps its row, and statuses without rows have a count of 0.
+    """
+    if cube is None:
+        cube = build_cube(rankings_df, data_df, STATUS_ORDER)
+    areas = [area for area in cube.areas if area in THEMATIC_AREAS]
+    statuses = pd.CategoricalIndex(STATUS_ORDER, categories=STATUS_ORDER, ordered=True, name='Development_Status')
+    tables = []
+    for stat, missing in (('mean', np.nan), ('count', 0), ('rows', 0)):
+        table = cube.table(1, 'ta_score', stat)[areas]
+        table = table.reindex(list(STATUS_ORDER), fill_value=missing)
+        table.index = statuses
+        tables.append(table)
+    return tuple(tables)
+
+
+def thematic_intervals(rankings_df, data_df, thematic):
+    """``(low, high)`` bootstrap bounds of each mean in ``thematic`` (see ``girai.bootstrap``).
+
+    ``thematic`` is the mean table of ``thematic_by_development``; both
+    frames have its shape, with NaN where it has no mean.
+    """
+    statuses = (
+        rankings_df.dropna(subset=['Country']).drop_duplicates('Country')
+        .set_index('Country')['Development_Status'].astype(object)
+    )
+    statuses.index = statuses.index.astype(object)
+    # only the statuses the table has rows for are resampled
+    status = data_df['country'].astype(object).map(statuses[statuses.isin(list(thematic.index))])
+    intervals = group_intervals(data_df['ta_score'], [status, data_df['thematic_area'].astype(object)])
+    tables = []
+    for bound in ('ci_low', 'ci_high'):
+        table = intervals[bound].unstack().reindex(index=list(thematic.index), columns=thematic.columns)
+        table.index = thematic.index
+        tables.append(table)
+    return tuple(tables)
+
+
+def compute_group(group, rankings_df, data_df):
+    """The tables of one ``DEPENDENCIES`` group, keyed by name."""
+    if group == 'development':
+        dev_points, dev_stats = development_stats(rankings_df)
+        return {'dev_points': dev_points, 'dev_stats': dev_stats}
+    if group == 'regional':
+        return {'regional': regional_stats(rankings_df)}
+    if group == 'thematic':
+        # the heatmap's tables are one level of the drill-down cube
+        cube = build_cube(rankings_df, data_df, STATUS_ORDER)
+        thematic, thematic_count, thematic_total = thematic_by_development(rankings_df, data_df, cube)
+        thematic_low, thematic_high = thematic_intervals(rankings_df, data_df, thematic)
+        return {'thematic': thematic, 'thematic_count': thematic_count, 'thematic_total': thematic_total,
+                'thematic_ci_low': thematic_low, 'thematic_ci_high': thematic_high, 'cube': cube}
+    raise KeyError(group)
+
+
+def compute_aggregates(rankings_df, data_df):
+    """All derived tables the dashboard needs, keyed by name."""
+    aggs = {}
+    for group in DEPENDENCIES:
+        aggs.update(compute_group(group, rankings_df, data_df))
+    return aggs
+
+
+def update_aggregates(previous, rankings_df, data_df, changed_sheets):
+    """``previous`` with only the groups reading ``changed_sheets`` recomputed."""
+    aggs = dict(previous)
+    for group in affected_groups(changed_sheets):
+        aggs.update(compute_group(group, rankings_df, data_df))
+    return aggs
@@ -0,0 +1,128 @@
+"""Year-over-year comparison across GIRAI editions.
+
+Each edition is flattened into one long table of
+(edition, ISO3, Country, metric, thematic_area, value) rows covering the
+headline scores from 'Rankings and Scores' and the per-thematic-area
+``ta_score`` from 'Data' (``thematic_area`` is '' for the headline
+metrics). Editions are aligned on ISO3 + metric + thematic area, and
+ranks, deltas and rank changes are computed with grouped vector ops.
+
+The aligned table is persisted as an Arrow snapshot keyed on the content
+hashes of the workbooks involved, so comparison views reopen without
+loading or re-joining any edition. Writing one drops the snapshots of the
+same editions taken from older workbook contents.
+
+By default only dated editions (a year in the file name) are compared:
+an undated workbook such as a re-scoring is not a predecessor of any
+edition.
+"""
+import hashlib
+import os
+
+import pandas as pd
+
+from girai import snapshot
+
+HEADLINE_METRICS = ['Index score', 'PILLAR SCORES', 'DIMENSION SCORES']
+CACHE_DIR = os.path.join(os.path.dirname(snapshot.CACHE_DIR), 'comparisons')
+
+# bump when the layout of the comparison table changes
+FORMAT_VERSION = 1
+
+KEYS = ['ISO3', 'metric', 'thematic_area']
+
+# path -> (file signature, content hash), so reruns only stat the workbooks
+_fingerprints = {}
+
+
+def _is_code(values):
+    return values.map(lambda v: isinstance(v, str) and v != '').astype(bool)
+
+
+def long_scores(dataset, edition):
+    """One edition as long-format (ISO3, Country, metric, thematic_area, value) rows."""
+    rankings = dataset.rankings_df[_is_code(dataset.rankings_df['ISO3'])]
+    headline = rankings.melt(
+        id_vars=['ISO3', 'Country'], value_vars=HEADLINE_METRICS,
+        var_name='metric', value_name='value'
+    )
+    headline['thematic_area'] = ''
+
+    data = dataset.data_df[_is_code(dataset.data_df['ISO3'])]
+    thematic = (
+        data.groupby(['ISO3', 'country', 'thematic_area'], as_index=False, observed=True)['ta_score'].mean()
+        .rename(columns={'country': 'Country', 'ta_score': 'value'})
+    )
+    thematic['metric'] = 'ta_score'
+
+    scores = pd.concat([headline, thematic], ignore_index=True)
+    scores['value'] = pd.to_numeric(scores['value'], errors='coerce')
+    scores.insert(0, 'edition', edition)
+    return scores[['edition', 'ISO3', 'Country', 'metric', 'thematic_area', 'value']]
+
+
+def compare(editions):
+    """Aligned long table for ``editions``, an ordered {label: Dataset} (oldest first).
+
+    Adds ``rank`` (1 = best within edition/metric/area), ``delta`` and
+    ``rank_change`` (positive = moved up) against the previous edition in
+    which the same country/metric/area appears.
+    """
+    labels = list(editions)
+    table = pd.concat([long_scores(ds, label) for label, ds in editions.items()], ignore_index=True)
+    table['edition'] = pd.Categorical(table['edition'], categories=labels, ordered=True)
+
+    table['rank'] = (
+        table.groupby(['edition', 'metric', 'thematic_area'], observed=True)['value']
+        .rank(ascending=False, method='min')
+    )
+    table = table.sort_values(KEYS + ['edition'], ignore_index=True)
+    grouped = table.groupby(KEYS, sort=False)
+    table['delta'] = grouped['value'].diff()
+    table['rank_change'] = grouped['rank'].shift() - table['rank']
+    return table
+
+
+def _fingerprint(path):
+    """``snapshot.workbook_fingerprint``, recomputed only when the file signature changes."""
+    signature = snapshot.file_signature(path)
+    cached = _fingerprints.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    fingerprint = snapshot.workbook_fingerprint(path)
+    _fingerprints[path] = (signature, fingerprint)
+    return fingerprint
+
+
+def _cache_keys(paths):
+    """(editions key, content key): which editions are compared, and from which workbook contents."""
+    editions = hashlib.sha256(f"v{FORMAT_VERSION}".encode())
+    content = hashlib.sha256()
+    for label, path in paths.items():
+        editions.update(f"{label}\x1f{path}\x1e".encode())
+        content.update(f"{_fingerprint(path)}\x1e".encode())
+    return editions.hexdigest()[:16], content.hexdigest()
+
+
+def comparison_table(registry, labels=None, cache_dir=CACHE_DIR):
+    """Persisted comparison of ``labels`` (default: every dated edition, oldest first)."""
+    labels = labels or list(reversed(registry.dated()))
+    paths = {label: registry.paths[label] for label in labels}
+    os.makedirs(cache_dir, exist_ok=True)
+    editions_key, content_key = _cache_keys(paths)
+    target = os.path.join(cache_dir, f"comparison-{content_key[:16]}-{editions_key}.arrow")
+    if os.path.exists(target):
+        table = snapshot.read_snapshot(target)
+        table['edition'] = pd.Categorical(table['edition'], categories=labels, ordered=True)
+        return table
+    table = compare({label: registry.get(label) for label in labels})
+    snapshot.write_snapshot(table, target)
+    snapshot.prune(target, content_key)
+    return table
+
+
+def changes(table, edition, metric='Index score', thematic_area=''):
+    """Rows of one edition/metric with their change against the previous edition."""
+    rows = table[(table['edition'] == edition) & (table['metric'] == metric)
+                 & (table['thematic_area'] == thematic_area)]
+    return rows[['ISO3', 'Country', 'value', 'rank', 'delta', 'rank_change']].sort_values('rank')
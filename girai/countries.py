@@ -0,0 +1,47 @@
+"""Country metadata: development status, chart colors, highlights and focus groups.
+
+The classification used to be hard-coded in the dashboard. It now lives in
+two CSV tables under ``data/`` so countries can be (re)classified without
+code edits:
+
+* ``country_metadata.csv`` - one row per country with its ISO3 code,
+  ``Development_Status``, spider-chart ``color``, the ``short_name`` used in
+  map annotations and ``highlight_order`` (blank = not highlighted).
+* ``focus_groups.csv`` - ordered (focus_group, Country) membership rows for
+  the spider-chart selector.
+"""
+from collections import OrderedDict
+
+import pandas as pd
+
+METADATA_PATH = 'data/country_metadata.csv'
+FOCUS_GROUPS_PATH = 'data/focus_groups.csv'
+
+DEFAULT_STATUS = 'Other'
+
+
+def load_metadata(path=METADATA_PATH):
+    """Country-indexed metadata table."""
+    metadata = pd.read_csv(path, dtype={'highlight_order': 'Int64'})
+    return metadata.set_index('Country', verify_integrity=True)
+
+
+def load_focus_groups(path=FOCUS_GROUPS_PATH):
+    """{focus group label: [countries]} in file order."""
+    groups = OrderedDict()
+    for group, country in pd.read_csv(path)[['focus_group', 'Country']].itertuples(index=False):
+        groups.setdefault(group, []).append(country)
+    return groups
+
+
+def classify(rankings_df, metadata):
+    """Attach ``Development_Status`` and ``Highlight_Order`` to the rankings in one join."""
+    joined = rankings_df[['Country']].join(metadata[['Development_Status', 'highlight_order']], on='Country')
+    rankings_df['Development_Status'] = joined['Development_Status'].fillna(DEFAULT_STATUS)
+    rankings_df['Highlight_Order'] = joined['highlight_order']
+    return rankings_df
+
+
+def colors(metadata):
+    """{country: color} for every country that has a chart color assigned."""
+    return metadata['color'].dropna().to_dict()
@@ -0,0 +1,201 @@
+"""Pre-aggregated cube over the 'Data' sheet for drill-down views.
+
+'Data' has one row per country and thematic area, with the thematic-area
+score and the weighted score of each pillar. ``build_cube`` aggregates it
+once per dataset version along the hierarchy development status > GIRAI
+region > country, crossed with thematic area, for every score column in
+``MEASURES``. Every level of the hierarchy is stored as a rollup of its
+own, computed from the rows rather than from the level below it. Each
+rollup also has an ``ALL_AREAS`` column over every thematic area.
+
+A rollup is three dense arrays indexed by (group, thematic area, score
+column): the mean, the number of scored rows and the number of rows. So a
+slice (``Cube.table``) or the score breakdown of one group
+(``Cube.indicators``) is an array lookup, never a fresh merge and pivot of
+the raw frame. The heatmap's tables are the first level of the cube (see
+``aggregates.thematic_by_development``).
+
+Each level leaves out the rows missing one of its own keys, as a groupby
+does: a row whose country is not in the rankings has no status and counts
+only towards the top group of every row.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# drill-down hierarchy, outermost first, named after the frame columns
+LEVELS = ('Development_Status', 'GIRAI_region', 'country')
+
+MEASURES = ['ta_score', 'fr_weighted_score', 'ga_weighted_score', 'nsa_weighted_score']
+
+ALL_AREAS = 'All thematic areas'
+
+STATS = ('mean', 'count', 'rows')
+
+# keys: sorted int64 key of each group (its level codes in mixed radix);
+# groups: the groups' labels (an Index, or a MultiIndex below the first
+# level); mean/count: arrays of (group, area, measure); rows: (group, area)
+Rollup = namedtuple('Rollup', ['keys', 'groups', 'mean', 'count', 'rows'])
+
+
+class Cube:
+    """Rollups of the 'Data' scores per level of ``LEVELS`` and thematic area.
+
+    ``rollups[depth]`` groups by the first ``depth`` levels; ``rollups[0]``
+    is the single group of every row. Groups are sorted by their keys, so
+    the groups under any path are one contiguous range of rows.
+    """
+
+    def __init__(self, rollups, level_labels, areas, measures):
+        self.rollups = rollups
+        # per level: every label, in key order
+        self.level_labels = level_labels
+        # thematic areas, sorted, followed by ALL_AREAS
+        self.areas = pd.Index(list(areas) + [ALL_AREAS], name='thematic_area')
+        self.measures = list(measures)
+
+    def _positions(self, depth, path):
+        """Slice of ``rollups[depth]`` holding the groups under ``path``."""
+        if len(path) > depth:
+            raise ValueError(f"path {tuple(path)!r} is deeper than level {depth}")
+        prefix = 0
+        for labels, label in zip(self.level_labels, path):
+            if label not in labels:
+                return slice(0, 0)
+            prefix = prefix * len(labels) + labels.get_loc(label)
+        # keys of the groups under the path span [prefix, prefix + 1) * inner
+        inner = int(np.prod([len(labels) for labels in self.level_labels[len(path):depth]]))
+        start, stop = np.searchsorted(self.rollups[depth].keys, [prefix * inner, (prefix + 1) * inner])
+        return slice(start, stop)
+
+    def _stat(self, depth, stat):
+        if stat not in STATS:
+            raise ValueError(f"unknown stat {stat!r}; expected one of {STATS}")
+        return getattr(self.rollups[depth], stat)
+
+    def labels(self, depth, path=()):
+        """Labels of level ``depth`` (1 = status) under ``path``, e.g. the regions of a status."""
+        groups = self.rollups[depth].groups[self._positions(depth, path)]
+        return (groups if depth == 1 else groups.get_level_values(-1)).tolist()
+
+    def table(self, depth, measure='ta_score', stat='mean', path=()):
+        """Groups of level ``depth`` under ``path`` (rows) x thematic areas (columns).
+
+        ``depth`` counts levels of ``LEVELS`` from 1; ``path`` holds labels
+        of the outer levels, so ``table(2, path=('Developing',))`` is the
+        regions of the developing countries. The rows are the remaining
+        levels' labels. An unknown ``path`` gives an empty table.
+        """
+        if not 1 <= depth <= len(LEVELS) or len(path) >= depth:
+            raise ValueError(f"level {depth} cannot be listed under path {tuple(path)!r}")
+        positions = self._positions(depth, path)
+        values = self._stat(depth, stat)[positions]
+        if stat != 'rows':
+            values = values[:, :, self.measures.index(measure)]
+        groups = self.rollups[depth].groups[positions]
+        if len(path):
+            groups = groups.droplevel(list(range(len(path))))
+        return pd.DataFrame(values, index=groups, columns=self.areas)
+
+    def indicators(self, path=(), stat='mean'):
+        """Thematic areas (rows) x score columns for the one group at ``path``.
+
+        ``path`` is a full path into the hierarchy, e.g. ``('Developing',
+        'Africa', 'Kenya')`` for a country; ``()`` is every row. KeyError
+        if there is no such group.
+        """
+        positions = self._positions(len(path), path)
+        if positions.start == positions.stop:
+            raise KeyError(tuple(path))
+        values = self._stat(len(path), stat)[positions.start]
+        if stat == 'rows':
+            values = np.repeat(values[:, None], len(self.measures), axis=1)
+        return pd.DataFrame(values, index=self.areas, columns=pd.Index(self.measures, name='score'))
+
+    def nbytes(self):
+        return sum(a.nbytes for rollup in self.rollups for a in (rollup.mean, rollup.count, rollup.rows))
+
+
+def _grouped_stats(values, key):
+    """(group keys, mean, count, rows) of ``values`` grouped by an int64 ``key``.
+
+    Rows with a negative key are missing one of the level's keys; their group
+    sorts first and is dropped.
+    """
+    grouped = values.groupby(key, sort=True)
+    # one pass per statistic over all score columns at once
+    mean, count, rows = grouped.mean(), grouped.count(), grouped.size()
+    kept = mean.index.to_numpy() >= 0
+    return mean.index.to_numpy()[kept], mean.to_numpy()[kept], count.to_numpy()[kept], rows.to_numpy()[kept]
+
+
+def _rollup(values, codes, level_labels, area_codes, n_areas):
+    """One level's ``Rollup`` from the levels' integer ``codes`` (-1 where missing).
+
+    ``codes`` is empty for the single group of every row.
+    """
+    key = np.zeros(len(values), dtype=np.int64)
+    for level_codes, labels in zip(codes, level_labels):
+        key = key * len(labels) + level_codes
+    if codes:
+        key[np.logical_or.reduce([level_codes < 0 for level_codes in codes])] = -1
+    # the ALL_AREAS column comes from the rows too, not from the areas' means
+    group_keys, mean_all, count_all, rows_all = _grouped_stats(values, key)
+    cell_keys, mean_by_area, count_by_area, rows_by_area = _grouped_stats(
+        values, np.where((key >= 0) & (area_codes >= 0), key * n_areas + area_codes, -1)
+    )
+
+    shape = (len(group_keys), n_areas + 1, values.shape[1])
+    mean = np.full(shape, np.nan)
+    count = np.zeros(shape, dtype=np.int64)
+    rows = np.zeros(shape[:2], dtype=np.int64)
+    mean[:, -1], count[:, -1], rows[:, -1] = mean_all, count_all, rows_all
+    cells = np.searchsorted(group_keys, cell_keys // n_areas), cell_keys % n_areas
+    mean[cells], count[cells], rows[cells] = mean_by_area, count_by_area, rows_by_area
+
+    # group labels, decoded from the keys innermost level first
+    arrays, rest = [], group_keys
+    for labels in reversed(level_labels):
+        rest, level_codes = np.divmod(rest, len(labels))
+        arrays.insert(0, labels.take(level_codes))
+    if not codes:
+        groups = pd.RangeIndex(len(group_keys))
+    elif len(codes) == 1:
+        groups = arrays[0]
+    else:
+        groups = pd.MultiIndex.from_arrays(arrays)
+    return Rollup(group_keys, groups, mean, count, rows)
+
+
+def build_cube(rankings_df, data_df, status_order=(), measures=MEASURES):
+    """The ``Cube`` of ``data_df``; statuses come from ``rankings_df`` by country.
+
+    ``status_order`` lists the statuses that come first, in that order; the
+    others follow alphabetically.
+    """
+    # integer codes per level (-1 where missing) are grouped on, not the labels
+    country_codes, countries = pd.factorize(data_df['country'], sort=True)
+    region_codes, regions = pd.factorize(data_df['GIRAI_region'], sort=True)
+    area_codes, areas = pd.factorize(data_df['thematic_area'], sort=True)
+    countries = pd.Index(np.asarray(countries, dtype=object), name='country')
+    regions = pd.Index(np.asarray(regions, dtype=object), name='GIRAI_region')
+
+    status_by_country = (
+        rankings_df.dropna(subset=['Country']).drop_duplicates('Country')
+        .set_index('Country')['Development_Status'].astype(object)
+    ).reindex(countries)
+    observed = set(status_by_country.dropna())
+    categories = [s for s in status_order if s in observed] + sorted(observed - set(status_order))
+    statuses = pd.CategoricalIndex(categories, categories=categories, ordered=True, name='Development_Status')
+    status_codes = pd.Categorical(status_by_country, categories=categories).codes
+    status_codes = np.where(country_codes >= 0, status_codes[country_codes], -1)
+
+    codes = [status_codes.astype(np.int64), region_codes.astype(np.int64), country_codes.astype(np.int64)]
+    level_labels = [statuses, regions, countries]
+    values = data_df[measures].astype('float64')
+    rollups = [
+        _rollup(values, codes[:depth], level_labels[:depth], area_codes.astype(np.int64), len(areas))
+        for depth in range(len(LEVELS) + 1)
+    ]
+    return Cube(rollups, level_labels, np.asarray(areas, dtype=object), measures)
@@ -0,0 +1,295 @@
+"""Indicator definitions from the workbook's 'Dictionary' sheet.
+
+The Dictionary sheet documents every column of the 'Data' and 'Rankings and
+Scores' sheets: a definition, and for many columns the values they can
+take. The sheet also has notes on column-name prefixes ("All columns name
+starting with "fr_" refer to ...") and footnotes. ``parse`` turns it into
+a ``Dictionary``, a compact store of entries with two indexes:
+
+- a column-name lookup (``Dictionary.define``). It accepts a column the
+  sheet documents indirectly: ``fr_doc1_type_num`` is listed as
+  ``fr_doc1_type (_num and _text)``, and an undocumented ``nsa_cs_...``
+  column falls back to the ``nsa_cs`` prefix note.
+- an inverted index of the words in names, definitions, values and
+  footnotes (``Dictionary.search``). The values of ``thematic_area`` and
+  ``dimension`` get entries of their own, so a thematic area is found by
+  name.
+
+The sheet is parsed once per version of it: ``load_dictionary`` stores the
+parsed store as JSON next to the Arrow snapshots, keyed by the sheet's
+digest (``xlsx_stream.sheet_digests``), so later loads and every search
+never touch the workbook.
+
+    python -m girai.dictionary "data protection"
+    python -m girai.dictionary --define nsa_au_type_text
+"""
+import argparse
+import bisect
+import json
+import os
+import re
+from collections import namedtuple
+
+from girai import loader, snapshot, xlsx_stream
+
+SHEET = 'Dictionary'
+
+# bumped whenever the stored layout changes, so older stores are rebuilt
+FORMAT = 1
+
+# section titles above each table of the sheet, per documented sheet
+SECTION_TITLES = {'DATA TAB': 'Data', 'RANKINGS AND SCORES TAB': 'Rankings and Scores'}
+
+# columns whose listed values (one per line) get entries of their own
+VALUE_COLUMNS = ('dimension', 'thematic_area')
+
+# index weight of a word by the field it appears in
+WEIGHTS = {'name': 3, 'definition': 1, 'values': 1, 'note': 1}
+
+# kind: 'column', 'value' (a thematic area or dimension), 'prefix' or 'note'
+Entry = namedtuple('Entry', ['kind', 'sheet', 'name', 'columns', 'definition', 'values', 'note'])
+
+_PREFIX_NOTE = re.compile(r'starting with "(\w+)"')
+_VARIANTS = re.compile(r'^(\w+)\s*\((.+)\)$')
+_WORD = re.compile(r'[a-z0-9]+')
+_MARKER = re.compile(r'^(\(\S+\))\s')
+
+
+def tokens(text):
+    """Lowercase words of ``text``; column names split at underscores."""
+    return _WORD.findall(str(text).lower())
+
+
+def _columns_of(name):
+    """The column names a Dictionary name covers: 'x (_num and _text)' is x_num and x_text."""
+    match = _VARIANTS.match(name)
+    if not match:
+        return name, (name,)
+    base = match.group(1)
+    suffixes = [s.strip() for s in match.group(2).split(' and ')]
+    return base, tuple(base + s for s in suffixes)
+
+
+def _text(value):
+    return '' if value is None else str(value).strip()
+
+
+class Dictionary:
+    """Parsed Dictionary entries with a column lookup and an inverted word index."""
+
+    def __init__(self, entries, version=None):
+        self.entries = [Entry(*entry) for entry in entries]
+        self.version = version
+        # lowercase column name -> entry ids; prefix -> entry id
+        self._columns, self._prefixes = {}, {}
+        # word -> [(entry id, weight)]
+        self._postings = {}
+        for i, entry in enumerate(self.entries):
+            if entry.kind == 'column':
+                for name in {entry.name, *entry.columns}:
+                    self._columns.setdefault(name.lower(), []).append(i)
+            elif entry.kind == 'prefix':
+                self._prefixes[entry.name.lower()] = i
+            weights = {}
+            for field, weight in WEIGHTS.items():
+                for word in tokens(getattr(entry, field)):
+                    weights[word] = max(weights.get(word, 0), weight)
+            for word, weight in weights.items():
+                self._postings.setdefault(word, []).append((i, weight))
+        self._vocabulary = sorted(self._postings)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def define(self, column, sheet=None):
+        """The entry documenting ``column`` (preferring ``sheet``'s), or None.
+
+        Tries the name as listed, then without a ``_num``/``_text`` suffix,
+        then the longest column-name prefix with a note.
+        """
+        key = column.lower()
+        for candidate in (key, re.sub(r'_(num|text)$', '', key)):
+            ids = self._columns.get(candidate)
+            if ids:
+                same_sheet = [i for i in ids if self.entries[i].sheet == sheet]
+                return self.entries[(same_sheet or ids)[0]]
+        prefixes = [p for p in self._prefixes if key.startswith(p)]
+        if prefixes:
+            return self.entries[self._prefixes[max(prefixes, key=len)]]
+        return None
+
+    def _matches(self, word):
+        """{entry id: weight} for every indexed word starting with ``word``."""
+        found = {}
+        start = bisect.bisect_left(self._vocabulary, word)
+        for indexed in self._vocabulary[start:]:
+            if not indexed.startswith(word):
+                break
+            # an exact word outranks a longer word it only starts
+            scale = 1.0 if indexed == word else 0.5
+            for i, weight in self._postings[indexed]:
+                found[i] = max(found.get(i, 0), weight * scale)
+        return found
+
+    def search(self, query, limit=20):
+        """Entries containing every word of ``query`` (as a word prefix), best first.
+
+        At most ``limit`` entries come back; ``limit=None`` returns every match.
+        """
+        words = tokens(query)
+        if not words:
+            return []
+        scores = None
+        for word in dict.fromkeys(words):
+            found = self._matches(word)
+            if scores is None:
+                scores = found
+            else:
+                scores = {i: scores[i] + weight for i, weight in found.items() if i in scores}
+            if not scores:
+                return []
+        ranked = sorted(scores, key=lambda i: (-scores[i], i))
+        return [self.entries[i] for i in ranked[:limit]]
+
+    def to_json(self):
+        return {'format': FORMAT, 'version': self.version, 'entries': [list(e) for e in self.entries]}
+
+    @classmethod
+    def from_json(cls, obj):
+        # JSON has no tuples: ``columns`` comes back as a list
+        entries = [Entry(*entry) for entry in obj['entries']]
+        return cls([entry._replace(columns=tuple(entry.columns)) for entry in entries], obj['version'])
+
+
+def parse(rows, version=None):
+    """A ``Dictionary`` from ``xlsx_stream.read_cells`` rows of the Dictionary sheet.
+
+    The sheet holds, top to bottom: prefix notes in the first column, a
+    title row naming each documented sheet, a header row ('Column',
+    'Definition' and, for 'Data', 'Values'), one row per column, and after a
+    blank row the footnotes.
+    """
+    entries, notes = [], []
+    blocks, titles = None, {}
+    expected = None
+    for row_idx, cells in rows:
+        if blocks is None:
+            header = [c for c, value in cells.items() if value == 'Column' and cells.get(c + 1) == 'Definition']
+            if header:
+                blocks = [
+                    (c, titles.get(c, ''), c + 2 if cells.get(c + 2) == 'Values' else None) for c in header
+                ]
+                expected = row_idx + 1
+                continue
+            text = _text(cells.get(0))
+            prefix = _PREFIX_NOTE.search(text)
+            if prefix:
+                entries.append(Entry('prefix', None, prefix.group(1), (), text, '', ''))
+            titles = {c: SECTION_TITLES.get(_text(v), _text(v)) for c, v in cells.items()}
+            continue
+
+        if expected is not None and row_idx != expected:
+            # the first blank row ends the tables
+            expected = None
+        if expected is None:
+            notes.extend(_text(v) for _, v in sorted(cells.items()))
+            continue
+        expected = row_idx + 1
+        for column, sheet, values_col in blocks:
+            name = _text(cells.get(column))
+            if not name:
+                continue
+            base, columns = _columns_of(name)
+            values = _text(cells.get(values_col)) if values_col is not None else ''
+            definition = _text(cells.get(column + 1))
+            entries.append(Entry('column', sheet, base, columns, definition, values, ''))
+            if base in VALUE_COLUMNS:
+                for value in values.splitlines():
+                    value = value.strip().rstrip(',.')
+                    if value:
+                        entries.append(Entry('value', sheet, value, (), f"{base} value: {definition}", '', ''))
+
+    # footnotes are attached to the entries that reference their marker
+    for note in notes:
+        marker = _MARKER.match(note)
+        if marker is None:
+            entries.append(Entry('note', None, 'Note', (), note, '', ''))
+            continue
+        entries = [
+            e._replace(note=note) if marker.group(1) in e.definition else e for e in entries
+        ]
+    return Dictionary(entries, version)
+
+
+def _store_path(path, digest, cache_dir):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, f"{stem}-{digest[:16]}-{snapshot.slug(SHEET)}.json")
+
+
+def load_dictionary(path=loader.DATA_PATH, cache_dir=snapshot.CACHE_DIR):
+    """The ``Dictionary`` of ``path``, parsed once per version of the sheet.
+
+    Datasets without a Dictionary sheet (table directories, synthetic
+    workbooks) get an empty one.
+    """
+    if os.path.isdir(path):
+        return Dictionary([])
+    try:
+        digest = xlsx_stream.sheet_digests(path, [SHEET])[SHEET]
+    except KeyError:
+        return Dictionary([])
+
+    target = _store_path(path, digest, cache_dir)
+    try:
+        with open(target) as f:
+            stored = json.load(f)
+        if stored.get('format') == FORMAT:
+            return Dictionary.from_json(stored)
+    except (OSError, ValueError):
+        pass
+
+    store = parse(xlsx_stream.read_cells(path, SHEET), version=digest[:16])
+    os.makedirs(cache_dir, exist_ok=True)
+
+    def write(tmp):
+        with open(tmp, 'w') as f:
+            json.dump(store.to_json(), f)
+
+    snapshot.atomic_write(target, write)
+    snapshot.prune(target, digest)
+    return store
+
+
+def describe(entry):
+    """One-line text of an entry, as a tooltip shows it."""
+    text = entry.definition
+    if entry.note:
+        text += f" {entry.note}"
+    return text
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search the GIRAI indicator dictionary.")
+    parser.add_argument('query', nargs='*', help="words to search for")
+    parser.add_argument('--define', metavar='COLUMN', help="look up one column instead")
+    parser.add_argument('--workbook', default=loader.DATA_PATH)
+    parser.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args()
+
+    store = load_dictionary(args.workbook)
+    if args.define:
+        entry = store.define(args.define)
+        if entry is None:
+            raise SystemExit(f"{args.define}: not documented")
+        results = [entry]
+    else:
+        results = store.search(' '.join(args.query), args.limit)
+    for entry in results:
+        sheet = f" [{entry.sheet}]" if entry.sheet else ''
+        print(f"{entry.name}{sheet}: {describe(entry)}")
+        if entry.values:
+            print('    ' + entry.values.replace('\n', '\n    '))
+
+
+if __name__ == '__main__':
+    main()
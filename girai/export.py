@@ -0,0 +1,268 @@
+"""Static export of the dashboard: an HTML bundle plus one image per figure.
+
+Read-only viewers do not need a live Streamlit session. This renders every
+figure the dashboard can show into a directory that can be served as-is
+(behind a CDN, from object storage, or opened from disk):
+
+    python -m girai.export --out site/
+    python -m girai.export --out site/ --workbook data/GIRAI_2024_Edition_Data.xlsx --workers 4
+
+The figures are the map in both views, the development box plot, the
+regional bar chart, the thematic heatmap and the spider chart for every
+focus group. They are built by ``render.build_figure``, with the same
+``girai.figures`` builders the dashboard uses, in a process pool. Each
+worker loads the dataset once, and warm loads come from the snapshot cache.
+
+``index.html`` lays the figures out like the dashboard. The map view and
+the focus group are switched client-side. ``plotly.min.js`` is written once
+next to it, and the bundle needs no network access except for Plotly's map
+outlines. Each figure is also written as a standalone HTML fragment and, if
+``kaleido`` is installed, as a PNG under ``figures/``.
+
+Each figure is keyed like ``figures.FigureCache`` entries: by the version of
+the sheets it reads plus its state. ``manifest.json`` records those keys, so
+a rerun rebuilds only the figures whose inputs changed. When nothing
+changed it writes nothing, which makes it cheap to run on a schedule.
+"""
+import argparse
+import hashlib
+import html
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import plotly
+import plotly.io as pio
+from plotly.offline import get_plotlyjs
+
+from girai import aggregates, countries, loader, lookup, render, snapshot
+
+MANIFEST = 'manifest.json'
+FIGURE_DIR = 'figures'
+
+SPIDER_TITLE = 'Key Metrics Comparison for Focus Countries'
+
+# (title, [(figure name, switch label)]) in dashboard order; the spider
+# section gets one figure per focus group
+SECTIONS = [
+    ('AI Landscape: Measuring Global Preparedness',
+     [('map-global', 'Global view'), ('map-highlight', 'Highlighted countries')]),
+    ('AI Governance Across Development Stages', [('development', None)]),
+    ('Region-wise Average Index Score', [('regional', None)]),
+    ('Thematic Area Scores by Development Status', [('heatmap', None)]),
+]
+
+
+def figure_jobs(dataset, focus_groups):
+    """{name: (kind, data_version, state)} for every figure in the bundle."""
+    versions = loader.sheet_versions(dataset)
+    rankings_version = versions['Rankings and Scores']
+    jobs = {
+        'map-global': ('map', rankings_version, (False, None)),
+        'map-highlight': ('map', rankings_version, (True, None)),
+        'development': ('development', aggregates.input_version('development', versions), None),
+        'regional': ('regional', aggregates.input_version('regional', versions), None),
+        'heatmap': ('heatmap', aggregates.input_version('thematic', versions), None),
+    }
+    for i, members in enumerate(focus_groups.values(), 1):
+        jobs[f'spider-{i}'] = ('spider', rankings_version, tuple(members))
+    return jobs
+
+
+def _job_key(job, images):
+    kind, data_version, state = job
+    raw = json.dumps([kind, data_version, state, plotly.__version__, images])
+    return hashlib.sha256(raw.encode()).hexdigest()[:16]
+
+
+# per-worker state, set by _init_worker
+_worker = {}
+
+
+def _init_worker(path, metadata_path, cache_dir):
+    metadata = countries.load_metadata(metadata_path)
+    dataset = loader.load_data(path, metadata, cache_dir=cache_dir)
+    _worker.update(dataset=dataset, metadata=metadata, index=lookup.CountryIndex(dataset.rankings_df))
+
+
+def _render(name, job, out_dir, images):
+    """Build one figure in a worker and write its files; returns (name, seconds)."""
+    start = time.perf_counter()
+    kind, _, state = job
+    fig = render.build_figure(kind, state, _worker['dataset'], _worker['metadata'], _worker['index'])
+    target = os.path.join(out_dir, FIGURE_DIR, name)
+
+    def write_html(tmp):
+        with open(tmp, 'w') as f:
+            f.write(pio.to_html(fig, full_html=False, include_plotlyjs=False, div_id=name,
+                                default_width='100%', validate=False))
+
+    snapshot.atomic_write(target + '.html', write_html)
+    if images:
+        png = pio.to_image(fig, format='png', width=1200, height=700, scale=2)
+
+        def write_png(tmp):
+            with open(tmp, 'wb') as f:
+                f.write(png)
+
+        snapshot.atomic_write(target + '.png', write_png)
+    return name, time.perf_counter() - start
+
+
+def _read_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _page(out_dir, focus_groups, version):
+    """index.html with every figure fragment inlined, laid out like the dashboard."""
+    def fragment(name):
+        with open(os.path.join(out_dir, FIGURE_DIR, name + '.html')) as f:
+            return f.read()
+
+    spiders = [(f'spider-{i}', label) for i, label in enumerate(focus_groups, 1)]
+    blocks = []
+    for title, panels in SECTIONS + [(SPIDER_TITLE, spiders)]:
+        # several figures in a section: one visible at a time, picked by a select
+        controls = ''
+        if len(panels) > 1:
+            controls = '<select data-switch>' + ''.join(
+                f'<option value="{name}">{html.escape(label)}</option>' for name, label in panels
+            ) + '</select>'
+        body = ''.join(
+            f'<div class="panel" data-name="{name}"{" hidden" if i else ""}>{fragment(name)}</div>'
+            for i, (name, _) in enumerate(panels)
+        )
+        blocks.append(f'<section><h2>{html.escape(title)}</h2>{controls}{body}</section>')
+
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>Responsible AI in the Global Landscape</title>
+<script src="plotly.min.js"></script>
+<style>
+body {{ background: #0e1117; color: white; font-family: 'Times New Roman', Times, serif; margin: 0 2em; }}
+h1 {{ text-align: center; border: 2px solid grey; border-radius: 10px; background: rgba(0, 123, 255, 0.2); padding: 10px; }}
+h2 {{ text-align: center; }}
+main {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(560px, 1fr)); gap: 1em; }}
+footer {{ color: grey; margin: 2em 0; }}
+</style>
+</head>
+<body>
+<h1>🤖Uneven Progress: Responsible AI in the Global Landscape🌎</h1>
+<main>{''.join(blocks)}</main>
+<footer>Dataset version {version}</footer>
+<script>
+document.querySelectorAll('select[data-switch]').forEach(function (select) {{
+  select.addEventListener('change', function () {{
+    select.parentElement.querySelectorAll('.panel').forEach(function (panel) {{
+      panel.hidden = panel.dataset.name !== select.value;
+      if (!panel.hidden) Plotly.Plots.resize(panel.querySelector('.plotly-graph-div'));
+    }});
+  }});
+}});
+</script>
+</body>
+</html>
+"""
+
+
+def export(out_dir, path=loader.DATA_PATH, metadata_path=countries.METADATA_PATH,
+           focus_groups_path=countries.FOCUS_GROUPS_PATH, images=True, workers=None,
+           cache_dir=snapshot.CACHE_DIR, force=False):
+    """Render the bundle into ``out_dir``.
+
+    Returns {figure name: build seconds} for the rebuilt figures, or None
+    when the bundle was already up to date.
+    """
+    metadata = countries.load_metadata(metadata_path)
+    focus_groups = countries.load_focus_groups(focus_groups_path)
+    # also fills the snapshot cache the workers load from
+    dataset = loader.load_data(path, metadata, cache_dir=cache_dir)
+    jobs = figure_jobs(dataset, focus_groups)
+    keys = {name: _job_key(job, images) for name, job in jobs.items()}
+
+    previous = {} if force else (_read_manifest(out_dir) or {}).get('figures', {})
+    stale = [
+        name for name, key in keys.items()
+        if previous.get(name) != key
+        or not os.path.exists(os.path.join(out_dir, FIGURE_DIR, name + '.html'))
+    ]
+    if not stale and set(previous) == set(jobs) and os.path.exists(os.path.join(out_dir, 'index.html')):
+        return None
+
+    os.makedirs(os.path.join(out_dir, FIGURE_DIR), exist_ok=True)
+    timings = {}
+    if stale:
+        with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                 initargs=(path, metadata_path, cache_dir)) as pool:
+            futures = [pool.submit(_render, name, jobs[name], out_dir, images) for name in stale]
+            timings = dict(f.result() for f in futures)
+
+    plotlyjs = os.path.join(out_dir, 'plotly.min.js')
+    if not os.path.exists(plotlyjs) or previous.get('plotly') != plotly.__version__:
+        def write_js(tmp):
+            with open(tmp, 'w') as f:
+                f.write(get_plotlyjs())
+        snapshot.atomic_write(plotlyjs, write_js)
+
+    page = _page(out_dir, focus_groups, dataset.version)
+
+    def write_page(tmp):
+        with open(tmp, 'w') as f:
+            f.write(page)
+
+    snapshot.atomic_write(os.path.join(out_dir, 'index.html'), write_page)
+
+    # figures no longer in the bundle (e.g. a removed focus group)
+    for name in set(previous) - set(jobs):
+        for ext in ('.html', '.png'):
+            if os.path.exists(os.path.join(out_dir, FIGURE_DIR, name + ext)):
+                os.remove(os.path.join(out_dir, FIGURE_DIR, name + ext))
+
+    manifest = {'dataset_version': dataset.version, 'plotly': plotly.__version__, 'figures': keys}
+
+    def write_manifest(tmp):
+        with open(tmp, 'w') as f:
+            json.dump(manifest, f, indent=1)
+
+    snapshot.atomic_write(os.path.join(out_dir, MANIFEST), write_manifest)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-render the GIRAI dashboard to static HTML and images.")
+    parser.add_argument('--out', required=True, help="output directory")
+    parser.add_argument('--workbook', default=loader.DATA_PATH, help="workbook or table directory")
+    parser.add_argument('--metadata', default=countries.METADATA_PATH)
+    parser.add_argument('--focus-groups', default=countries.FOCUS_GROUPS_PATH)
+    parser.add_argument('--workers', type=int, default=None, help="figure-building processes (default: CPUs)")
+    parser.add_argument('--no-images', action='store_true', help="skip the PNGs (they need kaleido)")
+    parser.add_argument('--force', action='store_true', help="rebuild every figure")
+    args = parser.parse_args()
+
+    images = not args.no_images
+    if images:
+        try:
+            import kaleido  # noqa: F401
+        except ImportError:
+            parser.error("PNG export needs kaleido (pip install kaleido); pass --no-images to skip it")
+
+    start = time.perf_counter()
+    timings = export(args.out, args.workbook, args.metadata, args.focus_groups, images,
+                     args.workers, force=args.force)
+    if timings is None:
+        print(f"{args.out} is up to date")
+        return
+    for name, seconds in sorted(timings.items()):
+        print(f"{name:<16}{seconds:>8.2f}s")
+    print(f"rebuilt {len(timings)} figures in {time.perf_counter() - start:.2f}s -> {args.out}/index.html")
+
+
+if __name__ == '__main__':
+    main()
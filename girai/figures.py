@@ -0,0 +1,422 @@
+"""Plotly figures for the dashboard, plus a cache of finished figures.
+
+The builders only take the loaded frames / precomputed aggregates and the
+relevant widget state, so the same figure can be reused across reruns and
+sessions as long as the data version and state match.
+"""
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+
+from girai.bootstrap import CONFIDENCE
+
+# Categories for the spider chart
+SPIDER_CATEGORIES = ['Index score', 'PILLAR SCORES', 'DIMENSION SCORES']
+SPIDER_ALIASES = ['Index Score', 'Pillar Score', 'Dimension Score']
+
+# label of the bootstrap intervals in hovers, e.g. '95% CI'
+CI_LABEL = f"{CONFIDENCE:.0%} CI"
+
+# error bars of the bootstrap intervals
+ERROR_BARS = dict(type='data', symmetric=False, color='lightgrey', thickness=1.5, width=6)
+
+# Define colors for regions
+REGION_COLORS = {
+    'Europe': 'mediumseagreen',
+    'North America': 'mediumseagreen',
+    'Asia and Oceania': 'deepskyblue',
+    'Middle East': 'deepskyblue',
+    'South and Central America': 'deepskyblue',
+    'Africa': 'indianred',
+    'Caribbean': 'indianred'
+}
+
+
+def _coverage_labels(values, count, total):
+    """Values rounded to 2 decimals, with '(count/total)' where some inputs were missing."""
+    labels = []
+    for value, n, of in zip(values, count, total):
+        if np.isnan(value):
+            labels.append('')
+            continue
+        label = f"{round(value, 2):g}"
+        labels.append(label + f" ({n}/{of})" if n < of else label)
+    return labels
+
+
+def map_figure(rankings_df, highlight_view, short_names=None, geometry=None):
+    """World choropleth of the Index score, or the highlighted-countries view.
+
+    Highlighted countries are the rows with a ``Highlight_Order`` (see
+    ``girai.countries.classify``); ``short_names`` maps them to the label
+    used in the annotation. ``geometry`` (a ``girai.geometry.MapGeometry``)
+    replaces Plotly's built-in outlines with the project's simplified ones.
+    """
+    short_names = short_names or {}
+    # blank and sub-header rows of the sheet have no country to draw
+    rankings_df = rankings_df[rankings_df['ISO3'].notna()]
+    outlines = dict(geojson=geometry.geojson, featureidkey='id') if geometry else {}
+    if highlight_view:
+        is_highlighted = rankings_df['Highlight_Order'].notna()
+        rankings_df = rankings_df.assign(Color=np.where(is_highlighted, 'Highlighted', 'Normal'))
+
+        color_discrete_map = {
+            'Highlighted': 'gold',
+            'Normal': 'lightgrey'
+        }
+
+        fig_map = px.choropleth(
+            rankings_df,
+            locations='ISO3',
+            color='Color',
+            hover_name='Country',
+            hover_data={'Index score': True, 'Color': False},
+            color_discrete_map=color_discrete_map,
+            projection="natural earth",
+            **outlines
+        )
+
+        fig_map.update_geos(
+            center=dict(lat=20, lon=80),
+            projection_scale=2.5
+        )
+
+        highlights = rankings_df.loc[is_highlighted, ['Country', 'Index score', 'Highlight_Order']]
+        highlights = highlights.sort_values('Highlight_Order')
+        score_lines = "".join(
+            f"<br><b>{short_names.get(country, country)}'s Index Score:</b> {value:.2f}"
+            for country, value in highlights[['Country', 'Index score']].values
+        )
+
+        fig_map.update_layout(
+            annotations=[
+                dict(
+                    x=0.5,
+                    y=0.1,
+                    xanchor='center',
+                    yanchor='middle',
+                    text="<b>Highlighted Countries:</b>" + score_lines,
+                    showarrow=False,
+                    font=dict(size=14, color="black"),
+                    bgcolor="rgba(255, 255, 255, 0.7)",
+                    bordercolor="black",
+                    borderwidth=1
+                )
+            ]
+        )
+
+    else:
+
+        fig_map = px.choropleth(
+            rankings_df,
+            locations='ISO3',
+            color='Index score',
+            hover_name='Country',
+            color_continuous_scale='Viridis',
+            projection="natural earth",
+            **outlines
+        )
+
+        fig_map.update_geos(
+            center=dict(lat=10, lon=20),
+            projection_scale=1.5
+        )
+
+    if geometry:
+        # no built-in base layers: every country is drawn from the same outlines,
+        # blank ones underneath the scored ones
+        fig_map.add_trace(go.Choropleth(
+            geojson=geometry.geojson,
+            locations=list(geometry.codes),
+            z=np.zeros(len(geometry.codes)),
+            colorscale=[[0, 'white'], [1, 'white']],
+            showscale=False,
+            hoverinfo='skip',
+            marker_line_color='gray',
+            marker_line_width=0.5,
+        ))
+        fig_map.data = fig_map.data[-1:] + fig_map.data[:-1]
+        geo = dict(showframe=False, visible=False, bgcolor="lightblue")
+    else:
+        geo = dict(
+            showframe=False,
+            showcoastlines=True,
+            coastlinecolor="Gray",
+            landcolor="white",
+            oceancolor="lightblue",
+            showocean=True,
+        )
+
+    fig_map.update_layout(
+        margin=dict(l=0, r=0, t=0, b=0),
+        geo=geo,
+        showlegend=False,
+    )
+    return fig_map
+
+
+def development_figure(dev_points, dev_stats):
+    """Box plot of the Index score per development status with mean markers.
+
+    ``dev_stats`` carries ``count``/``total`` (scored / all countries per
+    status) and the ``ci_low``/``ci_high`` interval of the mean (see
+    ``aggregates.development_stats``), shown in the hover; the interval is
+    also an error bar on the mean marker.
+    """
+    fig_dev = px.box(
+        dev_points,
+        x='Development_Status',
+        y='Index score',
+        color='Development_Status',
+    )
+
+    # Ensure only relevant stats are displayed
+    fig_dev.update_traces(
+        hoverinfo="skip",
+        hovertemplate=None,
+        selector=dict(type='box')
+    )
+
+    # Add average markers with detailed hover info
+    columns = ['Development_Status', 'min', 'max', 'median', 'mean', 'count', 'total', 'ci_low', 'ci_high']
+    for status, min_val, max_val, median_val, avg, count, total, ci_low, ci_high in dev_stats[columns].values:
+        fig_dev.add_trace(
+            go.Scatter(
+                x=[status],
+                y=[avg],
+                mode='markers+text',
+                marker=dict(color='black', size=10),
+                error_y=dict(ERROR_BARS, array=[ci_high - avg], arrayminus=[avg - ci_low]),
+                text=[f"Avg: {avg:.2f}"],
+                textposition='top right',
+                textfont=dict(color='white', size=14),
+                hovertemplate=(
+                    'Development Status: %{x}<br>'
+                    'Min: %{customdata[0]:.2f}<br>'
+                    'Max: %{customdata[1]:.2f}<br>'
+                    'Median: %{customdata[2]:.2f}<br>'
+                    'Mean: %{customdata[3]:.2f}<br>'
+                    'Avg: %{y:.2f}<br>'
+                    f'Mean {CI_LABEL}: %{{customdata[6]:.2f}} to %{{customdata[7]:.2f}}<br>'
+                    'Countries scored: %{customdata[4]} of %{customdata[5]}<br>'
+                    '<extra></extra>'
+                ),
+                customdata=[[min_val, max_val, median_val, avg, count, total, ci_low, ci_high]]
+            )
+        )
+
+    fig_dev.update_layout(
+        showlegend=False,
+        margin=dict(l=0, r=0, t=30, b=0),
+        xaxis_title="Development Status",
+        yaxis_title="Index Score",
+    )
+    return fig_dev
+
+
+def regional_figure(regional):
+    """Bar chart of the average Index score per GIRAI region.
+
+    Bars of regions where some countries have no score say how many do.
+    Error bars show the ``ci_low``/``ci_high`` interval of each mean, and
+    the hover adds it and the standard deviation (see
+    ``aggregates.regional_stats``).
+    """
+    regional_avg = regional['mean']
+
+    # Assign bar colors based on region
+    bar_colors = [REGION_COLORS.get(region, 'grey') for region in regional_avg.index]
+
+    fig_regional = go.Figure()
+    fig_regional.add_trace(
+        go.Bar(
+            x=regional_avg.index,
+            y=regional_avg.values,
+            name='Regional Score',
+            marker=dict(color=bar_colors),
+            text=_coverage_labels(regional_avg.values, regional['count'], regional['total']),  # Text inside the bars
+            textposition='inside',
+            textfont=dict(color='white', size=14),
+            error_y=dict(
+                ERROR_BARS, array=regional['ci_high'] - regional_avg, arrayminus=regional_avg - regional['ci_low']
+            ),
+            customdata=regional[['count', 'total', 'std', 'ci_low', 'ci_high']].values,
+            hovertemplate=(
+                '%{x}: %{y:.2f}<br>'
+                f'{CI_LABEL}: %{{customdata[3]:.2f}} to %{{customdata[4]:.2f}}<br>'
+                'Standard deviation: %{customdata[2]:.2f}<br>'
+                'Countries scored: %{customdata[0]} of %{customdata[1]}<extra></extra>'
+            )
+        )
+    )
+
+    fig_regional.update_layout(
+        xaxis_title="Region",
+        yaxis_title="Average Index Score",
+        xaxis_tickangle=45,
+        margin=dict(l=0, r=0, t=30, b=0)
+    )
+    return fig_regional
+
+
+def heatmap_figure(thematic, count, total, ci_low, ci_high):
+    """Heatmap of mean thematic-area scores by development status.
+
+    ``count``/``total`` (same shape, see ``aggregates.thematic_by_development``)
+    are the scored and all country rows behind each cell; cells with
+    missing scores show the ratio next to the mean. ``ci_low``/``ci_high``
+    bound each mean (see ``aggregates.thematic_intervals``) in the hover.
+    """
+    count, total = count.fillna(0).astype(int).values, total.fillna(0).astype(int).values
+    fig_heatmap = go.Figure(data=go.Heatmap(
+        z=thematic.values,
+        x=thematic.columns,
+        y=thematic.index,
+        text=[_coverage_labels(*row) for row in zip(thematic.values, count, total)],
+        texttemplate='%{text}',  # This keeps the text labels in the heatmap
+        textfont={"size": 10},
+        colorscale='RdBu',
+        showscale=True,
+        hoverongaps=False,
+        customdata=np.dstack([count, total, ci_low.values, ci_high.values]),
+        hovertemplate=(
+            "Thematic Area: %{x}<br>Development Status: %{y}<br>Score: %{z:.2f}<br>"
+            f"{CI_LABEL}: %{{customdata[2]:.2f}} to %{{customdata[3]:.2f}}<br>"
+            "Countries scored: %{customdata[0]} of %{customdata[1]}<extra></extra>"
+        )
+    ))
+
+    fig_heatmap.update_layout(
+        margin=dict(l=10, r=10, t=30, b=30),
+        xaxis=dict(
+            title='Thematic Areas',
+            tickangle=45
+        ),
+        height=500,
+    )
+    return fig_heatmap
+
+
+def spider_figure(metrics, colors):
+    """Spider chart of the headline scores for a group of countries.
+
+    ``metrics`` is a Country-indexed frame of ``SPIDER_CATEGORIES`` (see
+    ``CountryIndex.metrics``), one trace per row. ``colors`` maps a country
+    to its trace color; other countries use Plotly's default color cycle.
+    """
+    fig_spider = go.Figure()
+
+    for country, values in zip(metrics.index, metrics[SPIDER_CATEGORIES].values):
+        fig_spider.add_trace(go.Scatterpolar(
+            r=values,
+            theta=SPIDER_ALIASES,
+            name=country,
+            fill='toself',
+            line=dict(color=colors.get(country)),
+            mode='lines+markers+text',
+            text=[f"{val:.1f}" for val in values],
+            textposition="top center",
+            textfont=dict(color='white', size=12)
+        ))
+
+    fig_spider.update_layout(
+        polar=dict(
+            radialaxis=dict(visible=True, range=[0, 100], gridcolor='grey', showline=False),
+            angularaxis=dict(
+                rotation=247,
+                direction="clockwise",
+            ),
+            bgcolor='black'
+        ),
+        showlegend=True,
+        legend=dict(
+            yanchor="top",
+            y=-0.1,
+            xanchor="left",
+            x=0.8
+        ),
+        margin=dict(l=0, r=0, t=30, b=50)
+    )
+    return fig_spider
+
+
+class FigureCache:
+    """Thread-safe LRU of finished figures.
+
+    Entries are keyed on (kind, data_version, state), where ``data_version``
+    is the version of the inputs the figure reads (the dataset, or just the
+    sheets behind it) and ``state`` is any hashable snapshot of the widget
+    values the figure depends on. Cached
+    figures are shared between sessions and must be treated as read-only.
+
+    A figure is built once even when several threads ask for it at the
+    same time: later callers wait for the first build. ``prefetch`` uses
+    this to build independent figures concurrently on an executor.
+    """
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._building = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, kind, data_version, state, build):
+        """Return the cached figure for the key, building it with ``build()`` on a miss."""
+        key = (kind, data_version, state)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            pending = self._building.get(key)
+            if pending is None:
+                self.misses += 1
+                self._building[key] = building = Future()
+            else:
+                self.hits += 1
+        if pending is not None:
+            return pending.result()
+        try:
+            figure = build()
+        except BaseException as exc:
+            with self._lock:
+                del self._building[key]
+            building.set_exception(exc)
+            raise
+        with self._lock:
+            del self._building[key]
+            self._entries[key] = figure
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        building.set_result(figure)
+        return figure
+
+    def prefetch(self, executor, requests):
+        """Start ``get(*request)`` for every request on ``executor``; returns the futures.
+
+        A caller that later asks for the same key gets the finished figure,
+        or waits for the build already in progress.
+        """
+        return [executor.submit(self.get, *request) for request in requests]
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'entries': len(self._entries),
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
@@ -0,0 +1,287 @@
+"""Simplified country outlines for the world map, at several levels of detail.
+
+By default the map uses Plotly's built-in world outlines, which the
+browser downloads from cdn.plot.ly. This module builds the project's own
+outlines from any country GeoJSON whose neighbours share border vertices,
+such as Natural Earth admin-0:
+
+    python -m girai.geometry path/to/ne_10m_admin_0_countries.geojson
+
+The build writes one GeoJSON per level in ``LEVELS`` into
+``static/geometry/``. Each feature's ``id`` is its ISO3 code, and the
+files carry no properties. The repository ships no source geometry, so
+the outlines are opt-in: after a build, run the dashboard with static
+serving on
+
+    streamlit run dashboard.py --server.enableStaticServing true
+
+and Streamlit serves ``static/`` under ``app/static/``. A figure refers to
+its level by URL, so the browser downloads and caches each level once and
+figures never embed the geometry. ``VIEWS`` picks the level per map view:
+coarse for the whole world, finer for the zoomed highlight view. Without
+a build (or without static serving) the map keeps Plotly's outlines.
+
+Simplification keeps the topology. Every ring is cut into arcs wherever
+the set of countries sharing its vertices changes. Each arc is simplified
+once with Douglas-Peucker and reused by every country that borders it, so
+neighbours stay gap-free at every level. A manifest records the source's
+hash, so running the build again on the same source does nothing.
+"""
+import argparse
+import hashlib
+import json
+import os
+from collections import namedtuple
+
+import numpy as np
+
+STATIC_DIR = os.path.join('static', 'geometry')
+URL_PREFIX = 'app/static/geometry/'
+MANIFEST = 'manifest.json'
+
+# tolerance (degrees), smallest kept island (square degrees), output decimals
+Level = namedtuple('Level', ['tolerance', 'min_area', 'decimals'])
+LEVELS = {
+    'low': Level(0.2, 0.5, 2),
+    'medium': Level(0.05, 0.02, 3),
+}
+
+# level of detail per map view (see figures.map_figure)
+VIEWS = {'global': 'low', 'highlight': 'medium'}
+
+# vertices are snapped to this grid (degrees) before borders are matched
+QUANTUM = 1e-5
+
+ISO3_PROPERTIES = ('ISO_A3', 'ADM0_A3', 'iso_a3', 'ISO3', 'adm0_a3')
+
+MapGeometry = namedtuple('MapGeometry', ['geojson', 'codes'])
+
+
+def _iso3(feature):
+    props = feature.get('properties') or {}
+    for key in ISO3_PROPERTIES:
+        code = props.get(key)
+        if isinstance(code, str) and len(code) == 3 and code != '-99':
+            return code
+    code = feature.get('id')
+    return code if isinstance(code, str) else None
+
+
+def _polygons(geometry):
+    if geometry is None:
+        return []
+    if geometry['type'] == 'Polygon':
+        return [geometry['coordinates']]
+    if geometry['type'] == 'MultiPolygon':
+        return geometry['coordinates']
+    return []
+
+
+def _open_ring(coords):
+    """Quantized (n x 2) int64 ring without the closing point or repeated vertices."""
+    ring = np.rint(np.asarray(coords, dtype=float)[:, :2] / QUANTUM).astype(np.int64)
+    keep = np.ones(len(ring), dtype=bool)
+    keep[1:] = np.any(ring[1:] != ring[:-1], axis=1)
+    ring = ring[keep]
+    if len(ring) > 1 and np.array_equal(ring[0], ring[-1]):
+        ring = ring[:-1]
+    return ring
+
+
+def _keys(points):
+    # one int64 per vertex; longitudes and latitudes fit in 31 bits at QUANTUM
+    return (points[:, 0] + (1 << 30)) << 32 | (points[:, 1] + (1 << 30))
+
+
+def _junctions(rings):
+    """Per ring, a mask of the vertices where the set of rings sharing it changes."""
+    keys = np.concatenate([_keys(r) for r in rings])
+    owners = np.repeat(np.arange(len(rings), dtype=np.uint64), [len(r) for r in rings])
+    pairs = np.unique(np.stack([keys.view(np.uint64), owners], axis=1), axis=0)
+    unique_keys, starts = np.unique(pairs[:, 0], return_index=True)
+    with np.errstate(over='ignore'):
+        # order-free signature of the set of rings that share each vertex
+        hashed = (pairs[:, 1] + np.uint64(1)) * np.uint64(0x9E3779B97F4A7C15)
+        signature = np.add.reduceat(hashed, starts)
+    out, offset = [], 0
+    for ring in rings:
+        sig = signature[np.searchsorted(unique_keys, keys[offset:offset + len(ring)].view(np.uint64))]
+        out.append((sig != np.roll(sig, 1)) | (sig != np.roll(sig, -1)))
+        offset += len(ring)
+    return out
+
+
+def douglas_peucker(points, tolerance):
+    """Indices of ``points`` (n x 2) kept by Douglas-Peucker; both ends are always kept."""
+    n = len(points)
+    keep = np.zeros(n, dtype=bool)
+    keep[[0, n - 1]] = True
+    stack = [(0, n - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        inner = points[start + 1:end]
+        a, b = points[start], points[end]
+        dx, dy = b - a
+        norm = np.hypot(dx, dy)
+        if norm == 0:
+            dist = np.hypot(inner[:, 0] - a[0], inner[:, 1] - a[1])
+        else:
+            dist = np.abs(dx * (inner[:, 1] - a[1]) - dy * (inner[:, 0] - a[0])) / norm
+        i = int(np.argmax(dist))
+        if dist[i] > tolerance:
+            keep[start + 1 + i] = True
+            stack += [(start, start + 1 + i), (start + 1 + i, end)]
+    return np.flatnonzero(keep)
+
+
+def _arcs(ring, fixed):
+    """Cut an open ring into arcs (each including both end vertices) at ``fixed``."""
+    cuts = np.flatnonzero(fixed)
+    if len(cuts) == 0:
+        # nothing shared changes along the ring: start at its smallest vertex so
+        # a neighbour owning the same loop produces the same arc
+        start = int(np.argmin(_keys(ring)))
+        ring = np.roll(ring, -start, axis=0)
+        return [np.vstack([ring, ring[:1]])]
+    ring = np.roll(ring, -cuts[0], axis=0)
+    cuts = np.append(cuts - cuts[0], len(ring))
+    closed = np.vstack([ring, ring[:1]])
+    return [closed[a:b + 1] for a, b in zip(cuts[:-1], cuts[1:])]
+
+
+def _signed_area(ring):
+    x, y = ring[:, 0], ring[:, 1]
+    return 0.5 * (np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1)))
+
+
+def _area(ring):
+    return abs(_signed_area(ring))
+
+
+def _oriented(ring, clockwise):
+    # d3-geo (and so Plotly) reads clockwise exteriors and counter-clockwise holes
+    return ring[::-1] if (_signed_area(ring) < 0) != clockwise else ring
+
+
+def simplify(collection, levels=LEVELS):
+    """{level: FeatureCollection} of ``collection`` simplified with shared borders."""
+    features = []
+    for feature in collection['features']:
+        code = _iso3(feature)
+        if code is None:
+            continue
+        polygons = []
+        for polygon in _polygons(feature.get('geometry')):
+            rings = [_open_ring(ring) for ring in polygon]
+            if len(rings[0]) >= 3:
+                polygons.append([r for r in rings if len(r) >= 3])
+        if polygons:
+            features.append((code, polygons))
+
+    flat = [ring for _, polygons in features for polygon in polygons for ring in polygon]
+    fixed = iter(_junctions(flat))
+    arcs = [[[_arcs(ring, next(fixed)) for ring in polygon] for polygon in polygons] for _, polygons in features]
+
+    out = {}
+    for name, level in levels.items():
+        tolerance = level.tolerance / QUANTUM
+        simplified = {}
+
+        def simplify_arc(arc):
+            forward = tuple(_keys(arc).tolist())
+            backward = forward[::-1]
+            if backward < forward:
+                return simplify_arc(arc[::-1])[::-1]
+            if forward not in simplified:
+                simplified[forward] = arc[douglas_peucker(arc.astype(float), tolerance)]
+            return simplified[forward]
+
+        out_features = []
+        for (code, _), feature_arcs in zip(features, arcs):
+            polygons = []
+            for polygon_arcs in feature_arcs:
+                rings = []
+                for ring_arcs in polygon_arcs:
+                    ring = np.vstack([simplify_arc(arc)[:-1] for arc in ring_arcs])
+                    if len(np.unique(_keys(ring))) >= 3:
+                        rings.append(ring * QUANTUM)
+                if rings:
+                    polygons.append(rings)
+            if not polygons:
+                continue
+            # small islands go at coarse levels, but every country keeps its largest part
+            largest = max(_area(p[0]) for p in polygons)
+            polygons = [
+                [p[0]] + [h for h in p[1:] if _area(h) >= level.min_area]
+                for p in polygons if _area(p[0]) >= min(level.min_area, largest)
+            ]
+            coordinates = [
+                [np.round(np.vstack([r, r[:1]]), level.decimals).tolist()
+                 for r in [_oriented(p[0], True)] + [_oriented(h, False) for h in p[1:]]]
+                for p in polygons
+            ]
+            out_features.append({
+                'type': 'Feature',
+                'id': code,
+                'geometry': {'type': 'MultiPolygon', 'coordinates': coordinates},
+            })
+        out[name] = {'type': 'FeatureCollection', 'features': out_features}
+    return out
+
+
+def build(source, out_dir=STATIC_DIR, levels=LEVELS):
+    """Simplify ``source`` into ``out_dir``, unless it was already built from the same file."""
+    with open(source, 'rb') as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw).hexdigest()
+    manifest_path = os.path.join(out_dir, MANIFEST)
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if manifest['source_sha256'] == digest and set(manifest['levels']) == set(levels):
+            return manifest
+    except (OSError, ValueError, KeyError):
+        pass
+
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = {'source_sha256': digest, 'levels': {}, 'codes': []}
+    for name, collection in simplify(json.loads(raw), levels).items():
+        filename = f"countries-{name}.geojson"
+        body = json.dumps(collection, separators=(',', ':'))
+        with open(os.path.join(out_dir, filename), 'w') as f:
+            f.write(body)
+        manifest['levels'][name] = {'file': filename, 'bytes': len(body), 'features': len(collection['features'])}
+        manifest['codes'] = sorted({feature['id'] for feature in collection['features']})
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=1)
+    return manifest
+
+
+def for_view(view, geometry_dir=STATIC_DIR, url_prefix=URL_PREFIX):
+    """``MapGeometry`` (URL + feature ids) for a map view, or None when nothing was built."""
+    try:
+        with open(os.path.join(geometry_dir, MANIFEST)) as f:
+            manifest = json.load(f)
+        level = manifest['levels'][VIEWS[view]]
+    except (OSError, ValueError, KeyError):
+        return None
+    return MapGeometry(url_prefix + level['file'], tuple(manifest['codes']))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build simplified country geometry for the world map.")
+    parser.add_argument('source', help="country GeoJSON with ISO3 codes (e.g. Natural Earth admin-0)")
+    parser.add_argument('--out', default=STATIC_DIR)
+    args = parser.parse_args()
+
+    manifest = build(args.source, args.out)
+    source_bytes = os.path.getsize(args.source)
+    print(f"source: {source_bytes / 1024:.0f} kB, {len(manifest['codes'])} countries")
+    for name, level in manifest['levels'].items():
+        print(f"{name:<8}{level['bytes'] / 1024:>10.0f} kB{level['features']:>6} features  {level['file']}")
+
+
+if __name__ == '__main__':
+    main()
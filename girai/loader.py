@@ -0,0 +1,182 @@
+"""Loading and preprocessing of the GIRAI workbook, independent of Streamlit.
+
+``dashboard.py`` wraps ``load_data`` in ``st.cache_data``; headless consumers
+(the query server, scripts) call it directly and get exactly the frames the
+dashboard works with. ``refresh_data`` reloads a changed source while
+re-ingesting only the sheets that actually changed.
+"""
+import hashlib
+import os
+from collections import namedtuple
+
+import pandas as pd
+
+from girai import aggregates, countries, snapshot, xlsx_stream
+
+DATA_PATH = 'data/GIRAI_2024_Edition_Data.xlsx'
+
+# only the columns the charts actually read are loaded
+SHEET_COLUMNS = {
+    'Rankings and Scores': ['Ranking', 'ISO3', 'Country', 'GIRAI_region', 'Index score',
+                            'PILLAR SCORES', 'DIMENSION SCORES'],
+    'Data': ['country', 'ISO3', 'GIRAI_region', 'thematic_area', 'ta_score',
+             'fr_weighted_score', 'ga_weighted_score', 'nsa_weighted_score'],
+}
+
+# file stems used when a dataset is a directory of CSV/Parquet tables
+# instead of a workbook (see girai/synthetic.py)
+TABLE_FILES = {'Rankings and Scores': 'rankings_and_scores', 'Data': 'data'}
+
+NUMERIC_COLUMNS = ['Index score', 'ta_score', 'fr_weighted_score',
+                   'ga_weighted_score', 'nsa_weighted_score']
+
+# dtypes the preprocessed frames are cast to: repeated labels become
+# categoricals and the per-area scores (one row per country x area) float32.
+# Rankings scores stay float64: it has one row per country and the charts
+# plot those values directly.
+SCHEMA = {
+    'Rankings and Scores': {'GIRAI_region': 'category', 'Development_Status': 'category'},
+    'Data': {
+        'country': 'category', 'ISO3': 'category', 'GIRAI_region': 'category', 'thematic_area': 'category',
+        'ta_score': 'float32', 'fr_weighted_score': 'float32', 'ga_weighted_score': 'float32',
+        'nsa_weighted_score': 'float32',
+    },
+}
+
+Dataset = namedtuple('Dataset', ['rankings_df', 'data_df', 'version', 'sheet_state'])
+
+# per sheet: ``source`` identifies the raw input (sheet digest or file
+# signature, plus the metadata for Rankings) and ``version`` the preprocessed
+# content
+SheetState = namedtuple('SheetState', ['source', 'version'])
+
+
+def preprocess_sheet(sheet, df, metadata):
+    """Coerce score columns and apply the schema; Rankings rows are also classified.
+
+    Missing values stay missing (NaN): a score that was never reported is
+    not a score of zero, and the aggregates count coverage from them.
+    Returns a new frame: snapshot reads are views of read-only Arrow buffers.
+    """
+    df = df.assign(**{
+        col: pd.to_numeric(df[col], errors='coerce') for col in NUMERIC_COLUMNS if col in df.columns
+    })
+
+    if sheet == 'Rankings and Scores':
+        # development status and highlight flags from data/country_metadata.csv
+        countries.classify(df, metadata)
+    return enforce_schema(sheet, df)
+
+
+def enforce_schema(sheet, df):
+    """Cast ``df`` to the sheet's ``SCHEMA`` dtypes; ValueError if a column is missing."""
+    schema = SCHEMA[sheet]
+    missing = [col for col in schema if col not in df.columns]
+    if missing:
+        raise ValueError(f"sheet {sheet!r} is missing columns: {missing}")
+    return df.astype(schema)
+
+
+def preprocess(rankings_df, data_df, metadata):
+    """Coerce score columns and classify countries; returns the new frames."""
+    return (preprocess_sheet('Rankings and Scores', rankings_df, metadata),
+            preprocess_sheet('Data', data_df, metadata))
+
+
+def _table_file(path, sheet):
+    base = os.path.join(path, TABLE_FILES[sheet])
+    for ext in ('.parquet', '.csv'):
+        if os.path.exists(base + ext):
+            return base + ext
+    raise FileNotFoundError(f"no {TABLE_FILES[sheet]}.parquet or .csv in {path}")
+
+
+def read_table_dir(path, sheets=None):
+    """Read tables of a CSV/Parquet dataset directory, projected like the workbook."""
+    frames = {}
+    for sheet in sheets or SHEET_COLUMNS:
+        columns = SHEET_COLUMNS[sheet]
+        target = _table_file(path, sheet)
+        if target.endswith('.parquet'):
+            frames[sheet] = pd.read_parquet(target, columns=columns)
+        else:
+            frames[sheet] = pd.read_csv(target, usecols=columns)[columns]
+    return frames
+
+
+def source_keys(path, metadata_version):
+    """{sheet: source key}; cheap to compute, so refreshes can run on every check."""
+    if os.path.isdir(path):
+        keys = {sheet: '%d:%d' % snapshot.file_signature(_table_file(path, sheet)) for sheet in SHEET_COLUMNS}
+    else:
+        keys = xlsx_stream.sheet_digests(path, list(SHEET_COLUMNS))
+    # classification makes the Rankings frame depend on the country metadata too
+    keys['Rankings and Scores'] += ':' + metadata_version
+    return keys
+
+
+def _content_version(df, extra=''):
+    return hashlib.sha256((aggregates.fingerprint(df) + extra).encode()).hexdigest()[:16]
+
+
+def refresh_data(previous, path=DATA_PATH, metadata=None, cache_dir=snapshot.CACHE_DIR):
+    """Reload ``path``, re-ingesting only the sheets whose source changed since ``previous``.
+
+    Returns ``(dataset, changes)``: ``changes`` lists the sheets whose
+    content changed (all of them when ``previous`` is None). Sheets that
+    did not change keep
+    ``previous``'s frames and versions, so anything keyed on them (see
+    ``aggregates.DEPENDENCIES``) stays valid.
+    """
+    if metadata is None:
+        metadata = countries.load_metadata()
+    metadata_version = aggregates.fingerprint(metadata)
+    sources = source_keys(path, metadata_version)
+    old = previous.sheet_state if previous is not None else {}
+    frames = {'Rankings and Scores': previous.rankings_df, 'Data': previous.data_df} if previous else {}
+    stale = [sheet for sheet in SHEET_COLUMNS if sheet not in old or old[sheet].source != sources[sheet]]
+
+    if not stale:
+        return previous, []
+    if os.path.isdir(path):
+        raw = read_table_dir(path, stale)
+    else:
+        # served from Arrow snapshots after the first parse (see girai/snapshot.py)
+        raw = snapshot.read_sheets(path, stale, cache_dir=cache_dir, columns=SHEET_COLUMNS)
+
+    state, changes = dict(old), []
+    for sheet in stale:
+        df = preprocess_sheet(sheet, raw[sheet], metadata)
+        # the Rankings version also covers the colors/short names figures read from metadata
+        version = _content_version(df, metadata_version if sheet == 'Rankings and Scores' else '')
+        if sheet in old and old[sheet].version == version:
+            # re-saved without a content change
+            state[sheet] = old[sheet]._replace(source=sources[sheet])
+            continue
+        frames[sheet] = df
+        state[sheet] = SheetState(sources[sheet], version)
+        changes.append(sheet)
+
+    version = hashlib.sha256(
+        "".join(state[sheet].version for sheet in SHEET_COLUMNS).encode()
+    ).hexdigest()[:16]
+    dataset = Dataset(frames['Rankings and Scores'], frames['Data'], version, state)
+    return dataset, changes
+
+
+def load_data(path=DATA_PATH, metadata=None, cache_dir=snapshot.CACHE_DIR):
+    """Load both sheets (through the Arrow snapshot cache) and preprocess them.
+
+    ``path`` is a workbook, or a directory of CSV/Parquet tables named as in
+    ``TABLE_FILES`` (read directly, they need no snapshot).
+
+    Returns a ``Dataset`` whose ``version`` fingerprints the frames and the
+    country metadata, for keying anything derived from them; per-sheet
+    versions are in ``sheet_state``.
+    """
+    return refresh_data(None, path, metadata, cache_dir)[0]
+
+
+def sheet_versions(dataset):
+    """{sheet: content version} of a ``Dataset``, as ``aggregates.input_version`` takes it."""
+    return {sheet: state.version for sheet, state in dataset.sheet_state.items()}
@@ -0,0 +1,32 @@
+"""Country-indexed view of the rankings for constant-time row access.
+
+The spider chart and annotations used to filter the whole rankings frame
+with a boolean mask per country; ``CountryIndex`` is built once per dataset
+version and answers batch lookups through a hash index.
+"""
+
+
+class CountryIndex:
+    """Read-only lookup over the country rows of the rankings frame."""
+
+    def __init__(self, rankings_df):
+        # the sheet has a sub-header row and blank trailing rows with no country
+        is_country = rankings_df['Country'].map(lambda v: isinstance(v, str) and v != '')
+        rows = rankings_df[is_country]
+        self.by_country = rows.set_index('Country', verify_integrity=True)
+
+    def __contains__(self, country):
+        return country in self.by_country.index
+
+    def __len__(self):
+        return len(self.by_country)
+
+    @property
+    def countries(self):
+        return self.by_country.index.tolist()
+
+    def metrics(self, countries, columns=None):
+        """Rows for ``countries`` in the requested order; unknown countries are skipped."""
+        present = [c for c in countries if c in self.by_country.index]
+        frame = self.by_country.loc[present]
+        return frame if columns is None else frame[columns]
@@ -0,0 +1,137 @@
+"""Per-section timing and memory instrumentation for dashboard reruns.
+
+A process-wide ``Profiler`` aggregates timings from every session; each
+script run records into its own ``RunTimer`` so the debug panel can show
+the numbers for the current rerun. Aggregates are available as a dict, as
+Prometheus text (optionally served on a port) and as one JSON log line per
+section on the ``girai.profiling`` logger.
+"""
+import json
+import logging
+import os
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger('girai.profiling')
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def current_rss():
+    """Resident set size in bytes (peak RSS where /proc is unavailable)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is bytes on macOS, kilobytes elsewhere
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class Profiler:
+    """Thread-safe aggregate of section timings across all runs and sessions."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, section, seconds, rss_delta):
+        with self._lock:
+            s = self._stats.setdefault(section, {'count': 0, 'total_s': 0.0, 'max_s': 0.0,
+                                                 'last_s': 0.0, 'last_rss_delta': 0})
+            s['count'] += 1
+            s['total_s'] += seconds
+            s['max_s'] = max(s['max_s'], seconds)
+            s['last_s'] = seconds
+            s['last_rss_delta'] = rss_delta
+        logger.info(json.dumps({'event': 'section', 'section': section,
+                                'seconds': round(seconds, 6), 'rss_delta': rss_delta}))
+
+    def stats(self):
+        with self._lock:
+            return {name: dict(s, mean_s=s['total_s'] / s['count']) for name, s in self._stats.items()}
+
+    def prometheus(self):
+        """Aggregates in the Prometheus text exposition format."""
+        lines = [
+            '# HELP girai_section_seconds Wall time spent in a dashboard section.',
+            '# TYPE girai_section_seconds summary',
+        ]
+        stats = self.stats()
+        for name, s in stats.items():
+            lines.append(f'girai_section_seconds_sum{{section="{name}"}} {s["total_s"]:.6f}')
+            lines.append(f'girai_section_seconds_count{{section="{name}"}} {s["count"]}')
+        lines += [
+            '# HELP girai_section_seconds_max Slowest observed run of a section.',
+            '# TYPE girai_section_seconds_max gauge',
+        ]
+        lines += [f'girai_section_seconds_max{{section="{n}"}} {s["max_s"]:.6f}' for n, s in stats.items()]
+        lines += [
+            '# HELP girai_section_rss_delta_bytes RSS change over the last run of a section.',
+            '# TYPE girai_section_rss_delta_bytes gauge',
+        ]
+        lines += [f'girai_section_rss_delta_bytes{{section="{n}"}} {s["last_rss_delta"]}' for n, s in stats.items()]
+        lines += [
+            '# HELP girai_process_rss_bytes Resident set size of the dashboard process.',
+            '# TYPE girai_process_rss_bytes gauge',
+            f'girai_process_rss_bytes {current_rss()}',
+        ]
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+class RunTimer:
+    """Section timings of a single script run, forwarded to a ``Profiler``.
+
+    ``finished`` is set by the script once the run is over; anything that
+    runs after that (a fragment rerunning on its own) needs a timer of its own.
+    """
+
+    def __init__(self, profiler=None):
+        self.profiler = profiler
+        self.sections = []
+        self.finished = False
+
+    @contextmanager
+    def section(self, name):
+        rss_before = current_rss()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start, current_rss() - rss_before)
+
+    def record(self, name, seconds, rss_delta=0):
+        """Add a section timed elsewhere, e.g. in a worker process."""
+        self.sections.append({'section': name, 'seconds': seconds, 'rss_delta': rss_delta})
+        if self.profiler is not None:
+            self.profiler.record(name, seconds, rss_delta)
+
+
+def start_metrics_server(profiler, port, host='127.0.0.1'):
+    """Serve ``profiler.prometheus()`` on http://host:port/metrics from a daemon thread."""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip('/') != '/metrics':
+                self.send_error(404)
+                return
+            body = profiler.prometheus().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name='girai-metrics', daemon=True).start()
+    return server
@@ -0,0 +1,165 @@
+"""Headless versions of the dashboard computations.
+
+The functions here return plain JSON-ready structures built from the same
+aggregates and lookups the dashboard renders, so other tools can consume
+GIRAI metrics without a Streamlit session. ``QueryService`` bundles one
+loaded dataset with its aggregates and reloads when the workbook changes.
+"""
+import math
+import threading
+
+import numpy as np
+
+from girai import aggregates, countries, cube, figures, loader, lookup, similarity, snapshot
+
+
+def _clean(value):
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def _records(df):
+    return [{k: _clean(v) for k, v in row.items()} for row in df.to_dict('records')]
+
+
+def regional_averages(aggs):
+    """Mean, standard deviation and bootstrap interval of the Index score per GIRAI region."""
+    regional = aggs['regional'].rename_axis('region').reset_index()
+    return _records(regional)
+
+
+def development_stats(aggs):
+    """Min/max/median/mean Index score, and the mean's interval, per development status."""
+    return _records(aggs['dev_stats'].rename(columns={'Development_Status': 'status'}))
+
+
+def thematic_pivot(aggs):
+    """Mean thematic-area score per development status, as a labelled matrix.
+
+    ``counts``/``totals`` are the scored and all country rows behind each
+    value and ``ci_low``/``ci_high`` its bootstrap interval.
+    """
+    pivot = aggs['thematic']
+    return {
+        'statuses': [str(s) for s in pivot.index],
+        'thematic_areas': list(pivot.columns),
+        'values': [[_clean(v) for v in row] for row in pivot.values],
+        'counts': [[int(v) for v in row] for row in aggs['thematic_count'].fillna(0).values],
+        'totals': [[int(v) for v in row] for row in aggs['thematic_total'].fillna(0).values],
+        'ci_low': [[_clean(v) for v in row] for row in aggs['thematic_ci_low'].values],
+        'ci_high': [[_clean(v) for v in row] for row in aggs['thematic_ci_high'].values],
+    }
+
+
+def drill_down(scores_cube, path=(), measure='ta_score'):
+    """One step of the status > region > country drill-down (see ``girai.cube``).
+
+    Below a partial ``path``: the mean ``measure`` per thematic area for each
+    group of the next level. At a full path (a country): every score column
+    per thematic area. KeyError for an unknown measure or country.
+    """
+    path = tuple(path)
+    if len(path) == len(cube.LEVELS):
+        table = scores_cube.indicators(path)
+        return {
+            'path': list(path),
+            'thematic_areas': list(table.index),
+            'scores': list(table.columns),
+            'values': [[_clean(v) for v in row] for row in table.values],
+        }
+    if measure not in scores_cube.measures:
+        raise KeyError(measure)
+    depth = len(path) + 1
+    table = scores_cube.table(depth, measure, path=path)
+    counts = scores_cube.table(depth, measure, 'count', path=path)
+    return {
+        'path': list(path),
+        'level': cube.LEVELS[depth - 1],
+        'measure': measure,
+        'groups': [str(g) for g in table.index],
+        'thematic_areas': list(table.columns),
+        'values': [[_clean(v) for v in row] for row in table.values],
+        'counts': counts.values.tolist(),
+    }
+
+
+def focus_metrics(index, country_names, columns=figures.SPIDER_CATEGORIES):
+    """Spider-chart metrics for the given countries (unknown names are skipped)."""
+    metrics = index.metrics(country_names, columns)
+    return _records(metrics.rename_axis('Country').reset_index())
+
+
+def similar_countries(index, country, k=5):
+    """The ``k`` countries nearest ``country`` by thematic-area profile (KeyError if unknown)."""
+    return {
+        'country': country,
+        'similar': [match._asdict() for match in index.similar(country, k)],
+    }
+
+
+class QueryService:
+    """One loaded dataset plus everything derived from it.
+
+    ``refresh()`` reloads when the workbook's file signature changes, so a
+    long-running process always answers for the current data version.
+    """
+
+    def __init__(self, path=loader.DATA_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._signature = None
+        self.dataset = None
+        self.refresh()
+
+    def refresh(self):
+        """Reload if the workbook changed on disk; returns True when its content did.
+
+        Only the changed sheets are re-ingested and only the aggregates
+        reading them are recomputed (see ``aggregates.DEPENDENCIES``).
+        """
+        signature = snapshot.file_signature(self.path)
+        with self._lock:
+            if signature == self._signature:
+                return False
+            metadata = countries.load_metadata()
+            self.focus_groups = countries.load_focus_groups()
+            dataset, changes = loader.refresh_data(self.dataset, self.path, metadata=metadata)
+            # only now: a reload that raised (say, mid-save) is retried next time
+            self._signature = signature
+            if not changes:
+                return False
+            if self.dataset is None:
+                self.aggs = aggregates.compute_aggregates(dataset.rankings_df, dataset.data_df)
+            else:
+                self.aggs = aggregates.update_aggregates(self.aggs, dataset.rankings_df, dataset.data_df, changes)
+            if 'Rankings and Scores' in changes:
+                self.index = lookup.CountryIndex(dataset.rankings_df)
+            if 'Data' in changes:
+                self.similarity = similarity.SimilarityIndex(dataset.data_df)
+            self.dataset = dataset
+            self.version = dataset.version
+            return True
+
+    def regional(self):
+        return regional_averages(self.aggs)
+
+    def development(self):
+        return development_stats(self.aggs)
+
+    def thematic(self):
+        return thematic_pivot(self.aggs)
+
+    def drill(self, path=(), measure='ta_score'):
+        return drill_down(self.aggs['cube'], path, measure)
+
+    def focus(self, country_names=None, group=None):
+        if country_names is None:
+            # KeyError for an unknown group; the first group is the default
+            country_names = self.focus_groups[group] if group else next(iter(self.focus_groups.values()))
+        return focus_metrics(self.index, country_names)
+
+    def similar(self, country, k=5):
+        return similar_countries(self.similarity, country, k)
@@ -0,0 +1,183 @@
+"""Registry of GIRAI editions found under ``data/``.
+
+Every ``*.xlsx`` workbook in the data directory is an edition (official
+releases as well as internal re-scorings). Editions are loaded lazily on
+first request and kept in an LRU bounded by an approximate memory budget,
+so one process can serve several editions without holding all of them.
+``refresh()`` picks up edits to loaded workbooks for the price of one
+``stat`` each, re-ingesting only the sheets that changed, and workbooks
+added to or removed from the directory for one more. With a shared
+directory (``shm_dir``, see girai/shared.py) the frames are memory-mapped
+from files one process publishes for all of them.
+"""
+import glob
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from girai import countries, loader, shared, snapshot
+
+DATA_DIR = 'data'
+DEFAULT_MEMORY_BUDGET_MB = float(os.environ.get('GIRAI_EDITION_MEMORY_MB', 512))
+
+_EDITION_RE = re.compile(r'GIRAI_(\d{4})_Edition', re.IGNORECASE)
+
+
+def edition_label(path):
+    """'GIRAI_2024_Edition_Data.xlsx' -> '2024 Edition'; other workbooks keep their stem."""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    match = _EDITION_RE.search(stem)
+    if match is None:
+        return stem
+    suffix = stem[match.end():].replace('_Data', '').strip('_').replace('_', ' ')
+    return f"{match.group(1)} Edition" + (f" ({suffix})" if suffix else "")
+
+
+def edition_year(path):
+    """The year in an edition's file name, or None for an undated workbook (e.g. a re-scoring)."""
+    match = _EDITION_RE.search(os.path.basename(path))
+    return int(match.group(1)) if match else None
+
+
+def discover(data_dir=DATA_DIR):
+    """{label: path} for every workbook in ``data_dir``, newest edition first, undated ones last."""
+    paths = [p for p in glob.glob(os.path.join(data_dir, '*.xlsx'))
+             if not os.path.basename(p).startswith('~$')]
+
+    def sort_key(path):
+        year = edition_year(path)
+        return (year is None, -(year or 0), os.path.basename(path))
+
+    return OrderedDict((edition_label(p), p) for p in sorted(paths, key=sort_key))
+
+
+def dataset_nbytes(dataset):
+    return int(dataset.rankings_df.memory_usage(deep=True).sum() + dataset.data_df.memory_usage(deep=True).sum())
+
+
+class EditionRegistry:
+    """Lazily loaded editions held in an LRU with a memory cap.
+
+    ``get(label)`` returns the edition's ``loader.Dataset``. The returned
+    frames are shared between callers and must not be modified. The most
+    recently loaded edition is always kept, even if it alone exceeds the
+    budget.
+    """
+
+    def __init__(self, data_dir=DATA_DIR, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB, metadata=None,
+                 shm_dir=shared.SHM_DIR):
+        self.data_dir = data_dir
+        self.shm_dir = shm_dir
+        self.memory_budget = int(memory_budget_mb * 1024 * 1024)
+        self.metadata = countries.load_metadata() if metadata is None else metadata
+        self._dir_mtime = os.stat(data_dir).st_mtime_ns
+        self.paths = discover(data_dir)
+        self._loaded = OrderedDict()
+        self._sizes = {}
+        self._signatures = {}
+        self._lock = threading.Lock()
+        self._load_locks = {}
+
+    def names(self):
+        return list(self.paths)
+
+    def dated(self):
+        """Labels of the editions with a year in their file name, newest first."""
+        return [label for label, path in self.paths.items() if edition_year(path) is not None]
+
+    @property
+    def default(self):
+        return next(iter(self.paths))
+
+    def rescan(self):
+        """Pick up workbooks added to or removed from the data directory."""
+        with self._lock:
+            # read before listing, so a change made meanwhile is seen next time
+            self._dir_mtime = os.stat(self.data_dir).st_mtime_ns
+            self.paths = discover(self.data_dir)
+            for label in [l for l in self._loaded if l not in self.paths]:
+                self._evict(label)
+
+    def loaded(self):
+        """{label: bytes} for the editions currently in memory."""
+        with self._lock:
+            return {label: self._sizes[label] for label in self._loaded}
+
+    def get(self, label=None):
+        label = label or self.default
+        if label not in self.paths:
+            raise KeyError(f"unknown edition: {label!r}")
+        with self._lock:
+            if label in self._loaded:
+                self._loaded.move_to_end(label)
+                return self._loaded[label]
+            load_lock = self._load_locks.setdefault(label, threading.Lock())
+
+        # one loader per edition; other editions stay available meanwhile
+        with load_lock:
+            with self._lock:
+                if label in self._loaded:
+                    return self._loaded[label]
+            signature = snapshot.file_signature(self.paths[label])
+            dataset, _ = self._refresh_data(None, self.paths[label])
+            with self._lock:
+                self._loaded[label] = dataset
+                self._sizes[label] = dataset_nbytes(dataset)
+                self._signatures[label] = signature
+                self._enforce_budget()
+            return dataset
+
+    def refresh(self, labels=None):
+        """Reload loaded editions whose workbook changed on disk.
+
+        Workbooks added to or removed from the data directory since the
+        last scan are picked up first (see ``rescan``), so a removed
+        edition is dropped rather than reloaded.
+
+        Returns {label: changes} for the editions whose content changed,
+        with ``changes`` as returned by ``loader.refresh_data``. Callers
+        holding the previous ``Dataset`` keep a consistent (old) copy.
+        """
+        if os.stat(self.data_dir).st_mtime_ns != self._dir_mtime:
+            self.rescan()
+        with self._lock:
+            candidates = [label for label in (labels or list(self._loaded))
+                          if label in self._loaded and label in self.paths]
+            load_locks = {label: (self._load_locks[label], self.paths[label]) for label in candidates}
+        reports = {}
+        for label, (load_lock, path) in load_locks.items():
+            with load_lock:
+                try:
+                    signature = snapshot.file_signature(path)
+                except FileNotFoundError:
+                    # removed since the scan above; the next refresh() drops it
+                    continue
+                with self._lock:
+                    previous = self._loaded.get(label)
+                    if previous is None or signature == self._signatures[label]:
+                        continue
+                dataset, changes = self._refresh_data(previous, path)
+                with self._lock:
+                    if label in self._loaded:
+                        self._loaded[label] = dataset
+                        self._sizes[label] = dataset_nbytes(dataset)
+                        self._signatures[label] = signature
+                        self._enforce_budget()
+            if changes:
+                reports[label] = changes
+        return reports
+
+    def _refresh_data(self, previous, path):
+        if self.shm_dir:
+            return shared.refresh_data(previous, path, metadata=self.metadata, shm_dir=self.shm_dir)
+        return loader.refresh_data(previous, path, metadata=self.metadata)
+
+    def _evict(self, label):
+        self._loaded.pop(label, None)
+        self._sizes.pop(label, None)
+        self._signatures.pop(label, None)
+
+    def _enforce_budget(self):
+        while len(self._loaded) > 1 and sum(self._sizes.values()) > self.memory_budget:
+            self._evict(next(iter(self._loaded)))
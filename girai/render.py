@@ -0,0 +1,238 @@
+"""Figure construction in worker processes.
+
+The figure builders spend their time in Python (Plotly validation and
+pandas glue), so threads cannot run them in parallel. ``FigurePool`` runs
+them in worker processes instead. Each worker loads the dataset once per
+version: it memory-maps the shared publication when a shared directory is
+configured (see ``girai.shared``), and otherwise reads it from the snapshot
+cache. A worker returns the figure serialized as JSON, and the caller
+turns that back into a figure without validating it again.
+
+``FigurePool.submit`` is meant to be passed as the ``build`` of a
+``figures.FigureCache.get``/``prefetch`` request. The cache's key and
+single-flight logic then work exactly as they do for in-process builds.
+"""
+import atexit
+import json
+import os
+import pickle
+import queue
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from girai import aggregates, countries, figures, loader, lookup, shared, snapshot
+
+
+def build_figure(kind, state, dataset, metadata, index, aggs=None):
+    """The dashboard figure ``kind`` for widget ``state``.
+
+    ``state`` is what the dashboard keys the figure on: ``(highlight_view,
+    map_geometry)`` for the map and the tuple of countries for the spider
+    chart; the other figures have none. ``aggs`` caches derived tables per
+    group between calls.
+    """
+    rankings_df, data_df = dataset.rankings_df, dataset.data_df
+    if aggs is None:
+        aggs = {}
+
+    def aggregate(group):
+        if group not in aggs:
+            aggs[group] = aggregates.compute_group(group, rankings_df, data_df)
+        return aggs[group]
+
+    if kind == 'map':
+        highlight_view, map_geometry = state
+        return figures.map_figure(rankings_df, highlight_view, metadata['short_name'].dropna().to_dict(), map_geometry)
+    if kind == 'development':
+        development = aggregate('development')
+        return figures.development_figure(development['dev_points'], development['dev_stats'])
+    if kind == 'regional':
+        return figures.regional_figure(aggregate('regional')['regional'])
+    if kind == 'heatmap':
+        thematic = aggregate('thematic')
+        return figures.heatmap_figure(
+            thematic['thematic'], thematic['thematic_count'], thematic['thematic_total'],
+            thematic['thematic_ci_low'], thematic['thematic_ci_high']
+        )
+    if kind == 'spider':
+        return figures.spider_figure(
+            index.metrics(list(state), figures.SPIDER_CATEGORIES), countries.colors(metadata)
+        )
+    raise KeyError(kind)
+
+
+def from_json(text):
+    """A figure from ``pio.to_json`` output; it was validated when it was built."""
+    return go.Figure(json.loads(text), _validate=False)
+
+
+# per worker process: path -> {'dataset', 'metadata', 'index', 'aggs'}
+_loaded = {}
+
+
+def _init_worker(template_name, template):
+    """Give the worker its parent's default Plotly template.
+
+    Importing streamlit registers its own template as the default; workers
+    do not import streamlit, and their figures would carry Plotly's.
+    """
+    pio.templates[template_name] = template
+    pio.templates.default = template_name
+
+
+def _worker_dataset(path, version, metadata_path, shm_dir, cache_dir):
+    entry = _loaded.get(path)
+    if entry is None or entry['dataset'].version != version:
+        metadata = countries.load_metadata(metadata_path)
+        if shm_dir:
+            dataset = shared.load_data(path, metadata, shm_dir=shm_dir, cache_dir=cache_dir)
+        else:
+            dataset = loader.load_data(path, metadata, cache_dir=cache_dir)
+        # a source edited since ``version`` was read yields its newer content
+        entry = _loaded[path] = {'dataset': dataset, 'metadata': metadata,
+                                 'index': lookup.CountryIndex(dataset.rankings_df), 'aggs': {}}
+    return entry
+
+
+def render(path, version, kind, state, metadata_path=countries.METADATA_PATH, shm_dir=None,
+           cache_dir=snapshot.CACHE_DIR):
+    """Build one figure in a worker; returns (figure JSON, build seconds).
+
+    ``metadata_path`` must be the country metadata the caller loaded
+    ``version`` with, or every call reloads the dataset.
+    """
+    start = time.perf_counter()
+    entry = _worker_dataset(path, version, metadata_path, shm_dir, cache_dir)
+    fig = build_figure(kind, state, entry['dataset'], entry['metadata'], entry['index'], entry['aggs'])
+    text = pio.to_json(fig, validate=False)
+    return text, time.perf_counter() - start
+
+
+# the directory holding the girai package
+_PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class _Worker:
+    """One worker process, started as ``python -m girai.render``.
+
+    Requests and replies are pickled over the process's stdin and stdout.
+    The worker runs this module as its main module: a multiprocessing child
+    would first re-run its parent's ``__main__``, and under ``streamlit run``
+    that is the dashboard script, which would then start a pool of its own.
+    """
+
+    def __init__(self, template_name, template):
+        env = dict(os.environ)
+        # the package must be importable however the dashboard was launched
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [_PACKAGE_ROOT, env.get('PYTHONPATH')]))
+        self.process = subprocess.Popen(
+            [sys.executable, '-m', 'girai.render'], stdin=subprocess.PIPE, stdout=subprocess.PIPE, env=env
+        )
+        self._send((template_name, template))
+
+    def _send(self, message):
+        pickle.dump(message, self.process.stdin)
+        self.process.stdin.flush()
+
+    def call(self, args):
+        """``render(*args)`` in the worker; its exception is re-raised here."""
+        self._send(args)
+        ok, value = pickle.load(self.process.stdout)
+        if not ok:
+            raise value
+        return value
+
+    def alive(self):
+        return self.process.poll() is None
+
+    def close(self):
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        self.process.wait()
+
+
+class FigurePool:
+    """Worker processes for figure builds, plus the threads that wait on them.
+
+    The threads are what a ``FigureCache.prefetch`` runs on. Each build
+    takes an idle worker, hands it the build and waits for the result. The
+    workers are started up front; one that dies is replaced by the next build
+    that would have used it. ``shutdown`` stops them, and runs at exit if
+    nothing called it before.
+    """
+
+    def __init__(self, workers, metadata_path=countries.METADATA_PATH, shm_dir=None,
+                 cache_dir=snapshot.CACHE_DIR):
+        # workers build with the default template of this process, see _init_worker
+        self._template = (pio.templates.default, pio.templates[pio.templates.default])
+        self._idle = queue.SimpleQueue()
+        for _ in range(workers):
+            self._idle.put(_Worker(*self._template))
+        self.workers = workers
+        self.threads = ThreadPoolExecutor(workers, thread_name_prefix='girai-figures')
+        self.metadata_path = metadata_path
+        self.shm_dir = shm_dir
+        self.cache_dir = cache_dir
+        self._closed = False
+        atexit.register(self.shutdown)
+
+    def submit(self, path, version, kind, state, timer=None):
+        """A ``build`` callable for ``FigureCache.get`` that runs in a worker.
+
+        ``timer`` (a ``profiling.RunTimer``) records the worker's build time
+        as section ``build.<kind>``.
+        """
+        def build():
+            worker = self._idle.get()
+            try:
+                text, seconds = worker.call(
+                    (path, version, kind, state, self.metadata_path, self.shm_dir, self.cache_dir)
+                )
+            finally:
+                if not worker.alive():
+                    worker.close()
+                    worker = _Worker(*self._template)
+                self._idle.put(worker)
+            if timer is not None:
+                timer.record(f'build.{kind}', seconds)
+            return from_json(text)
+        return build
+
+    def shutdown(self):
+        if self._closed:
+            return
+        self._closed = True
+        atexit.unregister(self.shutdown)
+        self.threads.shutdown()
+        for _ in range(self.workers):
+            self._idle.get().close()
+
+
+def serve(requests, replies):
+    """A worker's loop: the template for ``_init_worker``, then ``render`` arguments until EOF."""
+    _init_worker(*pickle.load(requests))
+    while True:
+        try:
+            args = pickle.load(requests)
+        except EOFError:
+            return
+        try:
+            reply = (True, render(*args))
+        except Exception as exc:
+            reply = (False, exc)
+        pickle.dump(reply, replies)
+        replies.flush()
+
+
+if __name__ == '__main__':
+    # stdout carries the replies, so anything printed goes to stderr instead
+    replies = os.fdopen(os.dup(sys.stdout.fileno()), 'wb')
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    serve(sys.stdin.buffer, replies)
@@ -0,0 +1,179 @@
+"""Local HTTP/JSON endpoint over ``girai.query``.
+
+    python -m girai.server [--host 127.0.0.1] [--port 8600] [--workbook PATH]
+
+Routes (all GET):
+
+    /version        current dataset version
+    /regional       regional Index score mean/std
+    /development    Index score stats per development status
+    /thematic       thematic-area x development-status matrix
+    /drill          drill-down table; ?path=<status>,<region>,<country> (any
+                    prefix) and ?measure=<score column>
+    /focus-groups   configured focus groups
+    /focus          spider metrics; ?group=<label> or ?countries=A,B,C
+    /similar        nearest countries by thematic-area scores; ?country=<name>
+                    (required) and ?k=<count> (at least 1; at most 10 come back)
+
+Responses are cached per (route, query) for the current dataset version and
+carry an ETag derived from it, so pollers sending ``If-None-Match`` get a
+304 without any recomputation. The workbook is re-checked (one ``stat``) at
+most every ``--check-interval`` seconds and the cache is dropped when it
+changes.
+
+Unknown routes, countries, groups and measures get a 404; malformed or
+missing query parameters a 400; any other failure a 500.
+"""
+import argparse
+import hashlib
+import json
+import threading
+import time
+import traceback
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from girai import loader
+from girai.query import QueryService
+
+
+def _param(q, name):
+    """The required query parameter ``name``; ValueError (a 400) when missing."""
+    if not q.get(name, [''])[0]:
+        raise ValueError(f"missing ?{name}=")
+    return q[name][0]
+
+
+def _int_param(q, name, default):
+    value = q.get(name, [str(default)])[0]
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"?{name}= must be an integer, not {value!r}") from None
+
+
+ROUTES = {
+    '/version': lambda svc, q: {'version': svc.version},
+    '/regional': lambda svc, q: svc.regional(),
+    '/development': lambda svc, q: svc.development(),
+    '/thematic': lambda svc, q: svc.thematic(),
+    '/drill': lambda svc, q: svc.drill(
+        q['path'][0].split(',') if 'path' in q else (),
+        q.get('measure', ['ta_score'])[0],
+    ),
+    '/focus-groups': lambda svc, q: svc.focus_groups,
+    '/focus': lambda svc, q: svc.focus(
+        q['countries'][0].split(',') if 'countries' in q else None,
+        q.get('group', [None])[0],
+    ),
+    '/similar': lambda svc, q: svc.similar(_param(q, 'country'), _int_param(q, 'k', 5)),
+}
+
+
+class ResponseCache:
+    """(route, query) -> (etag, body) for one dataset version."""
+
+    def __init__(self, service, check_interval=2.0):
+        self.service = service
+        self.check_interval = check_interval
+        self._entries = {}
+        self._lock = threading.Lock()
+        # guards the test-and-set of _last_check, so one request refreshes
+        self._check_lock = threading.Lock()
+        self._last_check = time.monotonic()
+        self.hits = 0
+        self.misses = 0
+
+    def _maybe_refresh(self):
+        now = time.monotonic()
+        with self._check_lock:
+            if now - self._last_check < self.check_interval:
+                return
+            self._last_check = now
+        if self.service.refresh():
+            with self._lock:
+                self._entries.clear()
+
+    def get(self, route, query):
+        self._maybe_refresh()
+        key = (route, tuple(sorted((k, tuple(v)) for k, v in query.items())))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                return entry
+            self.misses += 1
+        version = self.service.version
+        body = json.dumps(ROUTES[route](self.service, query), allow_nan=False).encode()
+        etag = '"%s-%s"' % (version, hashlib.sha1(repr(key).encode()).hexdigest()[:12])
+        with self._lock:
+            # a refresh while the body was built may have cleared the cache
+            # after it; a body of the previous version must not outlive that
+            if self.service.version == version:
+                self._entries[key] = (etag, body)
+        return etag, body
+
+
+def make_handler(cache):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlsplit(self.path)
+            route = url.path.rstrip('/') or '/'
+            if route not in ROUTES:
+                return self._send(404, json.dumps({'error': f'unknown route {route}'}).encode())
+            try:
+                etag, body = cache.get(route, parse_qs(url.query))
+            except KeyError as exc:
+                return self._send(404, json.dumps({'error': f'not found: {exc}'}).encode())
+            except ValueError as exc:
+                # bad query parameters: a missing country, a k that is not a positive integer,
+                # a drill path deeper than the hierarchy, ...
+                return self._send(400, json.dumps({'error': str(exc)}).encode())
+            except Exception as exc:
+                traceback.print_exc()
+                return self._send(500, json.dumps({'error': f'internal error: {type(exc).__name__}'}).encode())
+            if self.headers.get('If-None-Match') == etag:
+                return self._send(304, b'', etag)
+            self._send(200, body, etag)
+
+        def _send(self, status, body, etag=None):
+            self.send_response(status)
+            if etag:
+                self.send_header('ETag', etag)
+                self.send_header('Cache-Control', 'no-cache')
+            if body:
+                self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(host='127.0.0.1', port=8600, workbook=loader.DATA_PATH, check_interval=2.0):
+    cache = ResponseCache(QueryService(workbook), check_interval)
+    server = ThreadingHTTPServer((host, port), make_handler(cache))
+    print(f"serving GIRAI queries for {workbook} on http://{host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve GIRAI dashboard metrics as JSON.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8600)
+    parser.add_argument('--workbook', default=loader.DATA_PATH)
+    parser.add_argument('--check-interval', type=float, default=2.0)
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workbook, args.check_interval)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+"""Process-shared, memory-mapped datasets for multi-worker deployments.
+
+Every Streamlit server process used to parse the workbook itself and hold
+private copies of both frames. With a shared directory configured
+(``GIRAI_SHM_DIR``, ideally under the RAM-backed ``/dev/shm``), the first
+process that needs a dataset loads it once and publishes the preprocessed
+frames there as Arrow IPC files; every process, the first included, then
+memory-maps them. Numeric columns are views of the shared pages and cost
+a worker no private memory; text columns are still materialized per
+process.
+
+    GIRAI_SHM_DIR=/dev/shm/girai streamlit run dashboard.py
+    python -m girai.shared data/GIRAI_2024_Edition_Data.xlsx   # fill before starting workers
+
+A manifest per source records the source keys (``loader.source_keys``) the
+files were built from. A stale publication is rebuilt, under a file lock,
+by whichever process notices first; only the sheets that changed are
+re-ingested and re-written.
+"""
+import argparse
+import fcntl
+import hashlib
+import json
+import os
+import re
+from contextlib import contextmanager
+
+from girai import aggregates, countries, loader, snapshot
+
+SHM_DIR = os.environ.get('GIRAI_SHM_DIR')
+
+
+def _stem(path):
+    name = os.path.splitext(os.path.basename(os.path.normpath(path)))[0]
+    digest = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:8]
+    return f"{re.sub(r'[^A-Za-z0-9]+', '_', name)}-{digest}"
+
+
+def _manifest_path(path, shm_dir):
+    return os.path.join(shm_dir, f"{_stem(path)}.json")
+
+
+def _read_manifest(path, shm_dir):
+    try:
+        with open(_manifest_path(path, shm_dir)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+@contextmanager
+def _locked(path, shm_dir):
+    """Exclusive cross-process lock for publishing ``path``."""
+    os.makedirs(shm_dir, exist_ok=True)
+    with open(os.path.join(shm_dir, f"{_stem(path)}.lock"), 'w') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def publish(dataset, path, shm_dir=SHM_DIR):
+    """Write ``dataset`` (loaded from ``path``) to ``shm_dir`` and point the manifest at it."""
+    os.makedirs(shm_dir, exist_ok=True)
+    stem = _stem(path)
+    frames = {'Rankings and Scores': dataset.rankings_df, 'Data': dataset.data_df}
+    files = {}
+    for sheet, df in frames.items():
+        name = f"{stem}-{dataset.sheet_state[sheet].version}-{loader.TABLE_FILES[sheet]}.arrow"
+        if not os.path.exists(os.path.join(shm_dir, name)):
+            snapshot.write_snapshot(df, os.path.join(shm_dir, name))
+        files[sheet] = name
+
+    manifest = {
+        'version': dataset.version,
+        'files': files,
+        'sheet_state': {sheet: list(state) for sheet, state in dataset.sheet_state.items()},
+    }
+
+    def write(tmp):
+        with open(tmp, 'w') as f:
+            json.dump(manifest, f)
+
+    snapshot.atomic_write(_manifest_path(path, shm_dir), write)
+
+    # processes still mapping an unlinked file keep valid pages until they drop it
+    for name in os.listdir(shm_dir):
+        if name.startswith(f"{stem}-") and name.endswith('.arrow') and name not in files.values():
+            os.remove(os.path.join(shm_dir, name))
+
+
+def attach(path, shm_dir=SHM_DIR, sources=None):
+    """The published ``Dataset`` for ``path``, memory-mapped; None if absent or stale.
+
+    ``sources`` (from ``loader.source_keys``) makes publications built from
+    other source keys count as stale.
+    """
+    manifest = _read_manifest(path, shm_dir)
+    if manifest is None:
+        return None
+    if any(len(s) != len(loader.SheetState._fields) for s in manifest['sheet_state'].values()):
+        # written by a version of the loader with another sheet state
+        return None
+    state = {sheet: loader.SheetState(*s) for sheet, s in manifest['sheet_state'].items()}
+    if sources is not None and any(state[sheet].source != key for sheet, key in sources.items()):
+        return None
+    try:
+        frames = {
+            sheet: snapshot.read_snapshot(os.path.join(shm_dir, name))
+            for sheet, name in manifest['files'].items()
+        }
+    except FileNotFoundError:
+        # replaced by a newer publication between reading the manifest and mapping
+        return None
+    return loader.Dataset(frames['Rankings and Scores'], frames['Data'], manifest['version'], state)
+
+
+def refresh_data(previous, path=loader.DATA_PATH, metadata=None, shm_dir=SHM_DIR,
+                 cache_dir=snapshot.CACHE_DIR):
+    """``loader.refresh_data`` backed by the shared directory.
+
+    Attaches to a current publication when there is one; otherwise loads
+    (reusing the unchanged sheets of ``previous`` or of the stale
+    publication), publishes and attaches.
+    """
+    if metadata is None:
+        metadata = countries.load_metadata()
+    sources = loader.source_keys(path, aggregates.fingerprint(metadata))
+    dataset = attach(path, shm_dir, sources)
+    if dataset is None:
+        with _locked(path, shm_dir):
+            # another process may have published while we waited
+            dataset = attach(path, shm_dir, sources)
+            if dataset is None:
+                base = previous if previous is not None else attach(path, shm_dir)
+                loaded, _ = loader.refresh_data(base, path, metadata, cache_dir)
+                publish(loaded, path, shm_dir)
+                # no source check here: a workbook edited during the load has
+                # new keys, but the publication still holds what was loaded
+                dataset = attach(path, shm_dir) or loaded
+
+    if previous is not None and dataset.version == previous.version:
+        return previous, []
+    old = previous.sheet_state if previous is not None else {}
+    changes = [
+        sheet for sheet, state in dataset.sheet_state.items()
+        if sheet not in old or old[sheet].version != state.version
+    ]
+    return dataset, changes
+
+
+def load_data(path=loader.DATA_PATH, metadata=None, shm_dir=SHM_DIR, cache_dir=snapshot.CACHE_DIR):
+    """Drop-in for ``loader.load_data`` that shares the frames across processes."""
+    return refresh_data(None, path, metadata, shm_dir, cache_dir)[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish GIRAI datasets to a shared-memory directory.")
+    parser.add_argument('paths', nargs='*', default=[loader.DATA_PATH], help="workbooks or table directories")
+    parser.add_argument('--shm-dir', default=SHM_DIR or '/dev/shm/girai')
+    args = parser.parse_args()
+
+    metadata = countries.load_metadata()
+    for path in args.paths:
+        dataset = load_data(path, metadata, shm_dir=args.shm_dir)
+        print(f"{path}: version {dataset.version} in {args.shm_dir}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,280 @@
+"""On-disk Arrow snapshots of the workbook sheets.
+
+Parsing the xlsx through openpyxl is by far the slowest part of a cold start,
+so the first load converts each sheet into an Arrow IPC file and every later
+load memory-maps that file instead. Each sheet's snapshot is keyed by that
+sheet's own digest (``xlsx_stream.sheet_digests``), so when only one sheet of
+the workbook is edited only that sheet is parsed again. A small manifest
+remembers the workbook's content hash and the mtime/size it was taken at, so
+``workbook_fingerprint`` never re-hashes an unchanged file.
+"""
+import glob
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from girai import xlsx_stream
+
+CACHE_DIR = os.environ.get("GIRAI_CACHE_DIR", os.path.join(".cache", "snapshots"))
+
+# Excel columns often mix a text sub-header with numbers (e.g. 'PILLAR SCORES').
+# Arrow needs one type per column, so such columns are split into a kind code,
+# a float column and a text column, and stitched back together on read.
+_MIXED_KEY = b"girai.mixed_columns"
+_KIND, _NUM, _TEXT = "{}::kind", "{}::num", "{}::text"
+_NULL, _FLOAT, _INT, _STR = 0, 1, 2, 3
+
+_UMASK_LOCK = threading.Lock()
+
+
+def _umask():
+    """The process umask, without changing it where /proc says what it is."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("Umask:"):
+                    return int(line.split()[1], 8)
+    except OSError:
+        pass
+    # elsewhere it can only be queried by setting it; a file another thread
+    # creates in between gets the restrictive 0777 mask, never a permissive one
+    with _UMASK_LOCK:
+        umask = os.umask(0o777)
+        os.umask(umask)
+    return umask
+
+
+def file_signature(path):
+    """Cheap (mtime, size) signature used to skip re-hashing unchanged files."""
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def content_hash(path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def slug(name):
+    """File-name-safe lowercase form of a sheet name: 'Rankings and Scores' -> 'rankings_and_scores'."""
+    return re.sub(r"[^A-Za-z0-9]+", "_", name).strip("_").lower()
+
+
+def _manifest_path(path, cache_dir):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, f"{stem}.manifest.json")
+
+
+def _read_manifest(manifest_path):
+    try:
+        with open(manifest_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def atomic_write(target, write):
+    """Write through a temp file + rename so concurrent readers never see a partial file.
+
+    The file gets the mode a plain ``open`` would give it (0666 less the
+    umask), not mkstemp's owner-only 0600, so other users can read exports.
+    """
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(target), suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp)
+        os.chmod(tmp, 0o666 & ~_umask())
+        os.replace(tmp, target)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _write_json(obj, target):
+    with open(target, "w") as f:
+        json.dump(obj, f)
+
+
+def workbook_fingerprint(path, cache_dir=CACHE_DIR):
+    """Content hash of the workbook, reusing the manifest when mtime/size are unchanged."""
+    manifest = _read_manifest(_manifest_path(path, cache_dir))
+    mtime_ns, size = file_signature(path)
+    if manifest.get("mtime_ns") == mtime_ns and manifest.get("size") == size:
+        return manifest["sha256"]
+    return content_hash(path)
+
+
+def _kind_of(value):
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return _NULL
+    if isinstance(value, (bool, np.bool_)):
+        return _STR
+    if isinstance(value, (int, np.integer)):
+        return _INT
+    if isinstance(value, (float, np.floating)):
+        return _FLOAT
+    return _STR
+
+
+def _encode_mixed(series):
+    kinds = np.fromiter((_kind_of(v) for v in series), dtype=np.int8, count=len(series))
+    values = series.to_numpy(dtype=object)
+    numeric = (kinds == _FLOAT) | (kinds == _INT)
+    num = np.full(len(series), np.nan)
+    num[numeric] = values[numeric].astype(float)
+    text = np.full(len(series), None, dtype=object)
+    text[kinds == _STR] = [str(v) for v in values[kinds == _STR]]
+    return {
+        _KIND.format(series.name): pa.array(kinds, type=pa.int8()),
+        _NUM.format(series.name): pa.array(num, type=pa.float64()),
+        _TEXT.format(series.name): pa.array(text, type=pa.string()),
+    }
+
+
+def _decode_mixed(df, name):
+    kinds = df.pop(_KIND.format(name)).to_numpy()
+    num = df.pop(_NUM.format(name)).to_numpy()
+    text = df.pop(_TEXT.format(name)).to_numpy(dtype=object)
+    out = np.full(len(kinds), np.nan, dtype=object)
+    out[kinds == _FLOAT] = num[kinds == _FLOAT]
+    out[kinds == _INT] = num[kinds == _INT].astype(np.int64)
+    out[kinds == _STR] = text[kinds == _STR]
+    return out
+
+
+def frame_to_table(df):
+    """Convert a sheet DataFrame into a typed Arrow table, splitting mixed columns."""
+    columns, mixed, extension = {}, [], {}
+    for name in df.columns:
+        series = df[name]
+        if series.dtype.kind == "f":
+            # NaN stays a value rather than a null, so reads can map the buffer as is
+            columns[name] = pa.array(series.to_numpy())
+            continue
+        if isinstance(series.dtype, pd.api.extensions.ExtensionDtype):
+            extension[name] = str(series.dtype)
+        try:
+            columns[name] = pa.array(series, from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            columns.update(_encode_mixed(series))
+            mixed.append(name)
+    table = pa.table(columns)
+    meta = {"mixed": mixed, "order": list(map(str, df.columns)), "extension": extension}
+    return table.replace_schema_metadata({_MIXED_KEY: json.dumps(meta).encode()})
+
+
+def table_to_frame(table):
+    """Inverse of ``frame_to_table``.
+
+    ``split_blocks`` keeps one block per column, so numeric columns without
+    nulls stay views of the table's buffers (zero-copy when memory-mapped).
+    """
+    meta = json.loads((table.schema.metadata or {}).get(_MIXED_KEY, b'{"mixed": [], "order": []}'))
+    df = table.to_pandas(split_blocks=True)
+    for name in meta["mixed"]:
+        df[name] = _decode_mixed(df, name)
+    for name, dtype in meta.get("extension", {}).items():
+        df[name] = df[name].astype(dtype)
+    if meta["order"]:
+        # df[order] would copy every column out of the mapped buffers
+        df = pd.DataFrame({name: df[name] for name in meta["order"]}, copy=False)
+    return df
+
+
+def _snapshot_path(path, sheet_name, digest, cache_dir, columns=None):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    name = slug(sheet_name)
+    if columns is not None:
+        # projected snapshots must not be confused with full-sheet ones
+        name += "-" + hashlib.sha1(json.dumps(list(columns)).encode()).hexdigest()[:8]
+    return os.path.join(cache_dir, f"{stem}-{digest[:16]}-{name}.arrow")
+
+
+def write_snapshot(df, target):
+    table = frame_to_table(df)
+
+    def write(tmp):
+        with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+    atomic_write(target, write)
+
+
+def read_snapshot(target):
+    with pa.memory_map(target, "r") as source:
+        return table_to_frame(pa.ipc.open_file(source).read_all())
+
+
+def prune(target, digest):
+    """Drop the files next to ``target`` written for other versions of the same content.
+
+    ``target``'s name has ``digest[:16]`` between dashes; files whose name
+    differs only there are older versions (of the same sheet and projection,
+    for snapshots) and are removed.
+    """
+    directory, name = os.path.split(target)
+    prefix, suffix = name.split(f"-{digest[:16]}-", 1)
+    pattern = f"{glob.escape(prefix)}-{'?' * 16}-{glob.escape(suffix)}"
+    for stale in glob.glob(os.path.join(directory, pattern)):
+        if stale != target:
+            os.remove(stale)
+
+
+def parse_workbook(path, projection, engine="stream"):
+    """Parse sheets straight from the xlsx. ``projection`` maps sheet -> columns (or None)."""
+    if engine == "stream":
+        return xlsx_stream.read_workbook(path, projection)
+    if engine == "openpyxl":
+        return {
+            sheet: pd.read_excel(path, sheet_name=sheet, usecols=columns)[columns or slice(None)]
+            for sheet, columns in projection.items()
+        }
+    raise ValueError(f"unknown engine: {engine!r}")
+
+
+def read_sheets(path, sheet_names, cache_dir=CACHE_DIR, columns=None, engine="stream"):
+    """Return {sheet_name: DataFrame}, served from Arrow snapshots when they are current.
+
+    ``columns`` optionally maps a sheet name to the list of columns to keep.
+    Missing or stale snapshots are rebuilt from the workbook in one pass
+    (see ``girai.xlsx_stream``) covering only the sheets that changed.
+    """
+    columns = columns or {}
+    os.makedirs(cache_dir, exist_ok=True)
+    digests = xlsx_stream.sheet_digests(path, sheet_names)
+    targets = {
+        sheet: _snapshot_path(path, sheet, digests[sheet], cache_dir, columns.get(sheet))
+        for sheet in sheet_names
+    }
+
+    missing = [sheet for sheet, target in targets.items() if not os.path.exists(target)]
+    frames = {}
+    if missing:
+        parsed = parse_workbook(path, {sheet: columns.get(sheet) for sheet in missing}, engine)
+        for sheet in missing:
+            write_snapshot(parsed[sheet], targets[sheet])
+            prune(targets[sheet], digests[sheet])
+            frames[sheet] = parsed[sheet]
+
+    digest = workbook_fingerprint(path, cache_dir)
+    mtime_ns, size = file_signature(path)
+    manifest_path = _manifest_path(path, cache_dir)
+    manifest = {"sha256": digest, "mtime_ns": mtime_ns, "size": size}
+    if _read_manifest(manifest_path) != manifest:
+        atomic_write(manifest_path, lambda tmp: _write_json(manifest, tmp))
+
+    for sheet in sheet_names:
+        if sheet not in frames:
+            frames[sheet] = read_snapshot(targets[sheet])
+    return frames
@@ -0,0 +1,188 @@
+"""Synthetic GIRAI-shaped datasets for scale testing.
+
+Generates the two tables ``loader.load_data`` expects - 'Rankings and
+Scores' (one row per entity) and 'Data' (one row per entity x thematic
+area) - at any size, plus a matching ``country_metadata.csv`` so
+development-status charts have something to group. Everything is
+vectorized and seeded, so a given set of arguments always produces the
+same data.
+
+    python -m girai.synthetic --entities 100000 --thematic-areas 19 \\
+        --format parquet --out /tmp/girai_1m
+
+``--format xlsx`` writes one workbook (capped at Excel's 1,048,576 rows
+per sheet); ``csv`` and ``parquet`` write a directory with one file per
+sheet that ``loader.load_data`` reads directly.
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from girai import loader
+
+REGIONS = ['Africa', 'Europe', 'Asia and Oceania', 'South and Central America',
+           'Middle East', 'Caribbean', 'North America']
+REGION_WEIGHTS = [0.30, 0.23, 0.22, 0.10, 0.065, 0.065, 0.02]
+
+REAL_THEMATIC_AREAS = [
+    'Access to Remedy and Redress', 'Bias and Unfair Discrimination', "Children's Rights",
+    'Competitions Authorities', 'Cultural and Linguistic Diversity', 'Data Protection and Privacy',
+    'Gender Equality', 'Human Oversight and Determination', 'Impact Assessments',
+    'International Cooperation', 'Labour Protection and Right to Work', 'National AI Policy',
+    'Proportionality and Do No Harm', 'Public Participation and Awareness', 'Public Procurement',
+    'Public Sector Skills Development', 'Responsibility and Accountability',
+    'Safety, Accuracy and Reliability', 'Transparency and Explainability',
+]
+
+STATUSES = ['Developed', 'Developing', 'Underdeveloped', 'Other']
+STATUS_WEIGHTS = [0.1, 0.1, 0.1, 0.7]
+
+# upper bounds of the three pillar contributions to a thematic-area score
+PILLAR_CAPS = {'fr_weighted_score': 40.0, 'ga_weighted_score': 40.0, 'nsa_weighted_score': 20.0}
+
+EXCEL_MAX_ROWS = 1_048_576
+
+
+def thematic_areas(count):
+    """The real thematic areas first, then numbered extra indicators."""
+    extra = [f"Thematic Area {i}" for i in range(len(REAL_THEMATIC_AREAS) + 1, count + 1)]
+    return (REAL_THEMATIC_AREAS + extra)[:count]
+
+
+def _codes(n):
+    """Unique upper-case codes 'AAA', 'AAB', ... (longer once three letters run out)."""
+    width = max(3, int(np.ceil(np.log(max(n, 2)) / np.log(26))))
+    digits = (np.arange(n)[:, None] // 26 ** np.arange(width - 1, -1, -1)) % 26
+    letters = np.array(list('ABCDEFGHIJKLMNOPQRSTUVWXYZ'))
+    codes = letters[digits[:, 0]]
+    for i in range(1, width):
+        codes = np.char.add(codes, letters[digits[:, i]])
+    return codes.astype(object)
+
+
+def generate(entities, n_areas=len(REAL_THEMATIC_AREAS), missing=0.0, seed=0):
+    """Return (rankings_df, data_df, metadata) with ``entities * n_areas`` Data rows.
+
+    ``missing`` is the fraction of thematic-area scores left empty; a row
+    without a ``ta_score`` has no pillar scores either.
+    """
+    rng = np.random.default_rng(seed)
+    areas = thematic_areas(n_areas)
+
+    iso3 = _codes(entities)
+    names = np.char.add('Entity ', np.char.zfill(np.arange(entities).astype(str), len(str(entities)))).astype(object)
+    regions = rng.choice(REGIONS, size=entities, p=REGION_WEIGHTS).astype(object)
+
+    # entity capacity x area difficulty, then split across the three pillars
+    capacity = rng.beta(1.2, 2.5, size=(entities, 1))
+    difficulty = rng.uniform(0.5, 1.2, size=(1, n_areas))
+    shares = rng.dirichlet([2.0, 2.0, 1.0], size=(entities, n_areas))
+    base = np.clip(capacity * difficulty + rng.normal(0, 0.08, (entities, n_areas)), 0, 1)
+    pillars = {
+        col: np.minimum(base * shares[..., i] * 100, cap)
+        for i, (col, cap) in enumerate(PILLAR_CAPS.items())
+    }
+    ta_score = sum(pillars.values())
+    if missing:
+        unscored = rng.random(ta_score.shape) < missing
+        ta_score[unscored] = np.nan
+        for values in pillars.values():
+            values[unscored] = np.nan
+
+    data_df = pd.DataFrame({
+        'country': np.repeat(names, n_areas),
+        'ISO3': np.repeat(iso3, n_areas),
+        'GIRAI_region': np.repeat(regions, n_areas),
+        'thematic_area': np.tile(np.array(areas, dtype=object), entities),
+        'ta_score': ta_score.ravel(),
+        **{col: values.ravel() for col, values in pillars.items()},
+    })
+
+    index_score = np.round(np.nanmean(ta_score, axis=1), 2)
+    order = np.argsort(-index_score, kind='stable')
+    rankings_df = pd.DataFrame({
+        'Ranking': np.arange(1, entities + 1, dtype=float),
+        'ISO3': iso3[order],
+        'Country': names[order],
+        'GIRAI_region': regions[order],
+        'Index score': index_score[order],
+        'PILLAR SCORES': np.nanmean(pillars['fr_weighted_score'], axis=1)[order] * 2.5,
+        'DIMENSION SCORES': np.clip(index_score[order] + rng.normal(0, 5, entities), 0, 100),
+    })
+
+    metadata = pd.DataFrame({
+        'Country': names,
+        'ISO3': iso3,
+        'Development_Status': rng.choice(STATUSES, size=entities, p=STATUS_WEIGHTS),
+        'color': None,
+        'short_name': None,
+        'highlight_order': pd.array([pd.NA] * entities, dtype='Int64'),
+    })
+    return rankings_df, data_df, metadata
+
+
+def write(rankings_df, data_df, metadata, out, fmt):
+    """Write the tables as ``fmt`` ('xlsx', 'csv' or 'parquet'); returns the dataset path."""
+    if fmt == 'xlsx':
+        if len(data_df) + 1 > EXCEL_MAX_ROWS:
+            raise ValueError(f"{len(data_df)} Data rows do not fit in one Excel sheet; use csv or parquet")
+        path = out if out.endswith('.xlsx') else out + '.xlsx'
+        _write_xlsx(path, {'Rankings and Scores': _with_subheader(rankings_df), 'Data': data_df})
+        metadata.to_csv(os.path.splitext(path)[0] + '_country_metadata.csv', index=False)
+        return path
+
+    os.makedirs(out, exist_ok=True)
+    for sheet, df in [('Rankings and Scores', rankings_df), ('Data', data_df)]:
+        target = os.path.join(out, f"{loader.TABLE_FILES[sheet]}.{fmt}")
+        if fmt == 'csv':
+            df.to_csv(target, index=False)
+        elif fmt == 'parquet':
+            df.to_parquet(target, index=False)
+        else:
+            raise ValueError(f"unknown format: {fmt!r}")
+    metadata.to_csv(os.path.join(out, 'country_metadata.csv'), index=False)
+    return out
+
+
+def _with_subheader(rankings_df):
+    """Mimic the workbook's text sub-header row under 'PILLAR SCORES' / 'DIMENSION SCORES'."""
+    subheader = pd.DataFrame([{
+        'PILLAR SCORES': 'Government frameworks (0-100)',
+        'DIMENSION SCORES': 'Human Rights and AI (0-100)',
+    }], columns=rankings_df.columns)
+    return pd.concat([subheader, rankings_df.astype(object)], ignore_index=True)
+
+
+def _write_xlsx(path, sheets):
+    # write-only mode streams rows out instead of holding every cell object
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    for name, df in sheets.items():
+        ws = wb.create_sheet(name)
+        ws.append(list(df.columns))
+        values = df.astype(object).where(df.notna(), None)
+        for row in values.itertuples(index=False, name=None):
+            ws.append(row)
+    wb.save(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic GIRAI-shaped dataset.")
+    parser.add_argument('--entities', type=int, default=1000, help="countries / sub-national entities")
+    parser.add_argument('--thematic-areas', type=int, default=len(REAL_THEMATIC_AREAS))
+    parser.add_argument('--missing', type=float, default=0.0, help="fraction of empty ta_score cells")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--format', choices=['xlsx', 'csv', 'parquet'], default='parquet')
+    parser.add_argument('--out', required=True)
+    args = parser.parse_args()
+
+    rankings_df, data_df, metadata = generate(args.entities, args.thematic_areas, args.missing, args.seed)
+    path = write(rankings_df, data_df, metadata, args.out, args.format)
+    print(f"wrote {len(rankings_df)} entities / {len(data_df)} Data rows to {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,200 @@
+"""Single-pass streaming reader for the GIRAI workbook.
+
+``pd.read_excel`` opens the zip archive once per sheet, builds every cell of
+every column through openpyxl and inflates the shared-strings table each
+time. This reader opens the archive once, decodes ``sharedStrings.xml`` once,
+and walks each requested sheet's XML with ``iterparse``, keeping only the
+projected columns. The kept cells go through pandas' own ``TextParser`` with
+the options ``read_excel`` uses, so dtypes and NA handling match.
+
+Cells are converted the way pandas' openpyxl reader does (errors become NaN,
+integral numbers become ints). Date number formats are not interpreted, so
+date-styled cells come back as Excel serial numbers; the GIRAI sheets have
+none in the columns the dashboard reads.
+"""
+import hashlib
+import posixpath
+import re
+import zipfile
+from xml.etree.ElementTree import iterparse
+
+import numpy as np
+from pandas.io.parsers import TextParser
+
+_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+_CELL_REF = re.compile(r"([A-Z]+)(\d+)")
+
+
+def _column_index(letters):
+    idx = 0
+    for ch in letters:
+        idx = idx * 26 + (ord(ch) - 64)
+    return idx - 1
+
+
+def _text_of(elem):
+    """Concatenate every <t> below an <si>/<is> element (rich text comes in runs)."""
+    return "".join(t.text or "" for t in elem.iter(f"{_NS}t"))
+
+
+def _sheet_targets(zf):
+    rels = {}
+    for _, rel in iterparse(zf.open("xl/_rels/workbook.xml.rels")):
+        if rel.tag == f"{_PKG_REL_NS}Relationship":
+            target = rel.get("Target")
+            rels[rel.get("Id")] = target.lstrip("/") if target.startswith("/") else posixpath.join("xl", target)
+    targets = {}
+    for _, sheet in iterparse(zf.open("xl/workbook.xml")):
+        if sheet.tag == f"{_NS}sheet":
+            targets[sheet.get("name")] = rels[sheet.get(f"{_REL_NS}id")]
+    return targets
+
+
+def _shared_strings(zf):
+    if "xl/sharedStrings.xml" not in zf.namelist():
+        return []
+    strings = []
+    for _, elem in iterparse(zf.open("xl/sharedStrings.xml")):
+        if elem.tag == f"{_NS}si":
+            strings.append(_text_of(elem))
+            elem.clear()
+    return strings
+
+
+def _convert(cell, shared):
+    kind = cell.get("t", "n")
+    if kind == "inlineStr":
+        node = cell.find(f"{_NS}is")
+        return _text_of(node) if node is not None else ""
+    value = cell.findtext(f"{_NS}v")
+    if not value:
+        # openpyxl writes <v></v> for cells it has no value for
+        return ""
+    if kind == "s":
+        return shared[int(value)]
+    if kind == "e":
+        return np.nan
+    if kind == "b":
+        return value == "1"
+    if kind in ("str", "d"):
+        return value
+    number = float(value)
+    return int(number) if number.is_integer() else number
+
+
+def _header_names(header):
+    """Name header cells the way ``read_excel`` does (blank -> 'Unnamed: i', dupes -> 'x.1')."""
+    names, seen = [], {}
+    for i, value in enumerate(header):
+        name = f"Unnamed: {i}" if value == "" or value is None else str(value)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _iter_rows(zf, target, shared):
+    """Yield (row_index, {column_index: value}) for every <row>, skipping empty cells."""
+    next_row = 0
+    for _, elem in iterparse(zf.open(target)):
+        if elem.tag != f"{_NS}row":
+            continue
+        row_idx = int(elem.get("r", next_row + 1)) - 1
+        cells, next_col = {}, 0
+        for cell in elem.iter(f"{_NS}c"):
+            ref = cell.get("r")
+            col_idx = _column_index(_CELL_REF.match(ref).group(1)) if ref else next_col
+            value = _convert(cell, shared)
+            if value != "":
+                cells[col_idx] = value
+            next_col = col_idx + 1
+        elem.clear()
+        next_row = row_idx + 1
+        yield row_idx, cells
+
+
+def _read_sheet(zf, target, shared, columns):
+    rows = _iter_rows(zf, target, shared)
+    header_idx, header_cells = next(rows, (0, {}))
+
+    if columns is None:
+        # the sheet width is only known once every row has been seen
+        body = list(rows)
+        width = max([max(c, default=-1) for _, c in body] + [max(header_cells, default=-1)]) + 1
+        names = _header_names([header_cells.get(i, "") for i in range(width)])
+        keep = list(range(width))
+    else:
+        names = _header_names([header_cells.get(i, "") for i in range(max(header_cells, default=-1) + 1)])
+        missing = [c for c in columns if c not in names]
+        if missing:
+            raise KeyError(f"columns not found in sheet: {missing}")
+        keep = [names.index(c) for c in columns]
+        body = rows
+
+    data, last_with_data = [], -1
+    expected = header_idx + 1
+    for row_idx, cells in body:
+        # rows Excel leaves out of the XML are blank rows to read_excel
+        data.extend([""] * len(keep) for _ in range(row_idx - expected))
+        expected = row_idx + 1
+        if cells:
+            last_with_data = len(data)
+        data.append([cells.get(i, "") for i in keep])
+    data = data[: last_with_data + 1]
+
+    parser = TextParser(data, names=[names[i] for i in keep], header=None, skip_blank_lines=False)
+    return parser.read()
+
+
+def read_workbook(path, projection):
+    """Read several sheets in one pass over the archive.
+
+    ``projection`` maps sheet name -> list of column names to keep (``None``
+    keeps every column). Returns {sheet_name: DataFrame} with columns in the
+    requested order.
+    """
+    with zipfile.ZipFile(path) as zf:
+        targets = _sheet_targets(zf)
+        shared = _shared_strings(zf)
+        return {
+            sheet: _read_sheet(zf, targets[sheet], shared, columns)
+            for sheet, columns in projection.items()
+        }
+
+
+def read_cells(path, sheet):
+    """[(row_index, {column_index: value})] of the non-empty rows of a free-form sheet.
+
+    For sheets that are not one table under a header row, such as
+    'Dictionary'. Values are converted like ``read_workbook``'s.
+    """
+    with zipfile.ZipFile(path) as zf:
+        targets = _sheet_targets(zf)
+        shared = _shared_strings(zf)
+        return [(row_idx, cells) for row_idx, cells in _iter_rows(zf, targets[sheet], shared) if cells]
+
+
+def sheet_digests(path, sheet_names):
+    """{sheet_name: digest} that changes whenever the sheet's cells may have changed.
+
+    Built from the CRC-32 and size the zip directory already stores for the
+    sheet part and for ``sharedStrings.xml`` (string cells are indices into
+    it), so nothing is decompressed and sheets edited in place keep the
+    digest of every untouched sheet.
+    """
+    with zipfile.ZipFile(path) as zf:
+        targets = _sheet_targets(zf)
+        members = {info.filename: info for info in zf.infolist()}
+    strings = members.get("xl/sharedStrings.xml")
+    strings_key = f"{strings.CRC:08x}:{strings.file_size}" if strings else "-"
+    digests = {}
+    for sheet in sheet_names:
+        info = members[targets[sheet]]
+        key = f"{info.CRC:08x}:{info.file_size}:{strings_key}"
+        digests[sheet] = hashlib.sha256(key.encode()).hexdigest()
+    return digests
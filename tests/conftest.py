@@ -0,0 +1,45 @@
+import os
+
+import pytest
+
+from girai import countries, loader
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(autouse=True)
+def repo_root(monkeypatch):
+    """Run every test from the repository root, where the default data paths point."""
+    monkeypatch.chdir(ROOT)
+
+
+@pytest.fixture(scope='session')
+def workbook():
+    return os.path.join(ROOT, loader.DATA_PATH)
+
+
+@pytest.fixture(scope='session')
+def metadata():
+    return countries.load_metadata(os.path.join(ROOT, countries.METADATA_PATH))
+
+
+# the classification the dashboard hard-coded before data/country_metadata.csv
+DEVELOPMENT_STATUS = {
+    'Developed': ['Netherlands', 'United States of America', 'Germany', 'United Kingdom', 'Japan',
+                  'France', 'Canada', 'Australia', 'Sweden', 'Switzerland'],
+    'Developing': ['China', 'India', 'Brazil', 'Mexico', 'Indonesia', 'Turkey',
+                   'Thailand', 'Malaysia', 'South Africa'],
+    'Underdeveloped': ['Afghanistan', 'Yemen', 'Sudan', 'Ethiopia', 'Mali', 'Niger',
+                       'Burkina Faso', 'Uganda', 'Tanzania', 'Madagascar'],
+}
+
+
+@pytest.fixture(scope='session')
+def dataset(workbook, metadata, tmp_path_factory):
+    """The bundled workbook as the dashboard loads it, through a throwaway snapshot cache."""
+    return loader.load_data(workbook, metadata, cache_dir=str(tmp_path_factory.mktemp('snapshots')))
+
+
+@pytest.fixture(scope='session')
+def frames(dataset):
+    return dataset.rankings_df, dataset.data_df
@@ -0,0 +1,126 @@
+"""The aggregates against the computations the dashboard used to run inline."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from girai import aggregates
+from tests.conftest import DEVELOPMENT_STATUS
+
+
+@pytest.fixture(scope='module')
+def baseline(workbook):
+    """The sheets as the original dashboard loaded them: read_excel, coerced, NaN as 0,
+    and the development statuses from its hard-coded lists."""
+    rankings_df = pd.read_excel(workbook, sheet_name='Rankings and Scores')
+    data_df = pd.read_excel(workbook, sheet_name='Data')
+    for df in (rankings_df, data_df):
+        for col in ['Index score', 'ta_score']:
+            if col in df.columns:
+                df[col] = pd.to_numeric(df[col], errors='coerce')
+        df.fillna(0, inplace=True)
+    rankings_df['Development_Status'] = 'Other'
+    for status, countries in DEVELOPMENT_STATUS.items():
+        rankings_df.loc[rankings_df['Country'].isin(countries), 'Development_Status'] = status
+    return rankings_df, data_df
+
+
+@pytest.fixture(scope='module')
+def aggs(frames):
+    return aggregates.compute_aggregates(*frames)
+
+
+def test_development_stats(baseline, aggs):
+    rankings_df, _ = baseline
+    filtered = rankings_df[rankings_df['Development_Status'].isin(['Developed', 'Developing', 'Underdeveloped'])]
+    expected = filtered.groupby('Development_Status')['Index score'].agg(['min', 'max', 'median', 'mean'])
+    stats = aggs['dev_stats'].set_index('Development_Status')
+    stats.index = stats.index.astype(object)
+    pd.testing.assert_frame_equal(stats[expected.columns], expected, check_names=False)
+    assert sorted(aggs['dev_points']['Country']) == sorted(filtered['Country'])
+
+
+def test_regional_stats(baseline, aggs):
+    rankings_df, _ = baseline
+    filtered = rankings_df[rankings_df['GIRAI_region'] != 0]
+    expected = filtered.groupby('GIRAI_region')['Index score'].agg(['mean', 'std'])
+    regional = aggs['regional'][['mean', 'std']]
+    regional.index = regional.index.astype(object)
+    pd.testing.assert_frame_equal(regional, expected, check_names=False)
+
+
+def test_thematic_by_development(baseline, aggs):
+    rankings_df, data_df = baseline
+    filtered = data_df[data_df['thematic_area'].isin(aggregates.THEMATIC_AREAS)]
+    merged = filtered.merge(rankings_df[['Country', 'Development_Status']], left_on='country', right_on='Country')
+    merged = merged[merged['Development_Status'] != 'Other']
+    expected = pd.pivot_table(merged, values='ta_score', index='Development_Status',
+                              columns='thematic_area', aggfunc='mean')
+    thematic = aggs['thematic']
+    assert list(thematic.index) == aggregates.STATUS_ORDER
+    # the loaded Data scores are float32
+    np.testing.assert_allclose(
+        thematic.loc[expected.index, expected.columns].to_numpy(dtype=float), expected.to_numpy(), rtol=1e-6
+    )
+
+
+def test_fingerprint_follows_content(frames):
+    rankings_df, data_df = frames
+    version = aggregates.fingerprint(rankings_df, data_df)
+    assert aggregates.fingerprint(rankings_df.copy(), data_df.copy()) == version
+    edited = data_df.copy()
+    edited.loc[0, 'ta_score'] += 1
+    assert aggregates.fingerprint(rankings_df, edited) != version
+
+
+def test_update_aggregates_recomputes_only_affected_groups(frames, aggs):
+    rankings_df, data_df = frames
+    data_df = data_df.copy()
+    data_df['ta_score'] = data_df['ta_score'] / 2
+    updated = aggregates.update_aggregates(aggs, rankings_df, data_df, ['Data'])
+    for name in ('dev_points', 'dev_stats', 'regional'):
+        assert updated[name] is aggs[name]
+    fresh = aggregates.compute_group('thematic', rankings_df, data_df)
+    pd.testing.assert_frame_equal(updated['thematic'], fresh['thematic'])
+    np.testing.assert_allclose(updated['thematic'].to_numpy(), aggs['thematic'].to_numpy() / 2, rtol=1e-6)
+
+
+def test_missing_scores_are_skipped_and_counted():
+    rankings_df = pd.DataFrame({
+        'Country': ['A', 'B', 'C', 'D'],
+        'GIRAI_region': ['Europe', 'Europe', 'Africa', None],
+        'Development_Status': ['Developed', 'Developed', 'Developing', 'Developing'],
+        'Index score': [10.0, np.nan, 4.0, 2.0],
+    })
+    data_df = pd.DataFrame({
+        'country': ['A', 'A', 'B', 'C'],
+        'GIRAI_region': ['Europe', 'Europe', 'Europe', 'Africa'],
+        'thematic_area': [aggregates.THEMATIC_AREAS[0]] * 4,
+        'ta_score': [1.0, 3.0, np.nan, 5.0],
+        'fr_weighted_score': np.nan,
+        'ga_weighted_score': np.nan,
+        'nsa_weighted_score': np.nan,
+    })
+
+    regional = aggregates.regional_stats(rankings_df)
+    assert regional.loc['Europe', ['mean', 'count', 'total']].tolist() == [10.0, 1, 2]
+    assert list(regional.index) == ['Africa', 'Europe']
+
+    points, stats = aggregates.development_stats(rankings_df)
+    assert list(points['Country']) == ['A', 'C', 'D']
+    assert stats.set_index('Development_Status').loc['Developed', ['mean', 'count', 'total']].tolist() == [10.0, 1, 2]
+
+    mean, count, total = aggregates.thematic_by_development(rankings_df, data_df)
+    area = aggregates.THEMATIC_AREAS[0]
+    assert (mean.loc['Developed', area], count.loc['Developed', area], total.loc['Developed', area]) == (2.0, 2, 3)
+    assert count.loc['Underdeveloped', area] == 0 and np.isnan(mean.loc['Underdeveloped', area])
+
+
+def test_intervals_bracket_the_means(aggs):
+    for table in (aggs['regional'], aggs['dev_stats']):
+        spread = table[table['count'] > 1]
+        assert (spread['ci_low'] <= spread['mean']).all() and (spread['mean'] <= spread['ci_high']).all()
+    low, high, mean = aggs['thematic_ci_low'], aggs['thematic_ci_high'], aggs['thematic']
+    assert low.shape == high.shape == mean.shape
+    scored = mean.notna().to_numpy()
+    assert (low.to_numpy()[scored] <= mean.to_numpy()[scored] + 1e-9).all()
+    assert (mean.to_numpy()[scored] <= high.to_numpy()[scored] + 1e-9).all()
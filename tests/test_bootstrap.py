@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from girai import bootstrap
+
+
+def test_intervals_bracket_the_mean_and_are_reproducible():
+    rng = np.random.default_rng(0)
+    values = pd.Series(rng.normal(50, 10, 300))
+    groups = pd.Series(rng.choice(['a', 'b', 'c'], 300))
+    first = bootstrap.group_intervals(values, groups)
+    means = values.groupby(groups).mean()
+    assert (first['ci_low'] < means).all() and (means < first['ci_high']).all()
+    pd.testing.assert_frame_equal(first, bootstrap.group_intervals(values, groups))
+
+
+def test_interval_width_matches_standard_error():
+    values = np.random.default_rng(1).normal(0, 1, 400)
+    low, high = bootstrap.mean_intervals(values, np.zeros(400, dtype=int), 1, resamples=4000)
+    expected = 2 * 1.96 * values.std() / np.sqrt(len(values))
+    np.testing.assert_allclose(high - low, expected, rtol=0.1)
+
+
+def test_capped_groups_keep_the_full_width():
+    values = np.random.default_rng(2).normal(0, 1, 2000)
+    codes = np.zeros(2000, dtype=int)
+    full = np.subtract(*bootstrap.mean_intervals(values, codes, 1, max_draws=2000)[::-1])
+    capped = np.subtract(*bootstrap.mean_intervals(values, codes, 1, max_draws=200)[::-1])
+    np.testing.assert_allclose(capped, full, rtol=0.1)
+
+
+def test_single_empty_and_missing_groups():
+    values = np.array([1.0, 2.0, 3.0, np.nan, 7.0])
+    codes = np.array([0, 0, 0, 1, -1])
+    low, high = bootstrap.mean_intervals(values, codes, 3)
+    assert low[0] <= 2 <= high[0]
+    # group 1 has only a NaN, group 2 no rows at all
+    assert np.isnan(low[1:]).all() and np.isnan(high[1:]).all()
+    low, high = bootstrap.mean_intervals(np.array([4.0]), np.array([0]), 1)
+    assert low[0] == high[0] == 4.0
@@ -0,0 +1,88 @@
+import os
+import shutil
+
+import pytest
+
+from girai import compare, countries, registry, synthetic
+
+
+@pytest.fixture(scope='module')
+def editions(dataset):
+    """The bundled edition twice: 'before', and 'after' with India's Index score raised to the top."""
+    after = dataset.rankings_df.copy()
+    after.loc[after['Country'] == 'India', 'Index score'] = after['Index score'].max() + 1
+    return {
+        'before': dataset,
+        'after': dataset._replace(rankings_df=after, version='v2'),
+    }
+
+
+def test_deltas_and_rank_changes(editions):
+    table = compare.compare(editions)
+    scores = compare.changes(table, 'after').set_index('Country')
+    before = compare.changes(table, 'before').set_index('Country')
+    assert scores.loc['India', 'delta'] == pytest.approx(
+        scores.loc['India', 'value'] - before.loc['India', 'value'])
+    assert scores.loc['India', 'rank'] == 1
+    assert scores.loc['India', 'rank_change'] == before.loc['India', 'rank'] - 1
+    leader = before.index[0]
+    assert scores.loc[leader, 'rank_change'] == -1
+    # the first edition has nothing to compare against
+    assert before['delta'].isna().all()
+
+
+def test_thematic_rows_are_unchanged(editions):
+    table = compare.compare(editions)
+    thematic = table[(table['edition'] == 'after') & (table['metric'] == 'ta_score')]
+    assert len(thematic) > 0
+    assert (thematic['delta'].dropna() == 0).all()
+
+
+def test_comparison_table_is_persisted(tmp_path, workbook, metadata):
+    data_dir = tmp_path / 'data'
+    data_dir.mkdir()
+    for name in ['GIRAI_2023_Edition_Data.xlsx', 'GIRAI_2024_Edition_Data.xlsx', 'Rescoring.xlsx']:
+        os.symlink(workbook, data_dir / name)
+    cache_dir = str(tmp_path / 'comparisons')
+
+    first = compare.comparison_table(registry.EditionRegistry(str(data_dir), metadata=metadata), cache_dir=cache_dir)
+    assert list(first['edition'].cat.categories) == ['2023 Edition', '2024 Edition']
+    assert len(os.listdir(cache_dir)) == 1
+
+    # a fresh process reopens the snapshot without loading any edition
+    editions = registry.EditionRegistry(str(data_dir), metadata=metadata)
+    second = compare.comparison_table(editions, cache_dir=cache_dir)
+    assert editions.loaded() == {}
+    assert second.equals(first)
+
+
+def test_unchanged_workbooks_are_not_hashed_again(tmp_path, workbook, monkeypatch):
+    path = str(tmp_path / 'GIRAI_2024_Edition_Data.xlsx')
+    shutil.copyfile(workbook, path)
+    calls = []
+    fingerprint = compare.snapshot.workbook_fingerprint
+    monkeypatch.setattr(compare.snapshot, 'workbook_fingerprint', lambda p: calls.append(p) or fingerprint(p))
+    first = compare._cache_keys({'2024 Edition': path})
+    assert compare._cache_keys({'2024 Edition': path}) == first
+    assert calls == [path]
+    os.utime(path, ns=(0, 0))
+    assert compare._cache_keys({'2024 Edition': path}) == first
+    assert calls == [path, path]
+
+
+def test_new_workbook_content_replaces_the_old_comparison(tmp_path):
+    data_dir, cache_dir = tmp_path / 'data', str(tmp_path / 'comparisons')
+    data_dir.mkdir()
+    rankings_df, data_df, generated = synthetic.generate(20, seed=5)
+    for year in (2023, 2024):
+        synthetic.write(rankings_df, data_df, generated, str(data_dir / f'GIRAI_{year}_Edition_Data'), 'xlsx')
+    metadata = countries.load_metadata(str(data_dir / 'GIRAI_2024_Edition_Data_country_metadata.csv'))
+    compare.comparison_table(registry.EditionRegistry(str(data_dir), metadata=metadata), cache_dir=cache_dir)
+    first = os.listdir(cache_dir)
+
+    rankings_df = rankings_df.copy()
+    rankings_df.loc[0, 'Index score'] += 1
+    synthetic.write(rankings_df, data_df, generated, str(data_dir / 'GIRAI_2024_Edition_Data'), 'xlsx')
+    compare.comparison_table(registry.EditionRegistry(str(data_dir), metadata=metadata), cache_dir=cache_dir)
+    assert len(os.listdir(cache_dir)) == 1
+    assert os.listdir(cache_dir) != first
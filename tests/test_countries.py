@@ -0,0 +1,40 @@
+"""data/country_metadata.csv and data/focus_groups.csv against the old hard-coded tables."""
+import pandas as pd
+
+from girai import countries
+from tests.conftest import DEVELOPMENT_STATUS
+
+
+def test_classification_matches_hard_coded_lists(frames):
+    rankings_df, _ = frames
+    expected = pd.Series(countries.DEFAULT_STATUS, index=rankings_df.index)
+    for status, names in DEVELOPMENT_STATUS.items():
+        expected[rankings_df['Country'].isin(names)] = status
+    pd.testing.assert_series_equal(rankings_df['Development_Status'].astype(object), expected, check_names=False)
+
+
+def test_unknown_countries_default_to_other():
+    rankings_df = pd.DataFrame({'Country': ['India', 'Atlantis']})
+    countries.classify(rankings_df, countries.load_metadata())
+    assert list(rankings_df['Development_Status']) == ['Developing', countries.DEFAULT_STATUS]
+    assert rankings_df['Highlight_Order'].isna().iloc[1]
+
+
+def test_highlights_keep_the_original_order(frames):
+    rankings_df, _ = frames
+    highlights = rankings_df.dropna(subset=['Highlight_Order']).sort_values('Highlight_Order')
+    assert list(highlights['Country']) == ['India', 'United States of America', 'Afghanistan']
+
+
+def test_focus_groups_and_colors():
+    groups = countries.load_focus_groups()
+    assert groups == {
+        "Default Focus (USA, India, Afghanistan)": ['United States of America', 'India', 'Afghanistan'],
+        "European Focus (Netherlands, Poland, Albania)": ['Netherlands', 'Poland', 'Albania'],
+        "Asian Focus (Singapore, China, Myanmar)": ['Singapore', 'China', 'Myanmar'],
+        "Americas Focus (USA, Brazil, Haiti)": ['United States of America', 'Brazil', 'Haiti'],
+    }
+    colors = countries.colors(countries.load_metadata())
+    assert colors['United States of America'] == 'red'
+    assert colors['Haiti'] == 'brown'
+    assert all(country in colors for group in groups.values() for country in group)
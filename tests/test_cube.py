@@ -0,0 +1,72 @@
+"""The drill-down cube against groupbys over the joined rows."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from girai import aggregates, cube
+
+
+@pytest.fixture(scope='module')
+def rows(frames):
+    """'Data' rows with each country's development status, as plain labels."""
+    rankings_df, data_df = frames
+    status = rankings_df.drop_duplicates('Country').set_index('Country')['Development_Status'].astype(object)
+    rows = data_df.astype({'country': object, 'GIRAI_region': object, 'thematic_area': object})
+    rows['Development_Status'] = rows['country'].map(status)
+    for measure in cube.MEASURES:
+        rows[measure] = rows[measure].astype('float64')
+    return rows
+
+
+@pytest.fixture(scope='module')
+def scores(frames):
+    return cube.build_cube(*frames, status_order=aggregates.STATUS_ORDER)
+
+
+@pytest.mark.parametrize('depth', [1, 2, 3])
+@pytest.mark.parametrize('measure', ['ta_score', 'nsa_weighted_score'])
+def test_tables_match_groupby(rows, scores, depth, measure):
+    keys = list(cube.LEVELS[:depth])
+    grouped = rows.dropna(subset=keys + ['thematic_area']).groupby(keys + ['thematic_area'])[measure]
+    for stat, expected in (('mean', grouped.mean()), ('count', grouped.count())):
+        table = scores.table(depth, measure, stat).drop(columns=cube.ALL_AREAS).stack()
+        if depth == 1:
+            table.index = table.index.set_levels(table.index.levels[0].astype(object), level=0)
+        table = table[table.index.isin(expected.index)]
+        assert len(table) == len(expected)
+        np.testing.assert_allclose(table.reindex(expected.index).to_numpy(dtype=float),
+                                   expected.to_numpy(dtype=float), rtol=1e-9)
+
+
+def test_all_areas_column_is_over_rows(rows, scores):
+    expected = rows.dropna(subset=['Development_Status']).groupby('Development_Status')['ta_score'].mean()
+    table = scores.table(1)[cube.ALL_AREAS]
+    np.testing.assert_allclose(table.loc[list(expected.index)].to_numpy(), expected.to_numpy(), rtol=1e-9)
+
+
+def test_drill_path(rows, scores):
+    assert scores.labels(1)[:3] == aggregates.STATUS_ORDER
+    regions = scores.labels(2, ('Developing',))
+    assert regions == sorted(rows.loc[rows['Development_Status'] == 'Developing', 'GIRAI_region'].dropna().unique())
+    countries = scores.table(3, path=('Developing', regions[0])).index.tolist()
+    expected = rows[(rows['Development_Status'] == 'Developing') & (rows['GIRAI_region'] == regions[0])]
+    assert countries == sorted(expected['country'].unique())
+    assert scores.table(2, path=('Atlantis',)).empty
+
+
+def test_indicators(rows, scores):
+    country = rows.loc[rows['Development_Status'] == 'Developing', ['GIRAI_region', 'country']].iloc[0]
+    table = scores.indicators(('Developing', country['GIRAI_region'], country['country']))
+    expected = rows[rows['country'] == country['country']].groupby('thematic_area')[cube.MEASURES].mean()
+    pd.testing.assert_frame_equal(table.loc[expected.index], expected, check_names=False, check_dtype=False)
+    with pytest.raises(KeyError):
+        scores.indicators(('Developing', 'Atlantis', 'Nowhere'))
+
+
+def test_bad_arguments(scores):
+    with pytest.raises(ValueError):
+        scores.table(4)
+    with pytest.raises(ValueError):
+        scores.table(2, path=('Developing', 'Africa'))
+    with pytest.raises(ValueError):
+        scores.table(1, stat='median')
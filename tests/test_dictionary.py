@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+from girai import dictionary, xlsx_stream
+
+# the layout of the Dictionary sheet: prefix notes, section titles, headers,
+# one row per column, a blank row, then footnotes
+ROWS = [
+    (0, {0: 'All columns name starting with "fr_" refer to the Frameworks pillar'}),
+    (2, {0: 'DATA TAB', 4: 'RANKINGS AND SCORES TAB'}),
+    (3, {0: 'Column', 1: 'Definition', 2: 'Values', 4: 'Column', 5: 'Definition'}),
+    (4, {0: 'thematic_area', 1: 'name of the thematic area (1)', 2: 'Gender Equality,\nLabour Protection',
+         4: 'Index score', 5: 'total index score'}),
+    (5, {0: 'fr_doc1_type (_num and _text)', 1: 'type of the document'}),
+    (7, {0: '(1) thematic areas are scored separately'}),
+    (8, {0: 'Scores range from 0 to 100'}),
+]
+
+
+@pytest.fixture(scope='module')
+def store():
+    return dictionary.parse(ROWS, version='v1')
+
+
+def test_parse_entries(store):
+    kinds = [(e.kind, e.sheet, e.name) for e in store.entries]
+    assert kinds == [
+        ('prefix', None, 'fr_'),
+        ('column', 'Data', 'thematic_area'),
+        ('value', 'Data', 'Gender Equality'),
+        ('value', 'Data', 'Labour Protection'),
+        ('column', 'Rankings and Scores', 'Index score'),
+        ('column', 'Data', 'fr_doc1_type'),
+        ('note', None, 'Note'),
+    ]
+    assert store.define('thematic_area').note == '(1) thematic areas are scored separately'
+
+
+def test_define(store):
+    assert store.define('fr_doc1_type_text').columns == ('fr_doc1_type_num', 'fr_doc1_type_text')
+    assert store.define('FR_DOC1_TYPE').name == 'fr_doc1_type'
+    assert store.define('index score').sheet == 'Rankings and Scores'
+    assert store.define('fr_doc2_link').kind == 'prefix'
+    assert store.define('ga_doc1_type') is None
+
+
+def test_search_matches_word_prefixes(store):
+    assert [e.name for e in store.search('gender eq')] == ['Gender Equality', 'thematic_area']
+    assert [e.name for e in store.search('labour', limit=1)] == ['Labour Protection']
+    assert [e.name for e in store.search('gender labour')] == ['thematic_area']
+    assert store.search('gender index') == []
+    assert store.search('  ') == []
+
+
+def test_json_round_trip(store):
+    again = dictionary.Dictionary.from_json(json.loads(json.dumps(store.to_json())))
+    assert again.entries == store.entries and again.version == 'v1'
+
+
+def test_load_dictionary_parses_once(workbook, tmp_path, monkeypatch):
+    store = dictionary.load_dictionary(workbook, cache_dir=str(tmp_path))
+    assert store.define('nsa_au_type_text').name == 'nsa_au_type'
+    assert store.define('nsa_cs_anything').kind == 'prefix'
+    assert store.search('data prot')[0].name == 'Data Protection and Privacy'
+    assert len(store.search('nsa')) == 20
+    assert len(store.search('nsa', limit=None)) > 20
+
+    def fail(*args, **kwargs):
+        raise AssertionError("a stored dictionary must not be parsed again")
+
+    monkeypatch.setattr(xlsx_stream, 'read_cells', fail)
+    again = dictionary.load_dictionary(workbook, cache_dir=str(tmp_path))
+    assert again.entries == store.entries
+
+
+def test_tables_without_a_dictionary(tmp_path):
+    assert len(dictionary.load_dictionary(str(tmp_path), cache_dir=str(tmp_path))) == 0
@@ -0,0 +1,104 @@
+"""The figure cache and the builders it serves."""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import plotly.graph_objects as go
+import pytest
+
+from girai import aggregates, countries, figures, lookup
+
+
+def test_cache_reuses_built_figure():
+    cache = figures.FigureCache()
+    calls = []
+
+    def build():
+        calls.append(1)
+        return go.Figure()
+
+    first = cache.get('map', 'v1', (False,), build)
+    second = cache.get('map', 'v1', (False,), build)
+    assert second is first
+    assert len(calls) == 1
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+
+def test_cache_keys_on_version_and_state():
+    cache = figures.FigureCache()
+    a = cache.get('map', 'v1', (False,), go.Figure)
+    assert cache.get('map', 'v1', (True,), go.Figure) is not a
+    assert cache.get('map', 'v2', (False,), go.Figure) is not a
+    assert cache.get('spider', 'v1', (False,), go.Figure) is not a
+    assert cache.stats()['entries'] == 4
+
+
+def test_cache_evicts_least_recently_used():
+    cache = figures.FigureCache(max_entries=2)
+    a = cache.get('map', 'v1', 'a', go.Figure)
+    cache.get('map', 'v1', 'b', go.Figure)
+    cache.get('map', 'v1', 'a', go.Figure)  # 'a' is now the most recent
+    cache.get('map', 'v1', 'c', go.Figure)
+    assert cache.stats()['entries'] == 2
+    assert cache.get('map', 'v1', 'a', go.Figure) is a
+    misses = cache.stats()['misses']
+    cache.get('map', 'v1', 'b', go.Figure)
+    assert cache.stats()['misses'] == misses + 1
+
+
+def test_builders_accept_aggregates(frames):
+    rankings_df, data_df = frames
+    aggs = aggregates.compute_aggregates(rankings_df, data_df)
+    assert figures.map_figure(rankings_df, False).data
+    assert figures.map_figure(rankings_df, True).layout.annotations
+    # one box per status plus its mean marker
+    assert len(figures.development_figure(aggs['dev_points'], aggs['dev_stats']).data) == 2 * len(aggs['dev_stats'])
+    assert list(figures.regional_figure(aggs['regional']).data[0].x) == list(aggs['regional'].index)
+    heatmap = figures.heatmap_figure(aggs['thematic'], aggs['thematic_count'], aggs['thematic_total'],
+                                     aggs['thematic_ci_low'], aggs['thematic_ci_high'])
+    assert heatmap.data[0].z.shape == aggs['thematic'].shape
+    focus = next(iter(countries.load_focus_groups().values()))
+    colors = countries.colors(countries.load_metadata())
+    assert [t.name for t in figures.spider_figure(lookup.CountryIndex(rankings_df).metrics(focus, figures.SPIDER_CATEGORIES), colors).data] == focus
+
+
+def test_concurrent_misses_build_once():
+    cache = figures.FigureCache()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def build():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return go.Figure()
+
+    with ThreadPoolExecutor(4) as executor:
+        first = executor.submit(cache.get, 'map', 'v1', (False,), build)
+        started.wait(5)
+        waiting = [executor.submit(cache.get, 'map', 'v1', (False,), build) for _ in range(3)]
+        release.set()
+        entries = [first.result()] + [future.result() for future in waiting]
+    assert len(calls) == 1
+    assert all(entry is entries[0] for entry in entries)
+    assert cache.stats()['misses'] == 1
+
+
+def test_failed_build_is_not_cached():
+    cache = figures.FigureCache()
+
+    def broken():
+        raise ValueError("no data")
+
+    with pytest.raises(ValueError):
+        cache.get('map', 'v1', (False,), broken)
+    assert cache.get('map', 'v1', (False,), go.Figure) is not None
+    assert cache.stats()['entries'] == 1
+
+
+def test_prefetch_fills_the_cache():
+    cache = figures.FigureCache()
+    with ThreadPoolExecutor(2) as executor:
+        futures = cache.prefetch(executor, [('map', 'v1', (False,), go.Figure), ('regional', 'v1', (), go.Figure)])
+        entries = [future.result() for future in futures]
+    assert cache.get('regional', 'v1', (), go.Figure) is entries[1]
@@ -0,0 +1,77 @@
+"""Topology-preserving simplification of country outlines."""
+import json
+import os
+
+import numpy as np
+import pytest
+
+from girai import geometry
+
+# a jagged shared border from (10, 0) up to (10, 10)
+BORDER = [(10 + 0.03 * np.sin(i), i / 10) for i in range(101)]
+
+
+def _feature(code, exterior, *holes_or_islands):
+    polygons = [[exterior + exterior[:1]]] + [[ring + ring[:1]] for ring in holes_or_islands]
+    return {'type': 'Feature', 'properties': {'ISO_A3': code},
+            'geometry': {'type': 'MultiPolygon', 'coordinates': polygons}}
+
+
+@pytest.fixture
+def source():
+    west = [(0, 0)] + BORDER + [(0, 10)]
+    east = [(20, 0), (20, 10)] + BORDER[::-1]
+    island = [(30, 0), (30.3, 0), (30.3, 0.3), (30, 0.3)]
+    return {'type': 'FeatureCollection', 'features': [
+        _feature('WST', west),
+        _feature('EST', east, island),
+        _feature('-99', [(50, 50), (51, 50), (51, 51)]),
+    ]}
+
+
+def _vertices(feature):
+    return {tuple(p) for polygon in feature['geometry']['coordinates'] for ring in polygon for p in ring}
+
+
+def test_neighbours_share_simplified_border(source):
+    for name, collection in geometry.simplify(source).items():
+        west, east = collection['features']
+        assert (west['id'], east['id']) == ('WST', 'EST')
+        shared = _vertices(west) & _vertices(east)
+        border_west = {p for p in _vertices(west) if p[0] > 5}
+        border_east = {p for p in _vertices(east) if 5 < p[0] < 15}
+        assert border_west == border_east == shared, name
+
+
+def test_coarse_levels_drop_small_islands(source):
+    levels = geometry.simplify(source)
+    assert len(levels['low']['features'][1]['geometry']['coordinates']) == 1
+    assert len(levels['medium']['features'][1]['geometry']['coordinates']) == 2
+
+
+def test_simplification_reduces_vertices(source):
+    levels = geometry.simplify(source)
+    counts = [len(_vertices(levels[name]['features'][0])) for name in geometry.LEVELS]
+    assert counts == sorted(counts)
+    assert counts[0] < len(BORDER)
+
+
+def test_build_is_a_no_op_for_the_same_source(source, tmp_path):
+    path = tmp_path / 'countries.geojson'
+    path.write_text(json.dumps(source))
+    out = tmp_path / 'geometry'
+    assert geometry.for_view('global', str(out)) is None
+
+    manifest = geometry.build(str(path), str(out))
+    assert manifest['codes'] == ['EST', 'WST']
+    built = os.stat(out / manifest['levels']['low']['file']).st_mtime_ns
+    assert geometry.build(str(path), str(out)) == manifest
+    assert os.stat(out / manifest['levels']['low']['file']).st_mtime_ns == built
+
+    view = geometry.for_view('global', str(out))
+    assert view.geojson == geometry.URL_PREFIX + 'countries-low.geojson'
+    assert view.codes == ('EST', 'WST')
+
+
+def test_every_level_serves_a_view():
+    assert set(geometry.LEVELS) == set(geometry.VIEWS.values())
@@ -0,0 +1,92 @@
+"""Change detection of ``loader.refresh_data``: only edited sheets are re-ingested."""
+import os
+
+import pytest
+
+from girai import aggregates, countries, loader, synthetic
+
+
+def _touch(path, step):
+    """Move ``path``'s mtime forward, as a save would, so its signature changes."""
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + step * 10**9))
+
+
+@pytest.fixture
+def tables(tmp_path):
+    rankings_df, data_df, metadata = synthetic.generate(40, seed=1)
+    path = synthetic.write(rankings_df, data_df, metadata, str(tmp_path / 'tables'), 'csv')
+    return path, rankings_df, data_df, countries.load_metadata(os.path.join(path, 'country_metadata.csv'))
+
+
+def test_first_load_reports_every_sheet(tables, tmp_path):
+    path, _, _, metadata = tables
+    dataset, changes = loader.refresh_data(None, path, metadata, cache_dir=str(tmp_path / 'cache'))
+    assert changes == list(loader.SHEET_COLUMNS)
+    assert set(dataset.sheet_state) == set(loader.SHEET_COLUMNS)
+
+
+def test_unchanged_source_is_not_reloaded(tables, tmp_path):
+    path, _, _, metadata = tables
+    dataset, _ = loader.refresh_data(None, path, metadata, cache_dir=str(tmp_path / 'cache'))
+    again, changes = loader.refresh_data(dataset, path, metadata, cache_dir=str(tmp_path / 'cache'))
+    assert again is dataset and changes == []
+
+
+def test_resave_without_content_change(tables, tmp_path):
+    path, _, _, metadata = tables
+    dataset, _ = loader.refresh_data(None, path, metadata, cache_dir=str(tmp_path / 'cache'))
+    _touch(os.path.join(path, 'data.csv'), 1)
+    again, changes = loader.refresh_data(dataset, path, metadata, cache_dir=str(tmp_path / 'cache'))
+    assert changes == []
+    assert again.version == dataset.version
+    assert again.data_df is dataset.data_df
+
+
+def test_edited_sheet_alone_is_reported(tables, tmp_path):
+    path, rankings_df, data_df, metadata = tables
+    dataset, _ = loader.refresh_data(None, path, metadata, cache_dir=str(tmp_path / 'cache'))
+
+    data_df = data_df.copy()
+    data_df.loc[3, 'ta_score'] += 1
+    target = os.path.join(path, 'data.csv')
+    data_df.to_csv(target, index=False)
+    _touch(target, 2)
+    updated, changes = loader.refresh_data(dataset, path, metadata, cache_dir=str(tmp_path / 'cache'))
+
+    assert changes == ['Data']
+    assert updated.version != dataset.version
+    assert updated.rankings_df is dataset.rankings_df
+    assert updated.sheet_state['Rankings and Scores'] == dataset.sheet_state['Rankings and Scores']
+    assert aggregates.affected_groups(changes) == ['thematic']
+    assert updated.data_df.loc[3, 'ta_score'] == pytest.approx(dataset.data_df.loc[3, 'ta_score'] + 1)
+
+
+def test_workbook_sheets_are_tracked_separately(tmp_path):
+    rankings_df, data_df, generated = synthetic.generate(30, seed=2)
+    path = synthetic.write(rankings_df, data_df, generated, str(tmp_path / 'edition'), 'xlsx')
+    metadata = countries.load_metadata(str(tmp_path / 'edition_country_metadata.csv'))
+    cache_dir = str(tmp_path / 'cache')
+    dataset, _ = loader.refresh_data(None, path, metadata, cache_dir=cache_dir)
+
+    rankings_df = rankings_df.copy()
+    rankings_df.loc[0, 'Index score'] += 1
+    synthetic.write(rankings_df, data_df, generated, path, 'xlsx')
+    _touch(path, 1)
+    updated, changes = loader.refresh_data(dataset, path, metadata, cache_dir=cache_dir)
+
+    assert changes == ['Rankings and Scores']
+    assert updated.data_df is dataset.data_df
+    assert aggregates.affected_groups(changes) == list(aggregates.DEPENDENCIES)
+
+
+def test_frames_follow_the_schema(dataset):
+    for sheet, df in (('Rankings and Scores', dataset.rankings_df), ('Data', dataset.data_df)):
+        for column, dtype in loader.SCHEMA[sheet].items():
+            assert df[column].dtype == dtype, (sheet, column)
+
+
+def test_missing_schema_column_is_rejected():
+    rankings_df, data_df, metadata = synthetic.generate(5, seed=4)
+    with pytest.raises(ValueError, match='thematic_area'):
+        loader.preprocess(rankings_df, data_df.drop(columns='thematic_area'), metadata.set_index('Country'))
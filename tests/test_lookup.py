@@ -0,0 +1,23 @@
+"""CountryIndex against boolean-mask lookups on the rankings frame."""
+import numpy as np
+
+from girai import figures, lookup
+
+
+def test_metrics_match_mask_lookups(frames):
+    rankings_df, _ = frames
+    index = lookup.CountryIndex(rankings_df)
+    wanted = ['Haiti', 'India', 'Atlantis', 'Netherlands']
+    metrics = index.metrics(wanted, figures.SPIDER_CATEGORIES)
+    assert list(metrics.index) == ['Haiti', 'India', 'Netherlands']
+    for country, values in zip(metrics.index, metrics.values):
+        expected = rankings_df[rankings_df['Country'] == country][figures.SPIDER_CATEGORIES].values[0]
+        np.testing.assert_array_equal(values, expected)
+
+
+def test_skips_rows_without_a_country(frames):
+    rankings_df, _ = frames
+    index = lookup.CountryIndex(rankings_df)
+    assert 'India' in index and 0 not in index
+    assert len(index) == len(index.countries) == rankings_df['Country'].map(
+        lambda v: isinstance(v, str) and v != '').sum()
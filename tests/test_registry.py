@@ -0,0 +1,65 @@
+import os
+
+import pytest
+
+from girai import registry
+
+
+@pytest.fixture
+def data_dir(tmp_path, workbook):
+    for name in ['GIRAI_2023_Edition_Data.xlsx', 'GIRAI_2024_Edition_Data.xlsx', 'Internal_Rescore.xlsx',
+                 '~$GIRAI_2024_Edition_Data.xlsx']:
+        os.symlink(workbook, tmp_path / name)
+    return tmp_path
+
+
+def test_edition_label():
+    assert registry.edition_label('data/GIRAI_2024_Edition_Data.xlsx') == '2024 Edition'
+    assert registry.edition_label('GIRAI_2023_Edition_Data_Rescored.xlsx') == '2023 Edition (Rescored)'
+    assert registry.edition_label('data/Internal_Rescore.xlsx') == 'Internal_Rescore'
+
+
+def test_discover_newest_first_without_lock_files(data_dir):
+    assert list(registry.discover(str(data_dir))) == ['2024 Edition', '2023 Edition', 'Internal_Rescore']
+
+
+def test_undated_workbooks_are_not_dated_editions(data_dir, metadata):
+    assert registry.edition_year(str(data_dir / 'Internal_Rescore.xlsx')) is None
+    assert registry.EditionRegistry(str(data_dir), metadata=metadata).dated() == ['2024 Edition', '2023 Edition']
+
+
+def test_get_loads_once_and_shares(data_dir, metadata):
+    editions = registry.EditionRegistry(str(data_dir), metadata=metadata)
+    assert editions.default == '2024 Edition'
+    assert editions.loaded() == {}
+    dataset = editions.get()
+    assert editions.get('2024 Edition') is dataset
+    assert list(editions.loaded()) == ['2024 Edition']
+    with pytest.raises(KeyError):
+        editions.get('1999 Edition')
+
+
+def test_memory_budget_keeps_latest(data_dir, metadata):
+    editions = registry.EditionRegistry(str(data_dir), memory_budget_mb=0, metadata=metadata)
+    editions.get('2024 Edition')
+    editions.get('2023 Edition')
+    assert list(editions.loaded()) == ['2023 Edition']
+
+
+def test_rescan_drops_removed_editions(data_dir, metadata):
+    editions = registry.EditionRegistry(str(data_dir), metadata=metadata)
+    editions.get('2023 Edition')
+    os.remove(data_dir / 'GIRAI_2023_Edition_Data.xlsx')
+    editions.rescan()
+    assert editions.names() == ['2024 Edition', 'Internal_Rescore']
+    assert editions.loaded() == {}
+
+
+def test_refresh_picks_up_added_and_removed_workbooks(data_dir, metadata, workbook):
+    editions = registry.EditionRegistry(str(data_dir), metadata=metadata)
+    editions.get('2023 Edition')
+    os.remove(data_dir / 'GIRAI_2023_Edition_Data.xlsx')
+    os.symlink(workbook, data_dir / 'GIRAI_2025_Edition_Data.xlsx')
+    assert editions.refresh() == {}
+    assert editions.names() == ['2025 Edition', '2024 Edition', 'Internal_Rescore']
+    assert editions.loaded() == {}
@@ -0,0 +1,40 @@
+"""Figure builds in worker processes."""
+import json
+
+import plotly.io as pio
+import pytest
+
+from girai import countries, lookup, render
+
+
+@pytest.fixture(scope='module')
+def pool(tmp_path_factory):
+    pool = render.FigurePool(1, cache_dir=str(tmp_path_factory.mktemp('worker-snapshots')))
+    yield pool
+    pool.shutdown()
+
+
+def test_worker_builds_the_in_process_figure(pool, workbook, dataset, metadata):
+    expected = render.build_figure('regional', (), dataset, metadata, lookup.CountryIndex(dataset.rankings_df))
+    figure = pool.submit(workbook, dataset.version, 'regional', ())()
+    # the template crosses the process boundary pickled, so compare content, not key order
+    assert json.loads(pio.to_json(figure, validate=False)) == json.loads(pio.to_json(expected, validate=False))
+
+
+def test_worker_errors_are_raised_in_the_caller(pool, workbook, dataset):
+    with pytest.raises(KeyError):
+        pool.submit(workbook, dataset.version, 'pie', ())()
+    # the worker survives a failed build
+    focus = tuple(next(iter(countries.load_focus_groups().values())))
+    assert [trace.name for trace in pool.submit(workbook, dataset.version, 'spider', focus)().data] == list(focus)
+
+
+def test_shutdown_stops_the_workers(tmp_path):
+    pool = render.FigurePool(2, cache_dir=str(tmp_path))
+    workers = [pool._idle.get() for _ in range(pool.workers)]
+    for worker in workers:
+        pool._idle.put(worker)
+    pool.shutdown()
+    processes = [worker.process for worker in workers]
+    assert all(process.poll() is not None for process in processes)
+    pool.shutdown()  # again, as the exit hook may
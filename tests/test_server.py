@@ -0,0 +1,167 @@
+import contextlib
+import json
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+from urllib.parse import quote
+
+import pytest
+
+from girai import countries, loader, similarity, snapshot
+from girai.query import QueryService
+from girai.server import ResponseCache, make_handler
+
+
+@contextlib.contextmanager
+def serving(cache):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(cache))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture(scope='module')
+def base_url(workbook):
+    with serving(ResponseCache(QueryService(workbook))) as url:
+        yield url
+
+
+def get(base_url, path):
+    """(status, decoded JSON body) of a GET."""
+    try:
+        with urllib.request.urlopen(base_url + path) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as exc:
+        return exc.code, json.load(exc)
+
+
+def test_regional_matches_aggregates(base_url, frames):
+    rankings_df, _ = frames
+    status, body = get(base_url, '/regional')
+    assert status == 200
+    expected = rankings_df[rankings_df['GIRAI_region'] != 0].groupby('GIRAI_region', observed=True)['Index score'].mean()
+    assert {row['region']: row['mean'] for row in body} == pytest.approx(expected.to_dict())
+
+
+def test_focus_groups(base_url):
+    groups = countries.load_focus_groups()
+    status, body = get(base_url, '/focus-groups')
+    assert status == 200 and body == groups
+    default = [row['Country'] for row in get(base_url, '/focus')[1]]
+    assert default == next(iter(groups.values()))
+    assert [row['Country'] for row in get(base_url, '/focus?countries=Haiti,Atlantis,India')[1]] == ['Haiti', 'India']
+
+
+def test_unknown_route_and_group(base_url):
+    assert get(base_url, '/nope')[0] == 404
+    assert get(base_url, '/focus?group=Atlantis')[0] == 404
+
+
+def test_similar(base_url):
+    status, body = get(base_url, '/similar?country=Kenya&k=3')
+    assert status == 200
+    assert body['country'] == 'Kenya'
+    assert len(body['similar']) == 3
+    distances = [match['distance'] for match in body['similar']]
+    assert distances == sorted(distances)
+    assert 'Kenya' not in [match['country'] for match in body['similar']]
+
+
+def test_similar_default_and_capped_k(base_url):
+    assert len(get(base_url, '/similar?country=Kenya')[1]['similar']) == 5
+    assert len(get(base_url, '/similar?country=Kenya&k=50')[1]['similar']) == similarity.K_MAX
+
+
+@pytest.mark.parametrize('query', ['k=3', 'country=&k=3', 'country=Kenya&k=abc', 'country=Kenya&k=0',
+                                   'country=Kenya&k=-2'])
+def test_similar_bad_parameters(base_url, query):
+    status, body = get(base_url, '/similar?' + query)
+    assert status == 400
+    assert 'error' in body
+
+
+def test_similar_unknown_country(base_url):
+    assert get(base_url, '/similar?country=Atlantis')[0] == 404
+
+
+def test_etag_round_trip(base_url):
+    with urllib.request.urlopen(base_url + '/regional') as response:
+        etag = response.headers['ETag']
+    request = urllib.request.Request(base_url + '/regional', headers={'If-None-Match': etag})
+    with pytest.raises(urllib.error.HTTPError) as exc:
+        urllib.request.urlopen(request)
+    assert exc.value.code == 304
+
+
+def test_drill(base_url):
+    status, body = get(base_url, '/drill')
+    assert status == 200
+    assert body['level'] == 'Development_Status'
+    assert body['groups'][:3] == ['Developed', 'Developing', 'Underdeveloped']
+    region = get(base_url, '/drill?path=Developing')[1]['groups'][0]
+    assert get(base_url, '/drill?path=' + quote(f'Developing,{region}'))[1]['level'] == 'country'
+    assert get(base_url, '/drill?measure=nope')[0] == 404
+
+
+class ReloadingService:
+    """A service whose data is replaced while a response is being built."""
+
+    version = 'v1'
+
+    def refresh(self):
+        return False
+
+    def regional(self):
+        self.version = 'v2'
+        return []
+
+
+def test_body_built_across_a_reload_is_not_cached():
+    cache = ResponseCache(ReloadingService(), check_interval=3600)
+    etag, _ = cache.get('/regional', {})
+    assert etag.startswith('"v1-')
+    cache.get('/regional', {})
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+class BrokenService:
+    version = 'v1'
+
+    def refresh(self):
+        return False
+
+    def regional(self):
+        raise RuntimeError('boom')
+
+
+def test_unexpected_error_is_a_500(capsys):
+    with serving(ResponseCache(BrokenService())) as url:
+        status, body = get(url, '/regional')
+    assert status == 500
+    assert body == {'error': 'internal error: RuntimeError'}
+    assert 'boom' in capsys.readouterr().err
+
+
+def test_failed_reload_is_retried(workbook, monkeypatch):
+    service = QueryService(workbook)
+    monkeypatch.setattr(snapshot, 'file_signature', lambda path: (0, 0))
+
+    def mid_save(*args, **kwargs):
+        raise OSError('truncated workbook')
+
+    with monkeypatch.context() as patched:
+        patched.setattr(loader, 'refresh_data', mid_save)
+        with pytest.raises(OSError):
+            service.refresh()
+    calls = []
+    refresh_data = loader.refresh_data
+    monkeypatch.setattr(loader, 'refresh_data', lambda *args, **kwargs: calls.append(args) or refresh_data(*args, **kwargs))
+    assert service.refresh() is False  # same content, but it was checked again
+    assert len(calls) == 1
+    assert service.refresh() is False
+    assert len(calls) == 1
@@ -0,0 +1,101 @@
+"""Publishing datasets to a shared directory and memory-mapping them back."""
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from girai import aggregates, countries, loader, shared, synthetic
+
+
+@pytest.fixture
+def tables(tmp_path):
+    rankings_df, data_df, metadata = synthetic.generate(40, seed=3)
+    path = synthetic.write(rankings_df, data_df, metadata, str(tmp_path / 'tables'), 'csv')
+    return path, countries.load_metadata(os.path.join(path, 'country_metadata.csv'))
+
+
+def test_publish_and_attach(tables, tmp_path):
+    path, metadata = tables
+    shm_dir = str(tmp_path / 'shm')
+    assert shared.attach(path, shm_dir) is None
+
+    dataset = loader.load_data(path, metadata, cache_dir=str(tmp_path / 'cache'))
+    shared.publish(dataset, path, shm_dir)
+    attached = shared.attach(path, shm_dir)
+    assert attached.version == dataset.version
+    assert attached.sheet_state == dataset.sheet_state
+    pd.testing.assert_frame_equal(attached.rankings_df, dataset.rankings_df)
+    pd.testing.assert_frame_equal(attached.data_df, dataset.data_df)
+
+
+def test_stale_sources_do_not_attach(tables, tmp_path):
+    path, metadata = tables
+    shm_dir = str(tmp_path / 'shm')
+    dataset = shared.load_data(path, metadata, shm_dir, cache_dir=str(tmp_path / 'cache'))
+    sources = loader.source_keys(path, aggregates.fingerprint(metadata))
+    assert shared.attach(path, shm_dir, sources).version == dataset.version
+    stale = dict(sources, Data='edited')
+    assert shared.attach(path, shm_dir, stale) is None
+
+
+def test_manifest_of_another_sheet_state_does_not_attach(tables, tmp_path):
+    path, metadata = tables
+    shm_dir = str(tmp_path / 'shm')
+    shared.load_data(path, metadata, shm_dir, cache_dir=str(tmp_path / 'cache'))
+    manifest = shared._read_manifest(path, shm_dir)
+    for state in manifest['sheet_state'].values():
+        state.append('0123abcd')
+    with open(shared._manifest_path(path, shm_dir), 'w') as f:
+        json.dump(manifest, f)
+    assert shared.attach(path, shm_dir) is None
+
+
+def test_second_process_attaches_without_loading(tables, tmp_path, monkeypatch):
+    path, metadata = tables
+    shm_dir = str(tmp_path / 'shm')
+    first = shared.load_data(path, metadata, shm_dir, cache_dir=str(tmp_path / 'cache'))
+
+    def fail(*args, **kwargs):
+        raise AssertionError("a current publication must not be reloaded")
+
+    monkeypatch.setattr(loader, 'refresh_data', fail)
+    again, changes = shared.refresh_data(None, path, metadata, shm_dir, cache_dir=str(tmp_path / 'cache'))
+    assert again.version == first.version
+    assert set(changes) == set(loader.SHEET_COLUMNS)
+    assert shared.refresh_data(again, path, metadata, shm_dir)[1] == []
+
+
+def test_republish_removes_replaced_files(tables, tmp_path):
+    path, metadata = tables
+    shm_dir = str(tmp_path / 'shm')
+    dataset = shared.load_data(path, metadata, shm_dir, cache_dir=str(tmp_path / 'cache'))
+    before = set(os.listdir(shm_dir))
+
+    data_df = pd.read_csv(os.path.join(path, 'data.csv'))
+    data_df.loc[0, 'ta_score'] += 1
+    data_df.to_csv(os.path.join(path, 'data.csv'), index=False)
+    st = os.stat(os.path.join(path, 'data.csv'))
+    os.utime(os.path.join(path, 'data.csv'), ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+    updated, changes = shared.refresh_data(dataset, path, metadata, shm_dir, cache_dir=str(tmp_path / 'cache'))
+    assert changes == ['Data']
+    after = set(os.listdir(shm_dir))
+    assert len([n for n in after if n.endswith('.arrow')]) == 2
+    assert after != before
+
+
+def test_source_edited_during_the_load(tables, tmp_path, monkeypatch):
+    path, metadata = tables
+    source_keys = loader.source_keys
+    calls = []
+
+    def edited_meanwhile(*args):
+        # keys taken before the load; the workbook changes right after
+        calls.append(args)
+        keys = source_keys(*args)
+        return {sheet: 'edited' for sheet in keys} if len(calls) == 1 else keys
+
+    monkeypatch.setattr(loader, 'source_keys', edited_meanwhile)
+    dataset = shared.load_data(path, metadata, str(tmp_path / 'shm'), cache_dir=str(tmp_path / 'cache'))
+    assert dataset.version == loader.load_data(path, metadata, cache_dir=str(tmp_path / 'cache')).version
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+from girai import similarity, synthetic
+
+
+def brute_force(matrix, min_shared):
+    """Every pair's NaN-aware RMS distance (inf when not comparable), row by row."""
+    n = len(matrix)
+    distances = np.full((n, n), np.inf)
+    for i in range(n):
+        for j in range(n):
+            both = ~np.isnan(matrix[i]) & ~np.isnan(matrix[j])
+            if i != j and both.sum() >= max(min_shared, 1):
+                distances[i, j] = np.sqrt(np.mean((matrix[i, both] - matrix[j, both]) ** 2))
+    return distances
+
+
+def test_nearest_matches_brute_force():
+    rng = np.random.default_rng(0)
+    matrix = rng.normal(size=(60, 8))
+    matrix[rng.random(matrix.shape) < 0.3] = np.nan
+    # small blocks so the blockwise path runs over several blocks
+    neighbours, distances, shared = similarity.nearest(matrix, 5, min_shared=4, block_cells=100)
+    expected = brute_force(matrix, 4)
+    for i in range(len(matrix)):
+        found = neighbours[i][neighbours[i] >= 0]
+        np.testing.assert_allclose(distances[i, :len(found)], np.sort(expected[i])[:len(found)])
+        np.testing.assert_allclose(expected[i, found], distances[i, :len(found)])
+        assert len(found) == min(5, np.isfinite(expected[i]).sum())
+        assert (shared[i, :len(found)] >= 4).all()
+
+
+def test_nearest_complete_data_fast_path():
+    matrix = np.random.default_rng(1).normal(size=(40, 6))
+    neighbours, distances, _ = similarity.nearest(matrix, 3, block_cells=64)
+    expected = brute_force(matrix, 1)
+    np.testing.assert_allclose(distances, np.sort(expected, axis=1)[:, :3], rtol=1e-9)
+    np.testing.assert_allclose(np.take_along_axis(expected, neighbours, axis=1), distances, rtol=1e-9)
+
+
+def test_index_queries():
+    _, data_df, _ = synthetic.generate(50, seed=3)
+    index = similarity.SimilarityIndex(data_df)
+    country = index.countries[0]
+    matches = index.similar(country, 4)
+    assert len(matches) == 4
+    assert country not in [m.country for m in matches]
+    assert index.group(country, 4) == [country] + [m.country for m in matches]
+    assert len(index.similar(country, 100)) == similarity.K_MAX
+
+
+def test_standardize_constant_column():
+    profiles = pd.DataFrame({'a': [1.0, 2.0, 3.0], 'b': [5.0, 5.0, 5.0]})
+    standardized = similarity.standardize(profiles)
+    assert (standardized['b'] == 0).all()
+    np.testing.assert_allclose(standardized['a'].std(ddof=0), 1)
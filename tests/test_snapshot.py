@@ -0,0 +1,34 @@
+import os
+import stat
+
+import pytest
+
+from girai import snapshot
+
+
+def test_atomic_write_uses_the_umask_mode(tmp_path):
+    target = str(tmp_path / 'page.html')
+    snapshot.atomic_write(target, lambda tmp: open(tmp, 'w').close())
+    umask = os.umask(0)
+    os.umask(umask)
+    assert stat.S_IMODE(os.stat(target).st_mode) == 0o666 & ~umask
+
+
+def test_umask_is_read_without_changing_it():
+    umask = os.umask(0o027)
+    try:
+        assert snapshot._umask() == 0o027
+        assert os.umask(umask) == 0o027
+    finally:
+        os.umask(umask)
+
+
+def test_failed_write_leaves_nothing_behind(tmp_path):
+    target = str(tmp_path / 'page.html')
+
+    def broken(tmp):
+        raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        snapshot.atomic_write(target, broken)
+    assert os.listdir(tmp_path) == []
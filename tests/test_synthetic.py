@@ -0,0 +1,41 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from girai import countries, loader, synthetic
+
+
+def test_shape_and_reproducibility():
+    rankings_df, data_df, metadata = synthetic.generate(30, n_areas=25, seed=7)
+    assert len(rankings_df) == len(metadata) == 30
+    assert len(data_df) == 30 * 25
+    assert data_df['thematic_area'].nunique() == 25
+    assert list(rankings_df['Ranking']) == list(range(1, 31))
+    assert rankings_df['Index score'].is_monotonic_decreasing
+    pillars = data_df[list(synthetic.PILLAR_CAPS)].sum(axis=1)
+    np.testing.assert_allclose(pillars, data_df['ta_score'])
+    again = synthetic.generate(30, n_areas=25, seed=7)
+    pd.testing.assert_frame_equal(again[1], data_df)
+
+
+def test_missing_fraction():
+    _, data_df, _ = synthetic.generate(200, missing=0.25, seed=1)
+    assert data_df['ta_score'].isna().mean() == pytest.approx(0.25, abs=0.02)
+    # an unscored thematic area has no pillar scores either
+    for pillar in synthetic.PILLAR_CAPS:
+        assert (data_df[pillar].isna() == data_df['ta_score'].isna()).all()
+
+
+@pytest.mark.parametrize('fmt', ['csv', 'parquet', 'xlsx'])
+def test_written_dataset_loads(fmt, tmp_path):
+    rankings_df, data_df, metadata = synthetic.generate(12, seed=2)
+    path = synthetic.write(rankings_df, data_df, metadata, str(tmp_path / 'edition'), fmt)
+    metadata_path = (os.path.join(path, 'country_metadata.csv') if fmt != 'xlsx'
+                     else str(tmp_path / 'edition_country_metadata.csv'))
+    dataset = loader.load_data(path, countries.load_metadata(metadata_path), cache_dir=str(tmp_path / 'cache'))
+    assert len(dataset.data_df) == len(data_df)
+    # the workbook also has its sub-header row
+    assert set(rankings_df['Country']) <= set(dataset.rankings_df['Country'])
+    np.testing.assert_allclose(dataset.data_df['ta_score'].astype(float), data_df['ta_score'], rtol=1e-6)
@@ -0,0 +1,24 @@
+import pandas as pd
+
+from girai import xlsx_stream
+
+SHEETS = ['Rankings and Scores', 'Data']
+
+PROJECTION = {
+    'Rankings and Scores': ['Ranking', 'ISO3', 'Country', 'GIRAI_region', 'Index score'],
+    'Data': ['thematic_area', 'country', 'ta_score'],
+}
+
+
+def test_read_workbook_matches_read_excel(workbook):
+    streamed = xlsx_stream.read_workbook(workbook, dict.fromkeys(SHEETS))
+    expected = pd.read_excel(workbook, sheet_name=SHEETS)
+    for sheet in SHEETS:
+        pd.testing.assert_frame_equal(streamed[sheet], expected[sheet])
+
+
+def test_read_workbook_projects_columns_in_requested_order(workbook):
+    streamed = xlsx_stream.read_workbook(workbook, PROJECTION)
+    for sheet, columns in PROJECTION.items():
+        expected = pd.read_excel(workbook, sheet_name=sheet)[columns]
+        pd.testing.assert_frame_equal(streamed[sheet], expected)